@@ -0,0 +1,98 @@
+"""
+Micro-benchmark of the Levenshtein distance matrix computation.
+
+Compares the vectorized wavefront implementation used by
+:class:`evalmate.alignment.LevenshteinAligner` with the cell-by-cell loop it replaced.
+
+Usage::
+
+    pip install -e .
+    python benchmarks/levenshtein.py
+"""
+
+import random
+import timeit
+
+from audiomate import annotations
+import numpy as np
+
+from evalmate import alignment
+
+LENGTHS = [10, 30, 100, 300, 1000]
+VOCABULARY = ['word{}'.format(x) for x in range(200)]
+
+
+def loop_distance_matrix(aligner, ref_labels, hyp_labels):
+    """ The pure python implementation of ``LevenshteinAligner._calc_distance_matrix`` before vectorization. """
+    n_ref = len(ref_labels) + 1
+    n_hyp = len(hyp_labels) + 1
+
+    mat = np.zeros((n_ref, n_hyp), dtype=np.int32)
+
+    for i in range(1, n_ref):
+        mat[i, 0] = i * aligner.deletion_cost
+
+    for j in range(1, n_hyp):
+        mat[0, j] = j * aligner.insertion_cost
+
+    for i in range(1, n_ref):
+        for j in range(1, n_hyp):
+            if ref_labels[i - 1].value == hyp_labels[j - 1].value:
+                sub_cost = 0
+            else:
+                sub_cost = aligner.substitution_cost
+
+            ops = [
+                mat[i - 1, j - 1] + sub_cost,
+                mat[i, j - 1] + aligner.insertion_cost,
+                mat[i - 1, j] + aligner.deletion_cost
+            ]
+
+            mat[i, j] = min(ops)
+
+    return mat
+
+
+def create_pair(rand, length, error_rate=0.2):
+    """ Create a random reference and a hypothesis with roughly ``error_rate`` errors. """
+    ref = [rand.choice(VOCABULARY) for _ in range(length)]
+    hyp = []
+
+    for value in ref:
+        r = rand.random()
+
+        if r < error_rate / 3:
+            continue
+        elif r < error_rate * 2 / 3:
+            hyp.append(rand.choice(VOCABULARY))
+        elif r < error_rate:
+            hyp.extend([value, rand.choice(VOCABULARY)])
+        else:
+            hyp.append(value)
+
+    return [annotations.Label(x) for x in ref], [annotations.Label(x) for x in hyp]
+
+
+def main():
+    rand = random.Random(1234)
+    aligner = alignment.LevenshteinAligner()
+
+    print('{:>8}  {:>12}  {:>12}  {:>8}'.format('length', 'loop [ms]', 'numpy [ms]', 'speedup'))
+
+    for length in LENGTHS:
+        ref, hyp = create_pair(rand, length)
+        number = max(1, 2000 // length)
+
+        expected = loop_distance_matrix(aligner, ref, hyp)
+        assert np.array_equal(expected, aligner._calc_distance_matrix(ref, hyp))
+
+        loop_time = timeit.timeit(lambda: loop_distance_matrix(aligner, ref, hyp), number=number) / number
+        numpy_time = timeit.timeit(lambda: aligner._calc_distance_matrix(ref, hyp), number=number) / number
+
+        print('{:>8}  {:>12.3f}  {:>12.3f}  {:>7.1f}x'.format(
+            length, loop_time * 1000, numpy_time * 1000, loop_time / numpy_time
+        ))
+
+
+if __name__ == '__main__':
+    main()
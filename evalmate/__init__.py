@@ -12,4 +12,7 @@ from evalmate.evaluator import KWSEvaluator  # noqa: F401
 from evalmate.evaluator import ASREvaluation  # noqa: F401
 from evalmate.evaluator import ASREvaluator  # noqa: F401
 
+from evalmate.evaluator import FrameEvaluator  # noqa: F401
+from evalmate.evaluator import FrameEvaluation  # noqa: F401
+
 __version__ = '0.3.0'
@@ -54,6 +54,34 @@ Classes to find possible pairs of labels for alignment.
 .. autoclass:: OverlapCandidateFinder
    :members:
 
+Storage
+-------
+Columnar storage of label-to-label alignments.
+
+.. autoclass:: AlignmentStore
+   :members:
+
+.. autoclass:: LabelPairSequence
+   :members:
+
+.. autoclass:: UtteranceAlignments
+   :members:
+
+.. autoclass:: AlignmentCache
+   :members:
+
+Batch
+-----
+Alignment of multiple utterances, optionally in a pool of processes.
+
+.. autofunction:: evalmate.alignment.batch.align_utterances
+
+.. autofunction:: evalmate.alignment.batch.compute_alignment
+
+.. autofunction:: evalmate.alignment.batch.segments_to_arrays
+
+.. autofunction:: evalmate.alignment.batch.segments_from_arrays
+
 Utils
 -----
 
@@ -78,5 +106,11 @@ from .sequence import LevenshteinAligner  # noqa: F401
 
 from .segment import InvariantSegmentAligner  # noqa: F401
 
+from .store import AlignmentStore  # noqa: F401
+from .store import LabelPairSequence  # noqa: F401
+from .store import UtteranceAlignments  # noqa: F401
+
+from .cache import AlignmentCache  # noqa: F401
+
 from .utils import Segment  # noqa: F401
 from .utils import LabelPair  # noqa: F401
@@ -25,6 +25,39 @@ class EventAligner(abc.ABC):
         """
         raise NotImplementedError()
 
+    def align_ops(self, ref_labels, hyp_labels):
+        """
+        Return the operations of the alignment between the labels of the two label-lists.
+        The operations are encoded as characters (``C`` correct, ``S`` substitution,
+        ``I`` insertion, ``D`` deletion), one for every label-pair of :meth:`align`.
+
+        The default implementation derives the operations from the label-pairs.
+        Aligners that can compute them without creating label-pairs should override it.
+        The operations only describe a sequence alignment (e.g. for :meth:`AlignmentStore.append_ops`),
+        if the pairs are monotonic, i.e. the ref and hyp labels of the pairs are in the order of the given lists.
+        Aligners that override this method are expected to return such an alignment.
+
+        Args:
+            ref_labels (list): The list containing labels of the ground truth.
+            hyp_labels (list): The list containing labels of the system output.
+
+        Returns:
+            str: The operations of the alignment in order.
+        """
+        ops = []
+
+        for pair in self.align(ref_labels, hyp_labels):
+            if pair.ref is None:
+                ops.append('I')
+            elif pair.hyp is None:
+                ops.append('D')
+            elif pair.ref.value == pair.hyp.value:
+                ops.append('C')
+            else:
+                ops.append('S')
+
+        return ''.join(ops)
+
 
 class SegmentAligner(abc.ABC):
     """
@@ -49,3 +82,18 @@ class SegmentAligner(abc.ABC):
             (one for the ground truth and one for the system output).
         """
         raise NotImplementedError()
+
+    def iter_align(self, ref_labels, hyp_labels):
+        """
+        Return the same alignment as :meth:`align`, but as an iterator over the segments.
+        Aligners that can create the segments one by one should override it,
+        so the segments don't have to be kept in memory all together.
+
+        Args:
+            ref_labels (list): The list containing labels of the ground truth.
+            hyp_labels (list): The list containing labels of the system output.
+
+        Returns:
+            iterator: An iterator over :class:`evalmate.utils.structure.Segment`.
+        """
+        return iter(self.align(ref_labels, hyp_labels))
@@ -0,0 +1,255 @@
+import concurrent.futures
+
+import numpy as np
+
+from audiomate import annotations
+
+from . import utils
+
+
+def align_utterances(kind, aligner, utterances, cache=None, workers=None, chunks_per_worker=4):
+    """
+    Align the labels of multiple utterances and return the alignments as arrays.
+
+    If ``workers`` is greater than one, the utterances are split into chunks,
+    which are aligned in a pool of processes.
+    Only the value, start and end of the labels and the aligner are sent to the processes,
+    so the aligner has to be picklable and must not depend on other properties of the labels
+    (e.g. the label-list they belong to).
+    The results are returned in the order of the given utterances,
+    independent of the order the chunks are finished in.
+
+    Arguments:
+        kind (str): The kind of the alignment (see :func:`compute_alignment`).
+        aligner (object): The aligner.
+        utterances (list): List of tuples ``(ref-labels, hyp-labels)``, one for every utterance.
+        cache (AlignmentCache): If given, the alignments are loaded from/stored in this cache
+                                and only the missing alignments are computed.
+        workers (int): Number of processes to use. If ``None`` or ``1``, the utterances are aligned
+                       in the current process.
+        chunks_per_worker (int): Number of chunks to create per process.
+                                 More chunks balance the load better, if utterances differ in length.
+
+    Returns:
+        list: The arrays of every utterance (see :func:`compute_alignment`).
+    """
+    results = [None] * len(utterances)
+    keys = [None] * len(utterances)
+
+    if cache is not None:
+        for index, (ref_labels, hyp_labels) in enumerate(utterances):
+            keys[index] = cache.key(kind, aligner, ref_labels, hyp_labels)
+            results[index] = cache.load(keys[index])
+
+    missing = [index for index, arrays in enumerate(results) if arrays is None]
+
+    if workers is None or workers <= 1 or len(missing) <= 1:
+        computed = [compute_alignment(kind, aligner, *utterances[index]) for index in missing]
+    else:
+        computed = _compute_in_pool(kind, aligner, [utterances[index] for index in missing],
+                                    workers, chunks_per_worker)
+
+    for index, arrays in zip(missing, computed):
+        results[index] = arrays
+
+        if cache is not None:
+            cache.save(keys[index], arrays)
+
+    return results
+
+
+def compute_alignment(kind, aligner, ref_labels, hyp_labels):
+    """
+    Align the labels of a single utterance and return the alignment as arrays.
+    Labels in the arrays are referenced by their index in the given lists.
+
+    For the kinds ``indices`` and ``segments`` the labels are aligned in canonical order (see :func:`canonical_order`),
+    so the result doesn't depend on the order of the given lists
+    (e.g. the iteration order of a label-list or whether the labels were sent to another process).
+    For ``ops`` and ``sequence-indices`` the labels are aligned in the given order, since it defines the sequence.
+
+    The following kinds are available:
+
+    * ``ops``: The edit operations (see :meth:`EventAligner.align_ops`) in the array ``ops`` (uint8).
+    * ``indices``: The pairs (see :meth:`EventAligner.align`) in the arrays ``ref_indices`` and ``hyp_indices``
+      (``-1`` if a pair has no ref/hyp label).
+    * ``sequence-indices``: Like ``indices``, but the labels are aligned in the given order
+      (e.g. tokens of a transcription).
+    * ``segments``: The segments (see :meth:`SegmentAligner.align`), see :func:`segments_to_arrays`.
+
+    Arguments:
+        kind (str): The kind of the alignment.
+        aligner (object): The aligner.
+        ref_labels (list): The reference labels.
+        hyp_labels (list): The hypothesis labels.
+
+    Returns:
+        dict: Dictionary with the arrays.
+    """
+    if kind == 'ops':
+        ops = aligner.align_ops(ref_labels, hyp_labels)
+        return {'ops': np.frombuffer(ops.encode('ascii'), dtype=np.uint8)}
+
+    if kind in ('indices', 'sequence-indices'):
+        if kind == 'indices':
+            pairs = aligner.align(canonical_order(ref_labels), canonical_order(hyp_labels))
+        else:
+            pairs = aligner.align(ref_labels, hyp_labels)
+
+        return {
+            'ref_indices': label_indices([pair.ref for pair in pairs], ref_labels),
+            'hyp_indices': label_indices([pair.hyp for pair in pairs], hyp_labels)
+        }
+
+    if kind == 'segments':
+        segments = aligner.align(canonical_order(ref_labels), canonical_order(hyp_labels))
+        return segments_to_arrays(segments, ref_labels, hyp_labels)
+
+    raise ValueError('Unknown kind of alignment: {}'.format(kind))
+
+
+def canonical_order(labels):
+    """
+    Return the labels sorted by start, end and value.
+    The iteration order of a label-list is not defined,
+    so the labels have to be brought into a defined order to get the same alignment for equal labels.
+    Labels that are equal in start, end and value keep their order.
+
+    Arguments:
+        labels (iterable): The labels.
+
+    Returns:
+        list: The sorted labels.
+    """
+    return sorted(labels, key=lambda label: (label.start, label.end, label.value))
+
+
+def label_indices(aligned_labels, labels):
+    """
+    Return the index in ``labels`` of every aligned label (``-1`` for ``None``).
+
+    Arguments:
+        aligned_labels (list): Labels returned by an aligner (or ``None``).
+        labels (list): The labels that were aligned.
+
+    Returns:
+        np.ndarray: The indices (int32).
+    """
+    positions = {id(label): index for index, label in enumerate(labels)}
+    indices = np.full(len(aligned_labels), -1, dtype=np.int32)
+
+    for index, label in enumerate(aligned_labels):
+        if label is not None:
+            if id(label) not in positions:
+                raise ValueError('The aligner returned a label, that is not in the aligned labels.')
+
+            indices[index] = positions[id(label)]
+
+    return indices
+
+
+def segments_to_arrays(segments, ref_labels, hyp_labels):
+    """
+    Convert segments to arrays. Start and end of the segments are stored in ``starts`` and ``ends``.
+    The labels of the i-th segment are stored as indices
+    ``ref_indices[ref_offsets[i]:ref_offsets[i + 1]]`` (``hyp`` accordingly).
+
+    Arguments:
+        segments (list): The segments.
+        ref_labels (list): The reference labels that were aligned.
+        hyp_labels (list): The hypothesis labels that were aligned.
+
+    Returns:
+        dict: Dictionary with the arrays.
+    """
+    arrays = {
+        'starts': np.array([segment.start for segment in segments], dtype=np.float64),
+        'ends': np.array([segment.end for segment in segments], dtype=np.float64)
+    }
+
+    for name, labels in (('ref', ref_labels), ('hyp', hyp_labels)):
+        positions = {id(label): index for index, label in enumerate(labels)}
+        offsets = [0]
+        indices = []
+
+        for segment in segments:
+            for label in getattr(segment, name):
+                if id(label) not in positions:
+                    raise ValueError('The aligner returned a label, that is not in the aligned labels.')
+
+                indices.append(positions[id(label)])
+
+            offsets.append(len(indices))
+
+        arrays['{}_offsets'.format(name)] = np.array(offsets, dtype=np.int64)
+        arrays['{}_indices'.format(name)] = np.array(indices, dtype=np.int64)
+
+    return arrays
+
+
+def segments_from_arrays(arrays, ref_labels, hyp_labels):
+    """
+    Create segments from arrays created with :func:`segments_to_arrays`.
+    The segments contain the given label objects.
+
+    Arguments:
+        arrays (dict): Dictionary with the arrays.
+        ref_labels (list): The reference labels that were aligned.
+        hyp_labels (list): The hypothesis labels that were aligned.
+
+    Returns:
+        list: List of Segments.
+    """
+    ref_offsets = arrays['ref_offsets'].tolist()
+    ref_indices = arrays['ref_indices'].tolist()
+    hyp_offsets = arrays['hyp_offsets'].tolist()
+    hyp_indices = arrays['hyp_indices'].tolist()
+
+    segments = []
+
+    for index, (start, end) in enumerate(zip(arrays['starts'].tolist(), arrays['ends'].tolist())):
+        ref = [ref_labels[x] for x in ref_indices[ref_offsets[index]:ref_offsets[index + 1]]]
+        hyp = [hyp_labels[x] for x in hyp_indices[hyp_offsets[index]:hyp_offsets[index + 1]]]
+
+        segments.append(utils.Segment(start, end, ref, hyp))
+
+    return segments
+
+
+def _compute_in_pool(kind, aligner, utterances, workers, chunks_per_worker):
+    """ Compute the alignments of the utterances in a pool of processes and return them in order. """
+    num_chunks = min(len(utterances), workers * chunks_per_worker)
+    bounds = np.linspace(0, len(utterances), num_chunks + 1).astype(int)
+
+    chunks = []
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        chunks.append([
+            (_label_tuples(ref_labels), _label_tuples(hyp_labels))
+            for ref_labels, hyp_labels in utterances[start:end]
+        ])
+
+    results = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # ``map`` returns the results in the order of the chunks
+        for chunk_results in executor.map(_compute_chunk, [kind] * num_chunks, [aligner] * num_chunks, chunks):
+            results.extend(chunk_results)
+
+    return results
+
+
+def _compute_chunk(kind, aligner, chunk):
+    results = []
+
+    for ref_tuples, hyp_tuples in chunk:
+        ref_labels = [annotations.Label(value, start, end) for value, start, end in ref_tuples]
+        hyp_labels = [annotations.Label(value, start, end) for value, start, end in hyp_tuples]
+
+        results.append(compute_alignment(kind, aligner, ref_labels, hyp_labels))
+
+    return results
+
+
+def _label_tuples(labels):
+    return [(label.value, label.start, label.end) for label in labels]
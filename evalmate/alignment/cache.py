@@ -0,0 +1,391 @@
+import functools
+import hashlib
+import json
+import os
+import struct
+import uuid
+
+import numpy as np
+
+import evalmate
+
+from . import batch
+
+#: Version of the format of the keys and the stored alignments.
+#: Has to be increased, if the result of an alignment changes for the same labels and aligner configuration.
+FORMAT_VERSION = 1
+
+
+class AlignmentCache(object):
+    """
+    Cache for alignments of single utterances, stored on the local disk.
+
+    The key of an alignment is a hash of the reference labels, the hypothesis labels
+    (value, start and end of every label in the given order) and the configuration of the aligner
+    (class and parameters), salted with the version of evalmate and of the cache format.
+    So an utterance is only aligned again, if one of its label-lists, the aligner or evalmate changes.
+
+    Functions used by the aligner (e.g. a custom cost function) are described by their qualified name.
+    Lambdas and functions defined within other functions can't be told apart by their name,
+    so they can't be cached, unless the aligner has an attribute ``cache_key``.
+    If it has, the ``cache_key`` replaces the parameters of the aligner in the key.
+    It has to be changed whenever the behaviour of the aligner changes.
+
+    Every alignment is stored in a separate file,
+    containing a small header (name, dtype and shape of the arrays) followed by the raw data of the arrays.
+    If the size of all files exceeds ``max_size``, the least recently used alignments are deleted.
+
+    Arguments:
+        path (str): Directory to store the alignments in. Is created if it doesn't exist.
+        max_size (int): Maximum size of all stored alignments in bytes.
+
+    Attributes:
+        hits (int): Number of alignments that were loaded from the cache.
+        misses (int): Number of alignments that were not in the cache.
+
+    Example:
+        >>> cache = AlignmentCache('/tmp/alignments')
+        >>> evaluator = ASREvaluator(cache=cache)
+
+        >>> aligner = LevenshteinAligner(custom_substitution_cost_function=lambda a, b: 0 if a == b else 1)
+        >>> aligner.cache_key = 'binary-substitution-cost'
+        >>> evaluator = ASREvaluator(aligner=aligner, cache=cache)
+    """
+
+    FILE_SUFFIX = '.alignment'
+
+    def __init__(self, path, max_size=1024 ** 3):
+        self.path = path
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        self._size = sum(size for _, _, size in self._stored_files())
+
+    @property
+    def size(self):
+        """ int: Size of all stored alignments in bytes. """
+        return self._size
+
+    def key(self, kind, aligner, ref_labels, hyp_labels):
+        """
+        Return the key for an alignment.
+
+        Arguments:
+            kind (str): The kind of the alignment (e.g. ``ops``, ``indices``, ``segments``).
+            aligner (object): The aligner.
+            ref_labels (list): The reference labels.
+            hyp_labels (list): The hypothesis labels.
+
+        Returns:
+            str: The key (hex-digest).
+
+        Raises:
+            ValueError: The configuration of the aligner can't be described (see :func:`describe_config`)
+                        and the aligner has no ``cache_key``.
+        """
+        cache_key = getattr(aligner, 'cache_key', None)
+
+        if cache_key is None:
+            config = describe_config(aligner)
+        else:
+            config = '{}.{}[{}]'.format(type(aligner).__module__, type(aligner).__qualname__,
+                                        describe_config(cache_key))
+
+        digest = hashlib.sha256()
+
+        digest.update('{}\x00{}\x00'.format(FORMAT_VERSION, evalmate.__version__).encode('utf-8'))
+        digest.update(kind.encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(config.encode('utf-8'))
+
+        for labels in (ref_labels, hyp_labels):
+            values = [label.value.encode('utf-8') for label in labels]
+            times = [(label.start, label.end) for label in labels]
+
+            digest.update(b'\x00')
+            digest.update(np.array([len(x) for x in values], dtype=np.int64).tobytes())
+            digest.update(b''.join(values))
+            digest.update(np.array(times, dtype=np.float64).tobytes())
+
+        return digest.hexdigest()
+
+    def load(self, key):
+        """
+        Return the arrays stored for the given key, ``None`` if there is no alignment for the key.
+
+        Arguments:
+            key (str): The key of the alignment.
+
+        Returns:
+            dict: Dictionary with the stored arrays.
+        """
+        path = self._file_path(key)
+
+        try:
+            with open(path, 'rb') as f:
+                arrays = read_arrays(f.read())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Update the modification time, which defines the order of eviction
+        os.utime(path)
+        self.hits += 1
+
+        return arrays
+
+    def save(self, key, arrays):
+        """
+        Store arrays for the given key.
+
+        Arguments:
+            key (str): The key of the alignment.
+            arrays (dict): Dictionary with the arrays to store.
+        """
+        path = self._file_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first, so there are never partially written alignments
+        tmp_path = '{}.{}.tmp'.format(path, uuid.uuid4().hex)
+
+        with open(tmp_path, 'wb') as f:
+            f.write(write_arrays(arrays))
+
+        if os.path.isfile(path):
+            self._size -= os.path.getsize(path)
+
+        os.replace(tmp_path, path)
+        self._size += os.path.getsize(path)
+
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """
+        Delete the least recently used alignments, until the size of all alignments is below ``max_size``.
+        """
+        files = sorted(self._stored_files())
+        self._size = sum(size for _, _, size in files)
+
+        for _, path, size in files:
+            if self._size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            self._size -= size
+
+    def clear(self):
+        """ Delete all stored alignments. """
+        for _, path, _ in self._stored_files():
+            os.remove(path)
+
+        self._size = 0
+
+    def align_ops(self, aligner, ref_labels, hyp_labels):
+        """
+        Return the edit operations of the alignment (see :meth:`EventAligner.align_ops`).
+        If not cached, the labels are aligned with the given aligner and the result is cached.
+
+        Arguments:
+            aligner (EventAligner): The aligner.
+            ref_labels (list): The reference labels.
+            hyp_labels (list): The hypothesis labels.
+
+        Returns:
+            str: The operations of the alignment.
+        """
+        arrays = self._align('ops', aligner, ref_labels, hyp_labels)
+        return arrays['ops'].tobytes().decode('ascii')
+
+    def align_indices(self, aligner, ref_labels, hyp_labels):
+        """
+        Return the alignment (see :meth:`EventAligner.align`)
+        as index of the ref label and index of the hyp label for every pair (``-1`` if missing).
+        If not cached, the labels are aligned with the given aligner and the result is cached.
+
+        Arguments:
+            aligner (EventAligner): The aligner.
+            ref_labels (list): The reference labels.
+            hyp_labels (list): The hypothesis labels.
+
+        Returns:
+            tuple: Two integer arrays ``(ref-indices, hyp-indices)``.
+        """
+        arrays = self._align('indices', aligner, ref_labels, hyp_labels)
+        return arrays['ref_indices'], arrays['hyp_indices']
+
+    def align_segments(self, aligner, ref_labels, hyp_labels):
+        """
+        Return the segments of the alignment (see :meth:`SegmentAligner.align`).
+        If not cached, the labels are aligned with the given aligner and the result is cached.
+        The segments contain lists of the given label objects.
+
+        Arguments:
+            aligner (SegmentAligner): The aligner.
+            ref_labels (list): The reference labels.
+            hyp_labels (list): The hypothesis labels.
+
+        Returns:
+            list: List of Segments.
+        """
+        arrays = self._align('segments', aligner, ref_labels, hyp_labels)
+        return batch.segments_from_arrays(arrays, ref_labels, hyp_labels)
+
+    @staticmethod
+    def canonical_order(labels):
+        """
+        Return the labels sorted by start, end and value.
+        The iteration order of a label-list is not defined,
+        so the labels have to be brought into a defined order to get the same key for equal labels
+        (see :func:`evalmate.alignment.batch.canonical_order`).
+
+        Arguments:
+            labels (iterable): The labels.
+
+        Returns:
+            list: The sorted labels.
+        """
+        return batch.canonical_order(labels)
+
+    def _align(self, kind, aligner, ref_labels, hyp_labels):
+        key = self.key(kind, aligner, ref_labels, hyp_labels)
+        arrays = self.load(key)
+
+        if arrays is None:
+            arrays = batch.compute_alignment(kind, aligner, ref_labels, hyp_labels)
+            self.save(key, arrays)
+
+        return arrays
+
+    def _file_path(self, key):
+        return os.path.join(self.path, key[:2], '{}{}'.format(key, self.FILE_SUFFIX))
+
+    def _stored_files(self):
+        """ Return a list of tuples (modification-time, path, size) of all stored alignments. """
+        files = []
+
+        for directory, _, file_names in os.walk(self.path):
+            for file_name in file_names:
+                if file_name.endswith(self.FILE_SUFFIX):
+                    path = os.path.join(directory, file_name)
+
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+
+                    files.append((stat.st_mtime, path, stat.st_size))
+
+        return files
+
+
+def write_arrays(arrays):
+    """
+    Serialize arrays to bytes.
+
+    Arguments:
+        arrays (dict): Dictionary with the arrays.
+
+    Returns:
+        bytes: The serialized arrays.
+    """
+    header = []
+    data = []
+
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        header.append([name, array.dtype.str, list(array.shape)])
+        data.append(array.tobytes())
+
+    header = json.dumps(header).encode('utf-8')
+
+    return struct.pack('<I', len(header)) + header + b''.join(data)
+
+
+def read_arrays(data):
+    """
+    Deserialize arrays that were serialized with :func:`write_arrays`.
+
+    Arguments:
+        data (bytes): The serialized arrays.
+
+    Returns:
+        dict: Dictionary with the arrays.
+    """
+    try:
+        header_length, = struct.unpack_from('<I', data)
+        header = json.loads(data[4:4 + header_length].decode('utf-8'))
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError('Invalid serialized arrays.') from e
+
+    arrays = {}
+    offset = 4 + header_length
+
+    for name, dtype, shape in header:
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += count * dtype.itemsize
+
+    if offset != len(data):
+        raise ValueError('Invalid serialized arrays.')
+
+    return arrays
+
+
+def describe_config(obj):
+    """
+    Return a string describing an object (e.g. an aligner) with all its parameters.
+    Functions and classes are described by their qualified name,
+    partials by the function and the arguments, bound methods by the object and the name.
+
+    Arguments:
+        obj (object): The object to describe.
+
+    Returns:
+        str: The description.
+
+    Raises:
+        ValueError: The object contains a lambda or a function/class defined within a function,
+                    which can't be distinguished from others with the same name.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return repr(obj)
+
+    if isinstance(obj, (list, tuple)):
+        return '[{}]'.format(','.join(describe_config(x) for x in obj))
+
+    if isinstance(obj, dict):
+        items = sorted((describe_config(key), describe_config(value)) for key, value in obj.items())
+        return '{{{}}}'.format(','.join('{}:{}'.format(key, value) for key, value in items))
+
+    if isinstance(obj, np.ndarray):
+        return describe_config(obj.tolist())
+
+    if isinstance(obj, functools.partial):
+        return 'functools.partial({},{},{})'.format(describe_config(obj.func), describe_config(obj.args),
+                                                    describe_config(obj.keywords))
+
+    if hasattr(obj, '__func__') and hasattr(obj, '__self__'):
+        return '{}.{}'.format(describe_config(obj.__self__), obj.__func__.__name__)
+
+    if hasattr(obj, '__qualname__'):
+        if '<lambda>' in obj.__qualname__ or '<locals>' in obj.__qualname__:
+            raise ValueError("{} can't be described by its name, set a cache_key on the aligner.".format(obj))
+
+        return '{}.{}'.format(getattr(obj, '__module__', ''), obj.__qualname__)
+
+    name = '{}.{}'.format(type(obj).__module__, type(obj).__qualname__)
+
+    if hasattr(obj, '__dict__'):
+        return '{}({})'.format(name, describe_config(vars(obj)))
+
+    return '{}({!r})'.format(name, obj)
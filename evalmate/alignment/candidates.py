@@ -1,4 +1,6 @@
 import abc
+import bisect
+import heapq
 
 from evalmate.utils import label
 
@@ -56,24 +58,53 @@ class StartEndCandidateFinder(CandidateFinder):
         ref_no_match = set(range(len(ref_labels)))
         hyp_no_match = set(range(len(hyp_labels)))
 
-        for ref_index, ref in enumerate(ref_labels):
-            for hyp_index, hyp in enumerate(hyp_labels):
-                start_delta = abs(ref.start - hyp.start)
+        # Sort the hyp-labels by start, so for every ref-label only the window of
+        # hyp-labels with a start within the threshold has to be checked.
+        hyp_order = sorted(range(len(hyp_labels)), key=lambda x: hyp_labels[x].start)
+        hyp_starts = [hyp_labels[x].start for x in hyp_order]
 
-                if start_delta <= self.start_delta_threshold:
+        for ref_index, ref in enumerate(ref_labels):
+            window_start, window_end = self._start_window(ref.start, hyp_starts)
+            hyp_indices = sorted(hyp_order[window_start:window_end])
 
-                    if self.end_delta_threshold < 0.0 or \
-                            abs(ref.end - hyp.end) < self.end_delta_threshold:
-                        matches.append((ref_index, hyp_index))
+            for hyp_index in hyp_indices:
+                hyp = hyp_labels[hyp_index]
 
-                        if hyp_index in hyp_no_match:
-                            hyp_no_match.remove(hyp_index)
+                if self.end_delta_threshold < 0.0 or \
+                        abs(ref.end - hyp.end) < self.end_delta_threshold:
+                    matches.append((ref_index, hyp_index))
 
-                        if ref_index in ref_no_match:
-                            ref_no_match.remove(ref_index)
+                    hyp_no_match.discard(hyp_index)
+                    ref_no_match.discard(ref_index)
 
         return matches, ref_no_match, hyp_no_match
 
+    def _start_window(self, ref_start, hyp_starts):
+        """
+        Return the range ``(first, last + 1)`` of the sorted ``hyp_starts``,
+        that are within ``start_delta_threshold`` of ``ref_start``.
+        """
+        threshold = self.start_delta_threshold
+
+        first = bisect.bisect_left(hyp_starts, ref_start - threshold)
+        end = bisect.bisect_right(hyp_starts, ref_start + threshold, lo=first)
+
+        # The bounds above are computed with rounded sums,
+        # so they are adjusted to match the delta as computed for every pair.
+        while first > 0 and abs(ref_start - hyp_starts[first - 1]) <= threshold:
+            first -= 1
+
+        while first < end and abs(ref_start - hyp_starts[first]) > threshold:
+            first += 1
+
+        while end < len(hyp_starts) and abs(ref_start - hyp_starts[end]) <= threshold:
+            end += 1
+
+        while end > first and abs(ref_start - hyp_starts[end - 1]) > threshold:
+            end -= 1
+
+        return first, end
+
 
 class OverlapCandidateFinder(CandidateFinder):
     """
@@ -89,25 +120,80 @@ class OverlapCandidateFinder(CandidateFinder):
         self.min_overlap = 0.05
 
     def find(self, ref_labels, hyp_labels):
+        if self.min_overlap <= 0:
+            matches = [(r, h) for r in range(len(ref_labels)) for h in range(len(hyp_labels))]
+            ref_no_match = set() if len(hyp_labels) > 0 else set(range(len(ref_labels)))
+            hyp_no_match = set() if len(ref_labels) > 0 else set(range(len(hyp_labels)))
+
+            return matches, ref_no_match, hyp_no_match
+
         matches = []
 
         ref_no_match = set(range(len(ref_labels)))
         hyp_no_match = set(range(len(hyp_labels)))
 
-        for ref_index, ref in enumerate(ref_labels):
-            for hyp_index, hyp in enumerate(hyp_labels):
-                ref = ref_labels[ref_index]
-                hyp = hyp_labels[hyp_index]
+        for ref_index, hyp_index in overlapping_pairs(ref_labels, hyp_labels):
+            ref = ref_labels[ref_index]
+            hyp = hyp_labels[hyp_index]
 
-                overlap_time = label.overlap_time(ref, hyp)
-
-                if self.min_overlap <= 0 or overlap_time >= self.min_overlap:
-                    matches.append((ref_index, hyp_index))
+            overlap_time = label.overlap_time(ref, hyp)
 
-                    if hyp_index in hyp_no_match:
-                        hyp_no_match.remove(hyp_index)
+            if overlap_time >= self.min_overlap:
+                matches.append((ref_index, hyp_index))
 
-                    if ref_index in ref_no_match:
-                        ref_no_match.remove(ref_index)
+                hyp_no_match.discard(hyp_index)
+                ref_no_match.discard(ref_index)
 
         return matches, ref_no_match, hyp_no_match
+
+
+def overlapping_pairs(ref_labels, hyp_labels):
+    """
+    Return all pairs of ref and hyp labels that may overlap with a positive duration.
+    A label with an end of ``-1`` is treated as open ended, so the result may contain
+    pairs that do not overlap, but it contains every pair that does.
+
+    The labels are swept by start time, while keeping the labels that didn't end yet
+    in a heap for both sides. Hence only the pairs that actually overlap are visited.
+
+    Args:
+        ref_labels (list): List with reference labels (ground truth).
+        hyp_labels (list): List with hypothesis labels (system output).
+
+    Returns:
+        list: Sorted list of tuples ``(ref-index, hyp-index)``.
+    """
+    events = []
+
+    for side, labels in enumerate([ref_labels, hyp_labels]):
+        for index, lbl in enumerate(labels):
+            end = lbl.end
+
+            if end == -1:
+                end = float('inf')
+
+            events.append((lbl.start, end, side, index))
+
+    events.sort()
+
+    active = ([], [])
+    pairs = []
+
+    for start, end, side, index in events:
+        other = active[1 - side]
+
+        while len(other) > 0 and other[0][0] <= start:
+            heapq.heappop(other)
+
+        if end <= start:
+            continue
+
+        if side == 0:
+            pairs.extend((index, other_index) for _, other_index in other)
+        else:
+            pairs.extend((other_index, index) for _, other_index in other)
+
+        heapq.heappush(active[side], (end, index))
+
+    pairs.sort()
+    return pairs
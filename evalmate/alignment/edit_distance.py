@@ -0,0 +1,483 @@
+"""
+Vectorized dynamic programming for the Levenshtein (edit) distance.
+
+The distance matrix is filled along anti-diagonals (wavefront).
+All cells on one anti-diagonal only depend on the two previous anti-diagonals,
+so a whole anti-diagonal is computed with a few NumPy operations.
+Every cell is computed with exactly the same operations as in a cell-by-cell loop,
+hence the resulting matrix is identical.
+"""
+
+import numbers
+
+import numpy as np
+
+INTEGER_DTYPES = [np.int8, np.int16, np.int32, np.int64]
+
+
+def select_dtype(n_ref, n_hyp, insertion_cost, deletion_cost, substitution_cost, custom_costs=False):
+    """
+    Return the narrowest data type, that can hold all values of the distance matrix without overflow.
+
+    If all costs are integers, the smallest integer type is selected, that can hold the largest possible value.
+    No cell of the matrix is larger than the cost of deleting all ref and inserting all hyp elements.
+    If any cost is a float or custom substitution costs are used, ``np.float64`` is selected.
+
+    Args:
+        n_ref (int): Length of the reference sequence.
+        n_hyp (int): Length of the hypothesis sequence.
+        insertion_cost (float): Cost for an insertion.
+        deletion_cost (float): Cost for a deletion.
+        substitution_cost (float): Cost for a substitution.
+        custom_costs (bool): Whether the substitution costs are computed by a custom function.
+
+    Returns:
+        type: The numpy data type.
+    """
+    costs = [insertion_cost, deletion_cost, substitution_cost]
+
+    if custom_costs or not all(isinstance(cost, numbers.Integral) for cost in costs):
+        return np.float64
+
+    # Every cell is the minimum of candidates that are at most one operation more expensive than the bound.
+    max_value = n_ref * deletion_cost + n_hyp * insertion_cost + max(costs)
+
+    for dtype in INTEGER_DTYPES:
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+
+    return np.float64
+
+
+def encode_values(ref_labels, hyp_labels):
+    """
+    Map the values of the given labels to integer ids.
+    Labels with the same value get the same id, in ref and hyp.
+
+    Args:
+        ref_labels (list): The list containing labels of the ground truth.
+        hyp_labels (list): The list containing labels of the system output.
+
+    Returns:
+        tuple: Two integer arrays (ref-ids, hyp-ids).
+    """
+    value_ids = {}
+
+    ref_ids = [value_ids.setdefault(label.value, len(value_ids)) for label in ref_labels]
+    hyp_ids = [value_ids.setdefault(label.value, len(value_ids)) for label in hyp_labels]
+
+    return np.array(ref_ids, dtype=np.int64), np.array(hyp_ids, dtype=np.int64)
+
+
+class SubstitutionCosts(object):
+    """
+    Computes the substitution costs for many pairs of labels at once.
+
+    Pairs with equal values have a cost of ``0``.
+    All other pairs cost ``substitution_cost``, or if given,
+    the result of ``custom_function(ref-label, hyp-label)``.
+
+    Args:
+        ref_labels (list): The list containing labels of the ground truth.
+        hyp_labels (list): The list containing labels of the system output.
+        substitution_cost (float): Cost for a substitution.
+        custom_function (func): Function to calculate the cost of a substitution of two labels.
+    """
+
+    def __init__(self, ref_labels, hyp_labels, substitution_cost, custom_function=None):
+        self.ref_labels = ref_labels
+        self.hyp_labels = hyp_labels
+        self.substitution_cost = substitution_cost
+        self.custom_function = custom_function
+
+        self.ref_ids, self.hyp_ids = encode_values(ref_labels, hyp_labels)
+
+    def __call__(self, ref_indices, hyp_indices):
+        """
+        Return the substitution costs for the given pairs.
+
+        Args:
+            ref_indices (np.ndarray): Indices of the ref-labels.
+            hyp_indices (np.ndarray): Indices of the hyp-labels.
+
+        Returns:
+            np.ndarray: The cost for every pair ``(ref_indices[x], hyp_indices[x])``.
+        """
+        mismatch = self.ref_ids[ref_indices] != self.hyp_ids[hyp_indices]
+
+        if self.custom_function is None:
+            return np.where(mismatch, self.substitution_cost, 0)
+
+        costs = np.zeros(len(mismatch), dtype=np.float64)
+
+        for x in np.flatnonzero(mismatch):
+            costs[x] = self.custom_function(self.ref_labels[ref_indices[x]], self.hyp_labels[hyp_indices[x]])
+
+        return costs
+
+
+def distance_matrix(n_ref, n_hyp, substitution_costs, insertion_cost, deletion_cost, dtype=np.int64):
+    """
+    Calculate the full distance matrix between two sequences.
+
+    Args:
+        n_ref (int): Length of the reference sequence.
+        n_hyp (int): Length of the hypothesis sequence.
+        substitution_costs (func): Function that returns the substitution costs
+                                   for arrays of ref/hyp indices (see :class:`SubstitutionCosts`).
+        insertion_cost (float): Cost for an insertion.
+        deletion_cost (float): Cost for a deletion.
+        dtype (np.dtype): Data type of the matrix.
+
+    Returns:
+        np.ndarray: Matrix of shape ``(n_ref + 1, n_hyp + 1)``.
+        The cell ``(i, j)`` contains the distance between the first ``i`` ref and the first ``j`` hyp elements.
+    """
+    mat = np.zeros((n_ref + 1, n_hyp + 1), dtype=dtype)
+
+    mat[1:, 0] = np.arange(1, n_ref + 1) * deletion_cost
+    mat[0, 1:] = np.arange(1, n_hyp + 1) * insertion_cost
+
+    fill_matrix(mat, substitution_costs, insertion_cost, deletion_cost)
+
+    return mat
+
+
+def fill_matrix(mat, substitution_costs, insertion_cost, deletion_cost, row_offset=0):
+    """
+    Compute all cells of the given matrix, except the first row and column, which have to be set already.
+    The matrix is updated in place, one anti-diagonal at a time.
+
+    Args:
+        mat (np.ndarray): C-contiguous matrix to fill.
+        substitution_costs (func): Function that returns the substitution costs
+                                   for arrays of ref/hyp indices (see :class:`SubstitutionCosts`).
+        insertion_cost (float): Cost for an insertion.
+        deletion_cost (float): Cost for a deletion.
+        row_offset (int): Index of the ref element of the first row, if ``mat`` only covers a band of rows.
+    """
+    n_rows, n_cols = mat.shape
+
+    if n_rows < 2 or n_cols < 2:
+        return
+
+    flat = mat.reshape(-1)
+
+    # The cells of the anti-diagonal ``d`` have the flat indices ``i * (n_cols - 1) + d``,
+    # so all neighbours of a diagonal are strided slices of the flat matrix.
+    step = n_cols - 1
+
+    for d in range(2, n_rows + n_cols - 1):
+        i_start = max(1, d - n_cols + 1)
+        i_end = min(n_rows - 1, d - 1) + 1
+
+        first = i_start * step + d
+        last = (i_end - 1) * step + d + 1
+
+        rows = np.arange(i_start, i_end)
+        sub = flat[first - n_cols - 1:last - n_cols - 1:step] + substitution_costs(rows - 1 + row_offset, d - rows - 1)
+        ins = flat[first - 1:last - 1:step] + insertion_cost
+        dele = flat[first - n_cols:last - n_cols:step] + deletion_cost
+
+        flat[first:last:step] = np.minimum(np.minimum(sub, ins), dele)
+
+
+def band_matrix(top_row, row_start, row_end, substitution_costs, insertion_cost, deletion_cost):
+    """
+    Calculate the rows ``row_start`` to ``row_end`` of the distance matrix, given the row ``row_start``.
+    Only the columns covered by ``top_row`` are computed.
+
+    Args:
+        top_row (np.ndarray): The values of the row ``row_start``.
+        row_start (int): Index of the first row.
+        row_end (int): Index of the last row.
+        substitution_costs (func): Function that returns the substitution costs
+                                   for arrays of ref/hyp indices (see :class:`SubstitutionCosts`).
+        insertion_cost (float): Cost for an insertion.
+        deletion_cost (float): Cost for a deletion.
+
+    Returns:
+        np.ndarray: Matrix of shape ``(row_end - row_start + 1, len(top_row))``.
+    """
+    mat = np.zeros((row_end - row_start + 1, len(top_row)), dtype=top_row.dtype)
+
+    mat[0] = top_row
+    mat[1:, 0] = np.arange(row_start + 1, row_end + 1) * deletion_cost
+
+    fill_matrix(mat, substitution_costs, insertion_cost, deletion_cost, row_offset=row_start)
+
+    return mat
+
+
+def last_row(top_row, row_start, row_end, substitution_costs, insertion_cost, deletion_cost, max_cells):
+    """
+    Calculate the row ``row_end`` of the distance matrix, given the row ``row_start``.
+    Only the columns covered by ``top_row`` are computed.
+
+    For integer types the matrix is computed row by row. The dependency on the left neighbour within a row
+    is resolved with a cumulative minimum, which is exact for integers.
+    For other types the rows are computed in bands of at most ``max_cells`` cells (but at least two rows).
+
+    Returns:
+        np.ndarray: The values of the row ``row_end``.
+    """
+    row = top_row
+    n_cols = len(top_row)
+
+    if np.issubdtype(top_row.dtype, np.integer):
+        hyp_indices = np.arange(n_cols - 1)
+        col_costs = np.arange(n_cols, dtype=np.int64) * insertion_cost
+
+        for i in range(row_start + 1, row_end + 1):
+            ref_indices = np.full(n_cols - 1, i - 1)
+            sub = row[:-1] + substitution_costs(ref_indices, hyp_indices)
+            dele = row[1:] + deletion_cost
+
+            candidates = np.empty(n_cols, dtype=np.int64)
+            candidates[0] = i * deletion_cost
+            candidates[1:] = np.minimum(sub, dele)
+
+            # row[j] = min(candidates[j], row[j - 1] + insertion_cost)
+            row = (np.minimum.accumulate(candidates - col_costs) + col_costs).astype(top_row.dtype)
+
+        return row
+
+    band_rows = max(1, max_cells // n_cols - 1)
+
+    while row_start < row_end:
+        band_end = min(row_end, row_start + band_rows)
+        row = band_matrix(row, row_start, band_end, substitution_costs, insertion_cost, deletion_cost)[-1].copy()
+        row_start = band_end
+
+    return row
+
+
+OP_CORRECT = ord('C')
+OP_SUBSTITUTION = ord('S')
+OP_INSERTION = ord('I')
+OP_DELETION = ord('D')
+
+
+def trace_back(values, end_row, end_col, row_stride, ref_ids, hyp_ids, insertion_cost, deletion_cost, offset=0,
+               to_origin=True):
+    """
+    Follow the optimal path backwards, starting at the cell ``(end_row, end_col)`` of a distance matrix.
+    At every cell an insertion is preferred over a deletion and a deletion over a match/substitution.
+
+    The matrix is given as flat array, the cell ``(i, j)`` is stored at ``values[i * row_stride + j + offset]``.
+    This way full matrices as well as banded matrices (see :func:`banded_matrix`) are supported.
+
+    Args:
+        values (np.ndarray): The flat distance matrix (or a band of it).
+        end_row (int): The row to start.
+        end_col (int): The column to start.
+        row_stride (int): Distance between two rows in ``values``.
+        ref_ids (list): The value-ids of the ref elements of the rows (see :func:`encode_values`).
+        hyp_ids (list): The value-ids of the hyp elements of the columns (see :func:`encode_values`).
+        insertion_cost (float): Cost for an insertion.
+        deletion_cost (float): Cost for a deletion.
+        offset (int): Offset of the cell ``(0, 0)`` in ``values``.
+        to_origin (bool): If ``True``, the path is followed to the cell ``(0, 0)``,
+                          otherwise it stops when it reaches the first row.
+
+    Returns:
+        tuple: A string with the operations of the path in order and the column where the path started.
+        Operations are ``C`` (correct), ``S`` (substitution), ``I`` (insertion) and ``D`` (deletion).
+    """
+    if np.issubdtype(values.dtype, np.integer) or values.dtype == np.float64:
+        # Python numbers behave exactly like these types, but are a lot faster to access
+        get = values.item
+        insertion_cost = values.dtype.type(insertion_cost).item()
+        deletion_cost = values.dtype.type(deletion_cost).item()
+    else:
+        get = values.__getitem__
+        insertion_cost = values.dtype.type(insertion_cost)
+        deletion_cost = values.dtype.type(deletion_cost)
+
+    # The operations are written backwards, starting at the end of the buffer
+    ops = bytearray(end_row + end_col)
+    pos = len(ops)
+
+    i = end_row
+    j = end_col
+    index = i * row_stride + j + offset
+    current = get(index)
+
+    while i > 0 or (to_origin and j > 0):
+        pos -= 1
+
+        if j > 0 and (i == 0 or get(index - 1) + insertion_cost == current):
+            ops[pos] = OP_INSERTION
+            j -= 1
+            index -= 1
+        elif i > 0 and (j == 0 or get(index - row_stride) + deletion_cost == current):
+            ops[pos] = OP_DELETION
+            i -= 1
+            index -= row_stride
+        else:
+            ops[pos] = OP_CORRECT if ref_ids[i - 1] == hyp_ids[j - 1] else OP_SUBSTITUTION
+            i -= 1
+            j -= 1
+            index -= row_stride + 1
+
+        current = get(index)
+
+    return ops[pos:].decode('ascii'), j
+
+
+def linear_memory_ops(n_ref, n_hyp, substitution_costs, insertion_cost, deletion_cost, dtype, max_cells):
+    """
+    Compute the operations of the optimal alignment, without keeping the full distance matrix.
+
+    The rows are split recursively in halves (similar to Hirschberg's algorithm).
+    For the lower half the middle row is computed and the path is traced back to the middle row.
+    Then the upper half is processed, starting at the column where the path reached the middle row.
+    Bands with at most ``max_cells`` cells are computed in full.
+    Since every band is computed from the exact values of its first row,
+    the result is identical to tracing back the full matrix.
+
+    Memory is bounded by ``max_cells`` plus one row per recursion level.
+
+    Args:
+        n_ref (int): Length of the reference sequence.
+        n_hyp (int): Length of the hypothesis sequence.
+        substitution_costs (SubstitutionCosts): Substitution costs of the ref/hyp elements.
+        insertion_cost (float): Cost for an insertion.
+        deletion_cost (float): Cost for a deletion.
+        dtype (np.dtype): Data type of the matrix values.
+        max_cells (int): Maximal number of cells to compute at once.
+
+    Returns:
+        str: The operations of the alignment in order (see :func:`trace_back`).
+    """
+    segments = []
+    top_row = (np.arange(n_hyp + 1) * insertion_cost).astype(dtype)
+    hyp_ids = substitution_costs.hyp_ids.tolist()
+
+    def trace(top, row_start, row_end, end_col):
+        n_cols = end_col + 1
+
+        if (row_end - row_start + 1) * n_cols <= max_cells or row_end - row_start <= 1:
+            mat = band_matrix(top[:n_cols], row_start, row_end, substitution_costs, insertion_cost, deletion_cost)
+            ref_ids = substitution_costs.ref_ids[row_start:row_end].tolist()
+
+            band_ops, col = trace_back(mat.reshape(-1), row_end - row_start, end_col, n_cols, ref_ids, hyp_ids,
+                                       insertion_cost, deletion_cost, to_origin=row_start == 0)
+            segments.append(band_ops)
+            return col
+
+        row_mid = (row_start + row_end) // 2
+        mid = last_row(top[:n_cols], row_start, row_mid, substitution_costs, insertion_cost, deletion_cost,
+                       max_cells)
+
+        col = trace(mid, row_mid, row_end, end_col)
+        del mid
+
+        return trace(top, row_start, row_mid, col)
+
+    # The segments are created from the end to the start of the path
+    trace(top_row, 0, n_ref, n_hyp)
+
+    return ''.join(reversed(segments))
+
+
+def band_limits(n_ref, n_hyp, band_width):
+    """
+    Return the range of diagonals ``(lowest, highest)`` that are within ``band_width`` of the diagonals
+    from ``(0, 0)`` to ``(n_ref, n_hyp)``. The cell ``(i, j)`` lies on the diagonal ``j - i``.
+    """
+    lowest = max(-n_ref, min(0, n_hyp - n_ref) - band_width)
+    highest = min(n_hyp, max(0, n_hyp - n_ref) + band_width)
+
+    return lowest, highest
+
+
+def banded_matrix(n_ref, n_hyp, substitution_costs, insertion_cost, deletion_cost, dtype, lowest, highest):
+    """
+    Calculate the cells of the distance matrix, that are on the diagonals ``lowest`` to ``highest``.
+    The cells outside of the band are treated as unreachable.
+
+    The band is stored in a matrix of shape ``(n_ref + 1, highest - lowest + 3)``.
+    The cell ``(i, j)`` is stored at ``(i, j - i - lowest + 1)``.
+    The first and last column are padding and always unreachable.
+
+    Args:
+        n_ref (int): Length of the reference sequence.
+        n_hyp (int): Length of the hypothesis sequence.
+        substitution_costs (func): Function that returns the substitution costs
+                                   for arrays of ref/hyp indices (see :class:`SubstitutionCosts`).
+        insertion_cost (float): Cost for an insertion.
+        deletion_cost (float): Cost for a deletion.
+        dtype (np.dtype): Data type of the matrix. Integer types need room for twice the highest
+                          possible distance, which is used to mark unreachable cells.
+        lowest (int): The lowest diagonal of the band (see :func:`band_limits`).
+        highest (int): The highest diagonal of the band (see :func:`band_limits`).
+
+    Returns:
+        np.ndarray: The band.
+    """
+    if np.issubdtype(dtype, np.integer):
+        unreachable = n_ref * deletion_cost + n_hyp * insertion_cost + \
+            max(insertion_cost, deletion_cost, substitution_costs.substitution_cost) + 1
+    else:
+        unreachable = np.inf
+
+    width = highest - lowest + 1
+    stride = width + 2
+
+    band = np.full((n_ref + 1, stride), unreachable, dtype=dtype)
+
+    cols = np.arange(0, highest + 1)
+    band[0, cols - lowest + 1] = cols * insertion_cost
+
+    rows = np.arange(0, -lowest + 1)
+    band[rows, -rows - lowest + 1] = rows * deletion_cost
+
+    flat = band.reshape(-1)
+
+    # The cells of the anti-diagonal ``d`` have the flat indices ``i * width + d - lowest + 1``.
+    for d in range(2, n_ref + n_hyp + 1):
+        i_start = max(1, d - n_hyp, (d - highest + 1) // 2)
+        i_end = min(n_ref, d - 1, (d - lowest) // 2) + 1
+
+        if i_start >= i_end:
+            continue
+
+        first = i_start * width + d - lowest + 1
+        last = (i_end - 1) * width + d - lowest + 2
+
+        rows = np.arange(i_start, i_end)
+        sub = flat[first - stride:last - stride:width] + substitution_costs(rows - 1, d - rows - 1)
+        ins = flat[first - 1:last - 1:width] + insertion_cost
+        dele = flat[first - width - 1:last - width - 1:width] + deletion_cost
+
+        flat[first:last:width] = np.minimum(np.minimum(sub, ins), dele)
+
+    return band
+
+
+def outside_band_cost(n_ref, n_hyp, insertion_cost, deletion_cost, lowest, highest):
+    """
+    Return a lower bound for the cost of any path from ``(0, 0)`` to ``(n_ref, n_hyp)``,
+    that leaves the band of diagonals ``lowest`` to ``highest`` (Ukkonen).
+
+    To leave the band a path has to reach the diagonal ``lowest - 1`` or ``highest + 1``,
+    which takes at least as many insertions/deletions as the distance of that diagonal
+    to the start and to the end diagonal. Substitution costs are assumed to be non-negative.
+
+    Returns:
+        float: The lower bound, ``inf`` if the band covers the whole matrix.
+    """
+    end_diagonal = n_hyp - n_ref
+    bounds = []
+
+    for diagonal in [lowest - 1, highest + 1]:
+        if -n_ref <= diagonal <= n_hyp:
+            cost = insertion_cost * max(diagonal, 0) + deletion_cost * max(-diagonal, 0)
+            cost += deletion_cost * max(diagonal - end_diagonal, 0) + insertion_cost * max(end_diagonal - diagonal, 0)
+            bounds.append(cost)
+
+    if len(bounds) == 0:
+        return np.inf
+
+    return min(bounds)
@@ -1,7 +1,10 @@
+import numpy as np
+
 from . import utils
+from . import aligner
 
 
-class InvariantSegmentAligner(object):
+class InvariantSegmentAligner(aligner.SegmentAligner):
     """
     Create a segment-based alignment so that within every segment the same labels are active.
     So for example as reference we have a label-list as following.
@@ -60,57 +63,179 @@ class InvariantSegmentAligner(object):
 
         """
 
+        return list(self.iter_align(ref_labels, hyp_labels))
+
+    def iter_align(self, ref_labels, hyp_labels):
+        """
+        Create segment based alignment like :meth:`align`, but yield the segments one after another.
+
+        Args:
+            ref_labels (list): The list with reference labels.
+            hyp_labels (list): The list with hypothesis labels.
+
+        Returns:
+            generator: A generator yielding Segments in ascending order of time.
+        """
+        return self._iter_segments(ref_labels, hyp_labels)
+
+    def iter_align_masks(self, ref_labels, hyp_labels, value_ids):
+        """
+        Create segment based alignment like :meth:`iter_align`,
+        but additionally every segment carries bitmasks of the active values
+        (``Segment.ref_mask`` and ``Segment.hyp_mask``).
+        Bit ``i`` of a mask is set, if a label with the value with index ``i`` is active in the segment.
+        Overlapping labels of the same value are allowed.
+
+        Args:
+            ref_labels (list): The list with reference labels.
+            hyp_labels (list): The list with hypothesis labels.
+            value_ids (dict): The index (bit) for every value.
+
+        Returns:
+            generator: A generator yielding Segments in ascending order of time.
+
+        Example:
+            >>> ref = [assets.Label('a', 0, 3), assets.Label('b', 2, 4)]
+            >>> hyp = [assets.Label('b', 1, 4)]
+            >>>
+            >>> segments = InvariantSegmentAligner().iter_align_masks(ref, hyp, {'a': 0, 'b': 1})
+            >>> [(x.start, x.end, x.ref_mask, x.hyp_mask) for x in segments]
+            [(0, 1, 1, 0), (1, 2, 1, 2), (2, 3, 3, 2), (3, 4, 2, 2)]
+        """
+        return self._iter_segments(ref_labels, hyp_labels, value_ids=value_ids)
+
+    def _iter_segments(self, ref_labels, hyp_labels, value_ids=None):
         refs = InvariantSegmentAligner.set_absolute_end_of_labels(ref_labels)
         hyps = InvariantSegmentAligner.set_absolute_end_of_labels(hyp_labels)
 
-        events = InvariantSegmentAligner.create_event_list(refs, hyps, time_threshold=0.01)
+        labels = refs + hyps
+        num_refs = len(refs)
+        times, order, group_starts = InvariantSegmentAligner.sort_events(refs, hyps, time_threshold=0.01)
+
+        is_group_start = [False] * len(order)
+
+        for position in group_starts[:-1]:
+            is_group_start[position] = True
+
+        # Active labels by index, ordered by the time they got active
+        current_ref = {}
+        current_hyp = {}
+
+        with_masks = value_ids is not None
 
-        current_ref = []
-        current_hyp = []
+        if with_masks:
+            label_value_ids = [value_ids[label.value] for label in labels]
+
+            # Number of active labels per value, the bit of a value is set as long as it is not zero
+            ref_counts = [0] * len(value_ids)
+            hyp_counts = [0] * len(value_ids)
+            masks = [0, 0]
 
         current_start = 0
-        segments = []
 
-        # At every event the current ref/hyp lists are updated and a new segment created.
-        for index, event in enumerate(events):
-            time = event[0]
-            sub_events = event[1]
+        # At every group of events the current ref/hyp labels are updated and a new segment created.
+        for position, event in enumerate(order):
+            if is_group_start[position]:
+                time = times[event]
+
+                if position > 0:
+                    new_segment = utils.Segment(current_start, time)
+                    new_segment.ref = list(current_ref.values())
+                    new_segment.hyp = list(current_hyp.values())
+
+                    if with_masks:
+                        new_segment.ref_mask = masks[0]
+                        new_segment.hyp_mask = masks[1]
+
+                    yield new_segment
 
-            if index == 0:
                 current_start = time
 
-                # Add all labels that are active from the beginning
-                for sub_event in sub_events:
-                    if sub_event[2] == 0:
-                        current_ref.append(sub_event[3])
-                    else:
-                        current_hyp.append(sub_event[3])
+            # Remove or Add labels to keep track of current active labels
+            label_index = event >> 1
+            is_ref = label_index < num_refs
+            current = current_ref if is_ref else current_hyp
+
+            if event & 1:
+                del current[label_index]
             else:
-                new_segment = utils.Segment(current_start, time)
-                new_segment.ref = list(current_ref)
-                new_segment.hyp = list(current_hyp)
-                segments.append(new_segment)
+                current[label_index] = labels[label_index]
 
-                current_start = time
+            if with_masks:
+                value_id = label_value_ids[label_index]
+                counts = ref_counts if is_ref else hyp_counts
+                mask_index = 0 if is_ref else 1
+
+                if event & 1:
+                    counts[value_id] -= 1
+
+                    if counts[value_id] == 0:
+                        masks[mask_index] &= ~(1 << value_id)
+                else:
+                    counts[value_id] += 1
+                    masks[mask_index] |= 1 << value_id
+
+    @staticmethod
+    def sort_events(ref_labels, hyp_labels, time_threshold=0.01):
+        """
+        Sort the start and end events of all labels and group the ones that occur at the same time.
+        This is the array-based equivalent of :meth:`create_event_list`.
+
+        Arguments:
+            ref_labels (list): Reference labels.
+            hyp_labels (list): Hypothesis labels.
+            time_threshold (float): If two event times are closer than this threshold they belong to the same group.
 
-                # Remove or Add labels to keep track of current active labels
-                for sub_event in sub_events:
-                    is_start = sub_event[1] == 'S'
-                    is_ref = sub_event[2] == 0
-                    label = sub_event[3]
-
-                    if is_start:
-                        if is_ref:
-                            current_ref.append(label)
-                        else:
-                            current_hyp.append(label)
-                    else:
-                        if is_ref:
-                            current_ref.remove(label)
-                        else:
-                            current_hyp.remove(label)
-
-        return segments
+        Returns:
+            tuple: A tuple ``(times, order, group_starts)``.
+            There are two events for every label in ``ref_labels + hyp_labels``,
+            the start event at index ``2 * label_index`` and the end event at index ``2 * label_index + 1``.
+            ``times`` is a list with the time of every event.
+            ``order`` is a list with the indices of the events in sorted order.
+            ``group_starts`` is a list with the positions in ``order``, where a group of events starts,
+            followed by ``len(order)``.
+        """
+        labels = list(ref_labels) + list(hyp_labels)
+        num_events = 2 * len(labels)
+
+        times = [time for label in labels for time in (label.start, label.end)]
+
+        if num_events == 0:
+            return times, [], [0]
+
+        time_array = np.array(times, dtype=float)
+        starts = time_array[0::2]
+        ends = time_array[1::2]
+
+        label_indices = np.arange(num_events) // 2
+        is_start = (np.arange(num_events) % 2 == 0).astype(int)
+        is_hyp = (label_indices >= len(ref_labels)).astype(int)
+        _, value_ranks = np.unique([label.value.lower() for label in labels], return_inverse=True)
+
+        by_time = np.argsort(time_array, kind='stable')
+        sorted_times = time_array[by_time]
+
+        is_new_group = np.ones(num_events, dtype=bool)
+        is_new_group[1:] = ~(np.abs(np.diff(sorted_times)) < time_threshold)
+        groups = np.cumsum(is_new_group)
+
+        # Within a group the events are ordered by time, type (end before start),
+        # ref before hyp and the label (start, end, value).
+        by_label = label_indices[by_time]
+        keys = (
+            np.arange(num_events),
+            value_ranks[by_label],
+            ends[by_label],
+            starts[by_label],
+            is_hyp[by_time],
+            is_start[by_time],
+            sorted_times,
+            groups
+        )
+        order = by_time[np.lexsort(keys)]
+        group_starts = np.append(np.flatnonzero(is_new_group), num_events)
+
+        return times, order.tolist(), group_starts.tolist()
 
     @staticmethod
     def create_event_list(ref_labels, hyp_labels, time_threshold=0.01):
@@ -127,36 +252,28 @@ class InvariantSegmentAligner(object):
             list: List of list of tuples. Every tuple contains a time, type (start or end), ll_index (ref/hyp) and
             the label which is responsible for the event. It is sorted ascending by time.
         """
-        events = []
-
-        for label in ref_labels:
-            events.append((label.start, 'S', 0, label))
-            events.append((label.end, 'E', 0, label))
+        ref_labels = list(ref_labels)
+        hyp_labels = list(hyp_labels)
+        labels = ref_labels + hyp_labels
 
-        for label in hyp_labels:
-            events.append((label.start, 'S', 1, label))
-            events.append((label.end, 'E', 1, label))
+        times, order, group_starts = InvariantSegmentAligner.sort_events(
+            ref_labels, hyp_labels, time_threshold=time_threshold
+        )
 
-        events = sorted(events, key=lambda x: x[0])
         time_grouped = []
-        current_group = (events[0][0], [events[0]])
 
-        for i in range(1, len(events)):
-            if abs(events[i][0] - events[i - 1][0]) < time_threshold:
-                current_group[1].append(events[i])
-            else:
-                current_group = (
-                    current_group[0],
-                    sorted(current_group[1])
-                )
-                time_grouped.append(current_group)
-                current_group = (events[i][0], [events[i]])
-
-        current_group = (
-            current_group[0],
-            sorted(current_group[1])
-        )
-        time_grouped.append(current_group)
+        for index in range(len(group_starts) - 1):
+            group_events = order[group_starts[index]:group_starts[index + 1]]
+            group = []
+
+            for event in group_events:
+                label_index = event // 2
+                event_type = 'S' if event % 2 == 0 else 'E'
+                ll_index = 0 if label_index < len(ref_labels) else 1
+
+                group.append((times[event], event_type, ll_index, labels[label_index]))
+
+            time_grouped.append((times[group_events[0]], group))
 
         return time_grouped
 
@@ -176,7 +293,7 @@ class InvariantSegmentAligner(object):
             if label.end <= label.start:
                 raise ValueError('Label-end {} is smaller than label-start {}!'.format(label.end, label.start))
 
-            if label.value is not '###############':
+            if label.value != '###############':
                 if label.end == -1:
                     label.end = label.label_list.utterance.end
 
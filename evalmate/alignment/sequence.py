@@ -2,6 +2,7 @@ import numpy as np
 
 from . import utils
 from . import aligner
+from . import edit_distance
 
 
 class LevenshteinAligner(aligner.EventAligner):
@@ -17,13 +18,33 @@ class LevenshteinAligner(aligner.EventAligner):
         substitution_cost (float): Cost for a substitution in the alignment.
         custom_substitution_cost_function (func): Function to calculate substitution cost depending on the elements.
                                                   The function has to take two paramters (ref-label, hyp-label).
+        cost_dtype (np.dtype): Data type of the distance matrix. If ``None``, the narrowest type is selected,
+                               that can hold the costs of the given sequences without overflow.
+                               Integer costs use the smallest sufficient integer type,
+                               float costs and custom substitution costs use ``np.float64``.
+                               If an integer type is given, float costs are truncated.
+        linear_memory_threshold (int): If the distance matrix of two sequences has more cells than this,
+                                       the alignment is computed in linear memory mode.
+                                       Only bands of the matrix with at most ``linear_memory_threshold`` cells
+                                       are held in memory, at the cost of computing parts of the matrix repeatedly.
+                                       The alignment is the same as with the full matrix.
+        band_width (int): If not ``None``, only the cells within ``band_width`` of the diagonal are computed first.
+                          If a path outside of the band could be as cheap as the one found (Ukkonen's bound),
+                          the band is doubled until the result is exact.
+                          The alignment is the same as with the full matrix,
+                          but similar sequences are aligned in near-linear time.
+                          Requires non-negative substitution costs.
     """
 
-    def __init__(self, deletion_cost=3, insertion_cost=3, substitution_cost=4, custom_substitution_cost_function=None):
+    def __init__(self, deletion_cost=3, insertion_cost=3, substitution_cost=4, custom_substitution_cost_function=None,
+                 cost_dtype=None, linear_memory_threshold=25000000, band_width=None):
         self.deletion_cost = deletion_cost
         self.insertion_cost = insertion_cost
         self.substitution_cost = substitution_cost
         self.custom_substitution_cost_function = custom_substitution_cost_function
+        self.cost_dtype = cost_dtype
+        self.linear_memory_threshold = linear_memory_threshold
+        self.band_width = band_width
 
     def align(self, ref_labels, hyp_labels):
         """
@@ -58,76 +79,219 @@ class LevenshteinAligner(aligner.EventAligner):
                 LabelPair(Label('c'), Label('c'))
             ]
         """
-        dist_mat = self._calc_distance_matrix(ref_labels, hyp_labels)
+        ops = self.align_ops(ref_labels, hyp_labels)
+        return self._pairs_from_ops(ops, ref_labels, hyp_labels)
 
-        n_ref = len(ref_labels) + 1
-        n_hyp = len(hyp_labels) + 1
+    def align_ops(self, ref_labels, hyp_labels):
+        """
+        Return the operations of the alignment between the labels of the given label-lists,
+        without creating any label-pairs. This is the same alignment as returned by :meth:`align`.
 
-        aligned_pairs = []
+        Args:
+            ref_labels (list): The list containing labels of the ground truth.
+            hyp_labels (list): The list containing labels of the system output.
 
-        i = n_ref - 1
-        j = n_hyp - 1
-
-        ref_index = len(ref_labels) - 1
-        hyp_index = len(hyp_labels) - 1
-
-        while i > 0 or j > 0:
-            if j > 0 and dist_mat[i, j - 1] + self.insertion_cost == dist_mat[i, j]:
-                pair = utils.LabelPair(None, hyp_labels[hyp_index])
-                aligned_pairs.insert(0, pair)
-                hyp_index -= 1
-                j -= 1
-            elif i > 0 and dist_mat[i - 1, j] + self.deletion_cost == dist_mat[i, j]:
-                pair = utils.LabelPair(ref_labels[ref_index], None)
-                aligned_pairs.insert(0, pair)
-                ref_index -= 1
-                i -= 1
-            else:
-                pair = utils.LabelPair(ref_labels[ref_index], hyp_labels[hyp_index])
-                aligned_pairs.insert(0, pair)
-                ref_index -= 1
-                hyp_index -= 1
-                i -= 1
-                j -= 1
+        Returns:
+            str: A string with one character per aligned pair, in order.
+            ``C`` (correct), ``S`` (substitution), ``I`` (insertion, no ref-label) or ``D`` (deletion, no hyp-label).
 
-        return aligned_pairs
+        Example:
+
+            >>> LevenshteinAligner().align_ops(reference, hypothesis)
+            'CDC'
+        """
+        n_ref = len(ref_labels)
+        n_hyp = len(hyp_labels)
+        substitution_costs = self._substitution_costs(ref_labels, hyp_labels)
+
+        if self.band_width is not None:
+            banded = self._calc_banded_matrix(ref_labels, hyp_labels, substitution_costs, strict=True)
+
+            if banded is not None:
+                band, lowest = banded
+                values = band.reshape(-1)
+                row_stride = band.shape[1] - 1
+                offset = 1 - lowest
+
+                return self._trace_back(values, n_ref, n_hyp, row_stride, substitution_costs, offset=offset)
+
+        if self._use_linear_memory(ref_labels, hyp_labels):
+            return edit_distance.linear_memory_ops(
+                n_ref,
+                n_hyp,
+                substitution_costs,
+                self.insertion_cost,
+                self.deletion_cost,
+                self._cost_dtype(n_ref, n_hyp),
+                self.linear_memory_threshold
+            )
+
+        dist_mat = self._calc_distance_matrix(ref_labels, hyp_labels, substitution_costs=substitution_costs)
+
+        return self._trace_back(dist_mat.reshape(-1), n_ref, n_hyp, n_hyp + 1, substitution_costs)
 
     def calculate_edit_distance(self, ref_labels, hyp_labels):
+        if self.band_width is not None:
+            substitution_costs = self._substitution_costs(ref_labels, hyp_labels)
+            banded = self._calc_banded_matrix(ref_labels, hyp_labels, substitution_costs, strict=False)
+
+            if banded is not None:
+                band, lowest = banded
+                return band[len(ref_labels), len(hyp_labels) - len(ref_labels) - lowest + 1]
+
+        if self._use_linear_memory(ref_labels, hyp_labels):
+            dtype = self._cost_dtype(len(ref_labels), len(hyp_labels))
+            top_row = (np.arange(len(hyp_labels) + 1) * self.insertion_cost).astype(dtype)
+
+            row = edit_distance.last_row(
+                top_row,
+                0,
+                len(ref_labels),
+                self._substitution_costs(ref_labels, hyp_labels),
+                self.insertion_cost,
+                self.deletion_cost,
+                self.linear_memory_threshold
+            )
+
+            return row[-1]
+
         dist_mat = self._calc_distance_matrix(ref_labels, hyp_labels)
 
         return dist_mat[len(ref_labels), len(hyp_labels)]
 
-    def _calc_distance_matrix(self, ref_labels, hyp_labels):
-        """ Calculate the distance matrix between two sequences. """
-        n_ref = len(ref_labels) + 1
-        n_hyp = len(hyp_labels) + 1
+    def _use_linear_memory(self, ref_labels, hyp_labels):
+        """ Return ``True`` if the distance matrix of the given sequences exceeds the threshold. """
+        return (len(ref_labels) + 1) * (len(hyp_labels) + 1) > self.linear_memory_threshold
+
+    def _trace_back(self, values, n_ref, n_hyp, row_stride, substitution_costs, offset=0):
+        ops, _ = edit_distance.trace_back(
+            values,
+            n_ref,
+            n_hyp,
+            row_stride,
+            substitution_costs.ref_ids.tolist(),
+            substitution_costs.hyp_ids.tolist(),
+            self.insertion_cost,
+            self.deletion_cost,
+            offset=offset
+        )
+
+        return ops
+
+    def _calc_banded_matrix(self, ref_labels, hyp_labels, substitution_costs, strict=True):
+        """
+        Calculate the distance matrix within a band around the diagonal.
+        If a path outside of the band could be cheaper (or as cheap if ``strict``), the band is widened once,
+        so that no path outside of it can be as cheap as the path found within the first band.
+        Only if no path outside is as cheap, the path traced back in the band is the same as in the full matrix.
+
+        Returns:
+            tuple: The band and its lowest diagonal (see :func:`edit_distance.banded_matrix`).
+            ``None`` if the band would cover the full matrix or more cells than ``linear_memory_threshold``.
+        """
+        n_ref = len(ref_labels)
+        n_hyp = len(hyp_labels)
+
+        # Unreachable cells need a value higher than any distance
+        dtype = self._cost_dtype(2 * n_ref, 2 * n_hyp)
+        band_width = max(1, self.band_width)
+
+        while True:
+            lowest, highest = edit_distance.band_limits(n_ref, n_hyp, band_width)
 
-        mat = np.zeros((n_ref, n_hyp), dtype=np.int16)
+            if lowest == -n_ref and highest == n_hyp:
+                return None
 
-        for i in range(1, n_ref):
-            mat[i, 0] = i * self.deletion_cost
+            if (n_ref + 1) * (highest - lowest + 3) > self.linear_memory_threshold:
+                return None
 
-        for j in range(1, n_hyp):
-            mat[0, j] = j * self.insertion_cost
+            band = edit_distance.banded_matrix(
+                n_ref,
+                n_hyp,
+                substitution_costs,
+                self.insertion_cost,
+                self.deletion_cost,
+                dtype,
+                lowest,
+                highest
+            )
 
-        for i in range(1, n_ref):
-            for j in range(1, n_hyp):
-                sub_cost = self._get_substitution_cost(ref_labels[i - 1], hyp_labels[j - 1])
+            distance = band[n_ref, n_hyp - n_ref - lowest + 1]
+            bound = edit_distance.outside_band_cost(
+                n_ref,
+                n_hyp,
+                self.insertion_cost,
+                self.deletion_cost,
+                lowest,
+                highest
+            )
 
-                ops = [
-                    mat[i - 1, j - 1] + sub_cost,  # correct / substitution
-                    mat[i, j - 1] + self.insertion_cost,  # insertion
-                    mat[i - 1, j] + self.deletion_cost  # deletion
-                ]
+            if distance < bound or (not strict and distance == bound):
+                return band, lowest
+
+            # The distance within the band is an upper bound for the real distance,
+            # so the band is widened until no path outside of it can be as cheap.
+            while bound <= distance and (lowest > -n_ref or highest < n_hyp):
+                band_width *= 2
+                lowest, highest = edit_distance.band_limits(n_ref, n_hyp, band_width)
+                bound = edit_distance.outside_band_cost(
+                    n_ref,
+                    n_hyp,
+                    self.insertion_cost,
+                    self.deletion_cost,
+                    lowest,
+                    highest
+                )
+
+    @staticmethod
+    def _pairs_from_ops(ops, ref_labels, hyp_labels):
+        """ Create the label-pairs for the given alignment operations in a single pass. """
+        aligned_pairs = []
+        ref_iter = iter(ref_labels)
+        hyp_iter = iter(hyp_labels)
+
+        for op in ops:
+            if op == 'I':
+                aligned_pairs.append(utils.LabelPair(None, next(hyp_iter)))
+            elif op == 'D':
+                aligned_pairs.append(utils.LabelPair(next(ref_iter), None))
+            else:
+                aligned_pairs.append(utils.LabelPair(next(ref_iter), next(hyp_iter)))
+
+        return aligned_pairs
+
+    def _substitution_costs(self, ref_labels, hyp_labels):
+        return edit_distance.SubstitutionCosts(
+            ref_labels,
+            hyp_labels,
+            self.substitution_cost,
+            custom_function=self.custom_substitution_cost_function
+        )
+
+    def _calc_distance_matrix(self, ref_labels, hyp_labels, substitution_costs=None):
+        """ Calculate the distance matrix between two sequences. """
+        if substitution_costs is None:
+            substitution_costs = self._substitution_costs(ref_labels, hyp_labels)
 
-                mat[i, j] = min(ops)
+        return edit_distance.distance_matrix(
+            len(ref_labels),
+            len(hyp_labels),
+            substitution_costs,
+            self.insertion_cost,
+            self.deletion_cost,
+            dtype=self._cost_dtype(len(ref_labels), len(hyp_labels))
+        )
 
-        return mat
+    def _cost_dtype(self, n_ref, n_hyp):
+        """ Return the data type to use for a distance matrix of the given size. """
+        if self.cost_dtype is not None:
+            return self.cost_dtype
 
-    def _get_substitution_cost(self, ref_element, hyp_element):
-        if ref_element.value == hyp_element.value:
-            return 0
-        elif self.custom_substitution_cost_function is None:
-            return self.substitution_cost
-        else:
-            return self.custom_substitution_cost_function(ref_element, hyp_element)
+        return edit_distance.select_dtype(
+            n_ref,
+            n_hyp,
+            self.insertion_cost,
+            self.deletion_cost,
+            self.substitution_cost,
+            custom_costs=self.custom_substitution_cost_function is not None
+        )
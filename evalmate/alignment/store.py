@@ -0,0 +1,596 @@
+import collections.abc
+
+from audiomate import annotations
+import numpy as np
+
+from . import edit_distance
+from . import utils
+
+COLUMNS = [
+    ('ops', np.uint8),
+    ('ref_value_ids', np.int32),
+    ('hyp_value_ids', np.int32),
+    ('ref_indices', np.int32),
+    ('hyp_indices', np.int32),
+    ('ref_starts', np.float64),
+    ('ref_ends', np.float64),
+    ('hyp_starts', np.float64),
+    ('hyp_ends', np.float64)
+]
+
+
+def _column_property(name, doc):
+    def getter(self):
+        return self._column(name)
+
+    return property(getter, doc=doc)
+
+
+class AlignmentStore(object):
+    """
+    Columnar storage of the label-to-label alignments of multiple utterances.
+
+    Instead of a list of :class:`LabelPair` per utterance, every aligned pair is stored
+    as an entry in a set of arrays (struct of arrays). The pairs of all utterances are stored one after another,
+    ``utt_offsets`` defines which entries belong to which utterance.
+    If the ref or hyp label of a pair is missing, the value-id and index is ``-1``
+    and the start and end is ``nan``.
+
+    The aligned pairs are available as :class:`LabelPair` via :attr:`label_pairs` and :attr:`utt_to_label_pairs`.
+    The pairs are created on access, but contain the original label objects that were added.
+    Only if the store was created from arrays (e.g. loaded from a file),
+    the labels are created from the stored values and times, so they are equal to the original labels,
+    but not the same objects.
+
+    Attributes:
+        utt_ids (list): The ids of the utterances in the order they were added.
+        values (list): All values that occur in the alignments. The index of a value is its value-id.
+        value_ids (dict): The value-id for every value.
+
+    Example:
+        >>> store = AlignmentStore()
+        >>> store.append('utt-1', LevenshteinAligner().align(ref_labels, hyp_labels), ref_labels, hyp_labels)
+        >>> store.ops
+        array([67, 67, 83, 73], dtype=uint8)
+        >>> store.utt_to_label_pairs['utt-1']
+        [LabelPair(...), ...]
+    """
+
+    def __init__(self):
+        self.utt_ids = []
+        self.values = []
+        self.value_ids = {}
+
+        self._utt_positions = {}
+        self._utt_lengths = []
+        self._utt_labels = {}
+        self._chunks = []
+        self._columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS}
+        self._utt_offsets = np.zeros(1, dtype=np.int64)
+
+    ops = _column_property('ops', 'np.ndarray: The operation of every pair (``ord`` of ``C``, ``S``, ``I``, ``D``).')
+    ref_value_ids = _column_property('ref_value_ids', 'np.ndarray: The value-id of the ref label of every pair.')
+    hyp_value_ids = _column_property('hyp_value_ids', 'np.ndarray: The value-id of the hyp label of every pair.')
+    ref_indices = _column_property('ref_indices', 'np.ndarray: The index of the ref label within the ref labels '
+                                                  'of the utterance (``-1`` if unknown).')
+    hyp_indices = _column_property('hyp_indices', 'np.ndarray: The index of the hyp label within the hyp labels '
+                                                  'of the utterance (``-1`` if unknown).')
+    ref_starts = _column_property('ref_starts', 'np.ndarray: The start of the ref label of every pair.')
+    ref_ends = _column_property('ref_ends', 'np.ndarray: The end of the ref label of every pair.')
+    hyp_starts = _column_property('hyp_starts', 'np.ndarray: The start of the hyp label of every pair.')
+    hyp_ends = _column_property('hyp_ends', 'np.ndarray: The end of the hyp label of every pair.')
+
+    @property
+    def utt_offsets(self):
+        """
+        np.ndarray: The index of the first pair of every utterance (in the order of ``utt_ids``),
+        followed by the total number of pairs.
+        """
+        self._merge_chunks()
+        return self._utt_offsets
+
+    @property
+    def num_pairs(self):
+        """ int: Number of aligned pairs of all utterances. """
+        return int(self.utt_offsets[-1])
+
+    @property
+    def label_pairs(self):
+        """ LabelPairSequence: Sequence of the aligned pairs of all utterances, created on access. """
+        return LabelPairSequence(self, 0, self.num_pairs)
+
+    @property
+    def utt_to_label_pairs(self):
+        """ UtteranceAlignments: Mapping of utterance-ids to the list of aligned pairs, created on access. """
+        return UtteranceAlignments(self)
+
+    @classmethod
+    def from_label_pairs(cls, utt_to_label_pairs):
+        """
+        Create a store from a dict with a list of :class:`LabelPair` for every utterance.
+
+        Arguments:
+            utt_to_label_pairs (dict): The aligned pairs of every utterance.
+
+        Returns:
+            AlignmentStore: The store.
+        """
+        store = cls()
+
+        for utt_idx, pairs in utt_to_label_pairs.items():
+            store.append(utt_idx, pairs)
+
+        return store
+
+    @classmethod
+    def from_arrays(cls, utt_ids, values, arrays):
+        """
+        Create a store from arrays, as returned by :meth:`arrays`.
+
+        Arguments:
+            utt_ids (list): The utterance-ids.
+            values (list): The values, where the index is the value-id.
+            arrays (dict): The arrays (``utt_offsets`` and all columns).
+
+        Returns:
+            AlignmentStore: The store.
+        """
+        store = cls()
+
+        store.utt_ids = list(utt_ids)
+        store.values = list(values)
+        store.value_ids = {value: index for index, value in enumerate(store.values)}
+        store._utt_positions = {utt_idx: index for index, utt_idx in enumerate(store.utt_ids)}
+
+        store._utt_offsets = np.asarray(arrays['utt_offsets'], dtype=np.int64)
+        store._utt_lengths = np.diff(store._utt_offsets).tolist()
+
+        if len(store.utt_ids) != len(store._utt_lengths):
+            raise ValueError('The number of utterance-ids does not match the offsets.')
+
+        for name, dtype in COLUMNS:
+            store._columns[name] = np.asarray(arrays[name], dtype=dtype)
+
+        return store
+
+    def arrays(self):
+        """
+        Return all arrays of the store (``utt_offsets`` and all columns).
+
+        Returns:
+            dict: Dictionary with the name of the array as key.
+        """
+        self._merge_chunks()
+
+        arrays = {'utt_offsets': self._utt_offsets}
+        arrays.update(self._columns)
+
+        return arrays
+
+    def append(self, utt_idx, pairs, ref_labels=None, hyp_labels=None):
+        """
+        Add the alignment of an utterance as a list of :class:`LabelPair`.
+        Pairs without ref and hyp label are ignored.
+
+        Arguments:
+            utt_idx (str): The utterance-id.
+            pairs (list): The aligned pairs.
+            ref_labels (list): The reference labels that were aligned.
+                               If given, the index of every ref label within this list is stored.
+            hyp_labels (list): The hypothesis labels that were aligned.
+                               If given, the index of every hyp label within this list is stored.
+        """
+        ref_positions = AlignmentStore._positions(ref_labels)
+        hyp_positions = AlignmentStore._positions(hyp_labels)
+
+        refs = []
+        hyps = []
+
+        for pair in pairs:
+            if pair.ref is not None or pair.hyp is not None:
+                refs.append(pair.ref)
+                hyps.append(pair.hyp)
+
+        ref_columns = self._label_columns(refs, ref_positions)
+        hyp_columns = self._label_columns(hyps, hyp_positions)
+
+        self._add(utt_idx, ref_columns, hyp_columns, refs, hyps)
+
+    def append_ops(self, utt_idx, ops, ref_labels, hyp_labels):
+        """
+        Add the alignment of an utterance as edit operations of a sequence alignment
+        (see :meth:`EventAligner.align_ops`), without creating label-pairs.
+        The ref and hyp labels have to be in the order they were aligned.
+
+        Arguments:
+            utt_idx (str): The utterance-id.
+            ops (str): The operations of the alignment (``C``, ``S``, ``I``, ``D``).
+            ref_labels (list): The reference labels that were aligned.
+            hyp_labels (list): The hypothesis labels that were aligned.
+        """
+        op_codes = np.frombuffer(ops.encode('ascii'), dtype=np.uint8)
+        has_ref = op_codes != edit_distance.OP_INSERTION
+        has_hyp = op_codes != edit_distance.OP_DELETION
+
+        if np.count_nonzero(has_ref) != len(ref_labels) or np.count_nonzero(has_hyp) != len(hyp_labels):
+            raise ValueError('The operations do not match the number of labels.')
+
+        ref_indices = np.where(has_ref, np.cumsum(has_ref) - 1, -1)
+        hyp_indices = np.where(has_hyp, np.cumsum(has_hyp) - 1, -1)
+
+        self.append_indices(utt_idx, ref_indices, hyp_indices, ref_labels, hyp_labels)
+
+    def append_indices(self, utt_idx, ref_indices, hyp_indices, ref_labels, hyp_labels):
+        """
+        Add the alignment of an utterance as indices of the aligned labels, without creating label-pairs.
+        For every pair there is the index of the ref label in ``ref_labels``
+        and the index of the hyp label in ``hyp_labels`` (``-1`` if there is no ref/hyp label).
+
+        Arguments:
+            utt_idx (str): The utterance-id.
+            ref_indices (list): The index of the ref label of every pair.
+            hyp_indices (list): The index of the hyp label of every pair.
+            ref_labels (list): The reference labels that were aligned.
+            hyp_labels (list): The hypothesis labels that were aligned.
+        """
+        ref_indices = np.asarray(ref_indices, dtype=np.int32)
+        hyp_indices = np.asarray(hyp_indices, dtype=np.int32)
+
+        if ref_indices.shape != hyp_indices.shape:
+            raise ValueError('There has to be a ref and a hyp index for every pair.')
+
+        ref_columns = self._gather(self._label_columns(ref_labels, None, ordered=True), ref_indices)
+        hyp_columns = self._gather(self._label_columns(hyp_labels, None, ordered=True), hyp_indices)
+
+        # Index -1 selects the appended None
+        ref_lookup = list(ref_labels) + [None]
+        hyp_lookup = list(hyp_labels) + [None]
+
+        self._add(utt_idx, ref_columns, hyp_columns,
+                  [ref_lookup[index] for index in ref_indices.tolist()],
+                  [hyp_lookup[index] for index in hyp_indices.tolist()])
+
+    def extend(self, other):
+        """
+        Add the alignments of all utterances of another store.
+
+        Arguments:
+            other (AlignmentStore): The store with the alignments to add.
+                                    It must not contain an utterance that is already in this store.
+        """
+        duplicates = [utt_idx for utt_idx in other.utt_ids if utt_idx in self._utt_positions]
+
+        if len(duplicates) > 0:
+            raise ValueError('There is already an alignment for utterance {}.'.format(duplicates[0]))
+
+        arrays = other.arrays()
+
+        # Map the value-ids of the other store to the value-ids of this store, -1 stays -1
+        id_map = np.array([self._value_id(value) for value in other.values] + [-1], dtype=np.int32)
+
+        chunk = {name: arrays[name] for name, _ in COLUMNS}
+        chunk['ref_value_ids'] = id_map[arrays['ref_value_ids']]
+        chunk['hyp_value_ids'] = id_map[arrays['hyp_value_ids']]
+
+        self._chunks.append(chunk)
+        self._utt_labels.update(other._utt_labels)
+
+        for utt_idx, length in zip(other.utt_ids, np.diff(arrays['utt_offsets']).tolist()):
+            self._utt_positions[utt_idx] = len(self.utt_ids)
+            self.utt_ids.append(utt_idx)
+            self._utt_lengths.append(length)
+
+    def remove(self, utt_ids):
+        """
+        Remove the alignments of the given utterances.
+        Values that don't occur in the remaining alignments are removed as well,
+        so the value-ids may change.
+
+        Arguments:
+            utt_ids (list): The ids of the utterances to remove.
+
+        Returns:
+            AlignmentStore: A new store with the removed alignments.
+        """
+        utt_ids = list(utt_ids)
+        missing = [utt_idx for utt_idx in utt_ids if utt_idx not in self._utt_positions]
+
+        if len(missing) > 0:
+            raise KeyError(missing[0])
+
+        arrays = self.arrays()
+        offsets = arrays['utt_offsets']
+        lengths = np.diff(offsets)
+
+        removed_utts = np.zeros(len(self.utt_ids), dtype=bool)
+        removed_utts[[self._utt_positions[utt_idx] for utt_idx in utt_ids]] = True
+        removed_pairs = np.repeat(removed_utts, lengths)
+
+        removed_offsets = np.concatenate([[0], np.cumsum(lengths[removed_utts])])
+        removed = AlignmentStore.from_arrays(
+            [self.utt_ids[position] for position in np.flatnonzero(removed_utts).tolist()],
+            self.values,
+            dict({name: arrays[name][removed_pairs] for name, _ in COLUMNS}, utt_offsets=removed_offsets)
+        )
+
+        for utt_idx in removed.utt_ids:
+            if utt_idx in self._utt_labels:
+                removed._utt_labels[utt_idx] = self._utt_labels.pop(utt_idx)
+
+        kept = ~removed_pairs
+        columns = {name: arrays[name][kept] for name, _ in COLUMNS}
+
+        # Drop the values, that are not used anymore
+        used = np.zeros(len(self.values) + 1, dtype=bool)
+        used[columns['ref_value_ids']] = True
+        used[columns['hyp_value_ids']] = True
+        used = used[:-1]
+
+        id_map = np.append(np.cumsum(used) - 1, -1).astype(np.int32)
+        columns['ref_value_ids'] = id_map[columns['ref_value_ids']]
+        columns['hyp_value_ids'] = id_map[columns['hyp_value_ids']]
+
+        self.values = [value for value, is_used in zip(self.values, used.tolist()) if is_used]
+        self.value_ids = {value: index for index, value in enumerate(self.values)}
+
+        self.utt_ids = [utt_idx for utt_idx, is_removed in zip(self.utt_ids, removed_utts.tolist()) if not is_removed]
+        self._utt_positions = {utt_idx: index for index, utt_idx in enumerate(self.utt_ids)}
+        self._utt_lengths = lengths[~removed_utts].tolist()
+        self._utt_offsets = np.concatenate([[0], np.cumsum(lengths[~removed_utts])]).astype(np.int64)
+        self._columns = columns
+
+        return removed
+
+    def utterance_range(self, utt_idx):
+        """
+        Return the range of the pairs of the given utterance.
+
+        Arguments:
+            utt_idx (str): The utterance-id.
+
+        Returns:
+            tuple: ``(start, end)`` index of the pairs in the arrays.
+        """
+        position = self._utt_positions[utt_idx]
+        offsets = self.utt_offsets
+
+        return int(offsets[position]), int(offsets[position + 1])
+
+    def failing_utterances(self):
+        """
+        Return a list of utterance-ids, that contain at least one pair that is not correct.
+        """
+        wrong = np.flatnonzero(self.ops != edit_distance.OP_CORRECT)
+        positions = np.unique(np.searchsorted(self.utt_offsets, wrong, side='right') - 1)
+
+        return [self.utt_ids[position] for position in positions.tolist()]
+
+    def create_pairs(self, start, end):
+        """
+        Create the :class:`LabelPair` objects of the pairs in the given index range.
+        The pairs contain the original label objects, if they are known (see :class:`AlignmentStore`).
+
+        Arguments:
+            start (int): Index of the first pair.
+            end (int): Index after the last pair.
+
+        Returns:
+            list: List of :class:`LabelPair`.
+        """
+        offsets = self.utt_offsets
+        refs = []
+        hyps = []
+
+        # The range may span multiple utterances, the labels are looked up per utterance
+        position = int(np.searchsorted(offsets, start, side='right')) - 1
+
+        while start < end:
+            utt_start = int(offsets[position])
+            utt_end = min(int(offsets[position + 1]), end)
+            known = self._utt_labels.get(self.utt_ids[position])
+
+            if known is None:
+                refs.extend(self._create_labels(self.ref_value_ids, self.ref_starts, self.ref_ends, start, utt_end))
+                hyps.extend(self._create_labels(self.hyp_value_ids, self.hyp_starts, self.hyp_ends, start, utt_end))
+            else:
+                refs.extend(known[0][start - utt_start:utt_end - utt_start])
+                hyps.extend(known[1][start - utt_start:utt_end - utt_start])
+
+            start = utt_end
+            position += 1
+
+        return [utils.LabelPair(ref, hyp) for ref, hyp in zip(refs, hyps)]
+
+    def _create_labels(self, value_ids, starts, ends, start, end):
+        values = self.values
+        labels = []
+
+        for value_id, label_start, label_end in zip(value_ids[start:end].tolist(),
+                                                    starts[start:end].tolist(),
+                                                    ends[start:end].tolist()):
+            if value_id < 0:
+                labels.append(None)
+            else:
+                labels.append(annotations.Label(values[value_id], label_start, label_end))
+
+        return labels
+
+    @staticmethod
+    def _positions(labels):
+        if labels is None:
+            return None
+
+        return {id(label): index for index, label in enumerate(labels)}
+
+    def _value_id(self, value):
+        value_id = self.value_ids.get(value)
+
+        if value_id is None:
+            value_id = len(self.values)
+            self.value_ids[value] = value_id
+            self.values.append(value)
+
+        return value_id
+
+    def _label_columns(self, labels, positions, ordered=False):
+        """
+        Return the value-ids, indices, starts and ends of the given labels (``None`` for missing labels).
+        If ``ordered``, the index of a label is its position in ``labels``.
+        """
+        value_ids = []
+        indices = []
+        starts = []
+        ends = []
+
+        for index, label in enumerate(labels):
+            if label is None:
+                value_ids.append(-1)
+                indices.append(-1)
+                starts.append(np.nan)
+                ends.append(np.nan)
+            else:
+                value_ids.append(self._value_id(label.value))
+                starts.append(label.start)
+                ends.append(label.end)
+
+                if ordered:
+                    indices.append(index)
+                elif positions is None:
+                    indices.append(-1)
+                else:
+                    indices.append(positions.get(id(label), -1))
+
+        return (
+            np.array(value_ids, dtype=np.int32),
+            np.array(indices, dtype=np.int32),
+            np.array(starts, dtype=np.float64),
+            np.array(ends, dtype=np.float64)
+        )
+
+    @staticmethod
+    def _gather(columns, indices):
+        """ Select the columns of the labels with the given indices (``-1`` for missing labels). """
+        present = indices >= 0
+        selected = indices[present]
+
+        out = (
+            np.full(indices.size, -1, dtype=np.int32),
+            np.full(indices.size, -1, dtype=np.int32),
+            np.full(indices.size, np.nan, dtype=np.float64),
+            np.full(indices.size, np.nan, dtype=np.float64)
+        )
+
+        for target, source in zip(out, columns):
+            target[present] = source[selected]
+
+        return out
+
+    def _add(self, utt_idx, ref_columns, hyp_columns, ref_labels, hyp_labels):
+        if utt_idx in self._utt_positions:
+            raise ValueError('There is already an alignment for utterance {}.'.format(utt_idx))
+
+        ref_value_ids, ref_indices, ref_starts, ref_ends = ref_columns
+        hyp_value_ids, hyp_indices, hyp_starts, hyp_ends = hyp_columns
+
+        # The operation is defined by the values, as in ``confusion.create_from_label_pairs``
+        ops = np.full(ref_value_ids.size, edit_distance.OP_SUBSTITUTION, dtype=np.uint8)
+        ops[ref_value_ids == hyp_value_ids] = edit_distance.OP_CORRECT
+        ops[ref_value_ids < 0] = edit_distance.OP_INSERTION
+        ops[hyp_value_ids < 0] = edit_distance.OP_DELETION
+
+        self._chunks.append({
+            'ops': ops,
+            'ref_value_ids': ref_value_ids,
+            'hyp_value_ids': hyp_value_ids,
+            'ref_indices': ref_indices,
+            'hyp_indices': hyp_indices,
+            'ref_starts': ref_starts,
+            'ref_ends': ref_ends,
+            'hyp_starts': hyp_starts,
+            'hyp_ends': hyp_ends
+        })
+
+        self._utt_labels[utt_idx] = (ref_labels, hyp_labels)
+        self._utt_positions[utt_idx] = len(self.utt_ids)
+        self.utt_ids.append(utt_idx)
+        self._utt_lengths.append(ops.size)
+
+    def _merge_chunks(self):
+        """ Concatenate the arrays of the utterances added since the last access. """
+        if len(self._chunks) == 0:
+            return
+
+        for name, _ in COLUMNS:
+            parts = [self._columns[name]] + [chunk[name] for chunk in self._chunks]
+            self._columns[name] = np.concatenate(parts)
+
+        lengths = np.array(self._utt_lengths[len(self._utt_offsets) - 1:], dtype=np.int64)
+        self._utt_offsets = np.append(self._utt_offsets, self._utt_offsets[-1] + np.cumsum(lengths))
+        self._chunks = []
+
+    def _column(self, name):
+        self._merge_chunks()
+        return self._columns[name]
+
+
+class LabelPairSequence(collections.abc.Sequence):
+    """
+    Read-only sequence of the aligned pairs within a range of an :class:`AlignmentStore`.
+    The :class:`LabelPair` objects are created on access.
+
+    Arguments:
+        store (AlignmentStore): The store containing the pairs.
+        start (int): Index of the first pair.
+        end (int): Index after the last pair.
+    """
+
+    CHUNK_SIZE = 4096
+
+    def __init__(self, store, start, end):
+        self.store = store
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, end, step = index.indices(len(self))
+            return self.store.create_pairs(self.start + start, self.start + end)[::step]
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError('Label-pair index out of range')
+
+        return self.store.create_pairs(self.start + index, self.start + index + 1)[0]
+
+    def __iter__(self):
+        for chunk_start in range(self.start, self.end, self.CHUNK_SIZE):
+            chunk_end = min(chunk_start + self.CHUNK_SIZE, self.end)
+            yield from self.store.create_pairs(chunk_start, chunk_end)
+
+
+class UtteranceAlignments(collections.abc.Mapping):
+    """
+    Read-only mapping of utterance-ids to the list of aligned pairs of an :class:`AlignmentStore`.
+    The lists of :class:`LabelPair` are created on access.
+
+    Arguments:
+        store (AlignmentStore): The store containing the pairs.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, utt_idx):
+        start, end = self.store.utterance_range(utt_idx)
+        return self.store.create_pairs(start, end)
+
+    def __iter__(self):
+        return iter(self.store.utt_ids)
+
+    def __len__(self):
+        return len(self.store.utt_ids)
@@ -1,9 +1,12 @@
-import numpy as np
-import scipy
+import collections
 
-from evalmate.utils import label
+import numpy as np
+from scipy import optimize
+from scipy import sparse
+from scipy.sparse import csgraph
 
 from . import utils
+from . import edit_distance
 from . import aligner
 from . import candidates
 
@@ -22,6 +25,8 @@ class BipartiteMatchingAligner(aligner.EventAligner):
     3. From all the pairs and the computed probabilities,
     the best alignment is computed using bipartite matching.
     So that every label only occurs once in the final alignment.
+    The matching is computed separately for every group of labels,
+    that are connected by candidate pairs, which gives the same optimal alignment.
 
     Arguments:
         candidate_finder (CandidateFinder): CandidateFinder to use for finding
@@ -63,70 +68,194 @@ class BipartiteMatchingAligner(aligner.EventAligner):
             Every pair contains one label (event) from the ground truth and
             one from the system output, that are aligned.
             One of them also can be ``None``.
+            The pairs are sorted by the start of the ref label and the start of the hyp label,
+            ties are resolved by the position of the labels in the given lists.
+
+        Note:
+            If multiple matchings have the same total penalty, the chosen one depends
+            on the order of the given labels. To get the same alignment for equal labels,
+            pass them in a defined order (see :meth:`evalmate.alignment.AlignmentCache.canonical_order`).
         """
 
         if len(ref_labels) == 0 and len(hyp_labels) == 0:
             return []
 
         if len(ref_labels) == 0:
-            return [utils.LabelPair(None, x) for x in hyp_labels]
+            return self._sorted_pairs(ref_labels, hyp_labels, [(-1, x) for x in range(len(hyp_labels))])
 
         if len(hyp_labels) == 0:
-            return [utils.LabelPair(x, None) for x in ref_labels]
+            return self._sorted_pairs(ref_labels, hyp_labels, [(x, -1) for x in range(len(ref_labels))])
 
         close_pairs, ref_no_match, hyp_no_match = self.candidate_finder.find(
             ref_labels, hyp_labels
         )
 
-        # Calculate a high penalty for invalid matches
-        invalid_penalty = self.non_overlap_penalty_weight + self.insertion_penalty + self.deletion_penalty
+        n_ref = len(ref_labels)
+        n_hyp = len(hyp_labels)
 
-        # Cost matrix: Add possible insertion/deletion rows/cols
-        size = len(ref_labels) + len(hyp_labels)
-        cost = np.full((size, size), invalid_penalty).astype(np.float)
-        cost[len(ref_labels):, :] = self.insertion_penalty
-        cost[:, len(hyp_labels):] = self.deletion_penalty
+        pairs = np.array(close_pairs, dtype=int).reshape(-1, 2)
+        penalties = self._pair_penalties(ref_labels, hyp_labels, pairs)
 
-        for pair in close_pairs:
-            ref = ref_labels[pair[0]]
-            hyp = hyp_labels[pair[1]]
-            penalty = 0
+        # Aligning a pair (instead of deleting the ref and inserting the hyp)
+        # changes the total cost by ``penalty - insertion_penalty``.
+        # A pair that is not a candidate would add ``non_overlap_penalty_weight + deletion_penalty``,
+        # so if this is positive, only candidates are aligned and every connected component
+        # of the candidates can be solved on its own.
+        if self.non_overlap_penalty_weight + self.deletion_penalty > 0:
+            components = self._candidate_components(pairs, n_ref, n_hyp)
+        else:
+            components = np.zeros(n_ref + n_hyp, dtype=int)
 
-            if ref.value != hyp.value:
-                penalty += self.substitution_penalty
+        ref_components = collections.defaultdict(list)
+        hyp_components = collections.defaultdict(list)
+        pair_components = collections.defaultdict(list)
 
-            penalty += self.non_overlap_penalty_weight * (1 - label.overlap_percentage(ref, hyp))
+        for ref_index, component in enumerate(components[:n_ref].tolist()):
+            ref_components[component].append(ref_index)
 
-            cost[pair[0], pair[1]] = penalty
+        for hyp_index, component in enumerate(components[n_ref:].tolist()):
+            hyp_components[component].append(hyp_index)
 
-        row_ind, col_ind = scipy.optimize.linear_sum_assignment(cost)
+        for pair_index, component in enumerate(components[pairs[:, 0]].tolist()):
+            pair_components[component].append(pair_index)
 
-        matching = []
+        ref_to_hyp = {}
+
+        for component, refs in ref_components.items():
+            hyps = hyp_components[component]
+
+            if len(hyps) > 0:
+                component_pairs = pair_components[component]
+                matched = self._align_component(
+                    refs, hyps, pairs[component_pairs], penalties[component_pairs]
+                )
+                ref_to_hyp.update(matched)
+
+        index_pairs = [(ref_index, ref_to_hyp.get(ref_index, -1)) for ref_index in range(n_ref)]
+        hyp_matched = set(ref_to_hyp.values())
+        index_pairs.extend((-1, hyp_index) for hyp_index in range(n_hyp) if hyp_index not in hyp_matched)
+
+        return self._sorted_pairs(ref_labels, hyp_labels, index_pairs)
+
+    @staticmethod
+    def _sorted_pairs(ref_labels, hyp_labels, index_pairs):
+        """
+        Create the label-pairs from tuples of ref-index and hyp-index (``-1`` if missing),
+        sorted by the start of the ref label and the start of the hyp label.
+        A missing label takes the start of the other label of the pair.
+        Ties are resolved by the ref-index and the hyp-index, so the order is deterministic.
+        """
+        def sort_key(index_pair):
+            ref_index, hyp_index = index_pair
+            ref_start = ref_labels[ref_index].start if ref_index >= 0 else hyp_labels[hyp_index].start
+            hyp_start = hyp_labels[hyp_index].start if hyp_index >= 0 else ref_start
+
+            return ref_start, hyp_start, ref_index if ref_index >= 0 else len(ref_labels), hyp_index
+
+        return [
+            utils.LabelPair(ref_labels[ref_index] if ref_index >= 0 else None,
+                            hyp_labels[hyp_index] if hyp_index >= 0 else None)
+            for ref_index, hyp_index in sorted(index_pairs, key=sort_key)
+        ]
+
+    def _pair_penalties(self, ref_labels, hyp_labels, pairs):
+        """
+        Compute the penalty for aligning every given pair of labels.
+        This is the substitution penalty (if the values differ) plus the weighted ratio of the ref-label,
+        that isn't overlapped by the hyp-label (see :func:`evalmate.utils.label.overlap_percentage`).
+
+        Args:
+            ref_labels (list): The list containing labels of the ground truth.
+            hyp_labels (list): The list containing labels of the system output.
+            pairs (np.ndarray): Array with shape ``(n, 2)`` containing
+                                the ref-index and the hyp-index of every pair.
+
+        Returns:
+            np.ndarray: The penalty for every pair.
+        """
+        ref_ids, hyp_ids = edit_distance.encode_values(ref_labels, hyp_labels)
 
-        for i in range(len(row_ind)):
-            ref_ind = row_ind[i]
-            hyp_ind = col_ind[i]
+        ref_starts = np.array([x.start for x in ref_labels], dtype=float)[pairs[:, 0]]
+        ref_ends = np.array([x.end for x in ref_labels], dtype=float)[pairs[:, 0]]
+        ref_durations = np.array([x.duration for x in ref_labels], dtype=float)[pairs[:, 0]]
+        hyp_starts = np.array([x.start for x in hyp_labels], dtype=float)[pairs[:, 1]]
+        hyp_ends = np.array([x.end for x in hyp_labels], dtype=float)[pairs[:, 1]]
 
-            if ref_ind >= len(ref_labels):
-                ref_ind = -1
+        # An end of -1 is replaced by the end of the other label (see ``label.overlap_time``)
+        ref_ends = np.where(ref_ends == -1, hyp_ends, ref_ends)
+        hyp_ends = np.where(hyp_ends == -1, ref_ends, hyp_ends)
+
+        overlap = np.maximum(0, np.minimum(ref_ends, hyp_ends) - np.maximum(ref_starts, hyp_starts))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            overlap_percentage = np.where(ref_durations > 0, overlap / ref_durations, 0)
+
+        penalties = np.where(ref_ids[pairs[:, 0]] != hyp_ids[pairs[:, 1]], float(self.substitution_penalty), 0.0)
+        penalties += self.non_overlap_penalty_weight * (1 - overlap_percentage)
+
+        return penalties
+
+    @staticmethod
+    def _candidate_components(pairs, n_ref, n_hyp):
+        """
+        Return the connected component of every label in the graph of candidate pairs.
+        The first ``n_ref`` entries are the components of the ref-labels,
+        the following ``n_hyp`` entries the components of the hyp-labels.
+        """
+        size = n_ref + n_hyp
+
+        if len(pairs) == 0:
+            return np.arange(size)
+
+        graph = sparse.coo_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1] + n_ref)),
+            shape=(size, size)
+        )
+
+        _, components = csgraph.connected_components(graph, directed=False)
+        return components
+
+    def _align_component(self, refs, hyps, pairs, penalties):
+        """
+        Compute the optimal matching between the given ref and hyp-labels using bipartite matching.
+
+        Args:
+            refs (list): Indices of the ref-labels to match.
+            hyps (list): Indices of the hyp-labels to match.
+            pairs (np.ndarray): Candidate pairs ``(ref-index, hyp-index)`` between those labels.
+            penalties (np.ndarray): The penalty of every candidate pair.
+
+        Returns:
+            dict: The index of the aligned hyp-label for every aligned ref-label.
+        """
+        n_ref = len(refs)
+        n_hyp = len(hyps)
+
+        ref_pos = {ref_index: i for i, ref_index in enumerate(refs)}
+        hyp_pos = {hyp_index: i for i, hyp_index in enumerate(hyps)}
+
+        # Calculate a high penalty for invalid matches
+        invalid_penalty = self.non_overlap_penalty_weight + self.insertion_penalty + self.deletion_penalty
+
+        # Cost matrix: Add possible insertion/deletion rows/cols
+        size = n_ref + n_hyp
+        cost = np.full((size, size), invalid_penalty, dtype=float)
+        cost[n_ref:, :] = self.insertion_penalty
+        cost[:, n_hyp:] = self.deletion_penalty
 
-            if hyp_ind >= len(hyp_labels):
-                hyp_ind = -1
+        rows = [ref_pos[x] for x in pairs[:, 0].tolist()]
+        cols = [hyp_pos[x] for x in pairs[:, 1].tolist()]
+        cost[rows, cols] = penalties
 
-            if hyp_ind != -1 or ref_ind != -1:
-                if ref_ind >= 0:
-                    ref_label = ref_labels[ref_ind]
-                else:
-                    ref_label = None
+        row_ind, col_ind = optimize.linear_sum_assignment(cost)
 
-                if hyp_ind >= 0:
-                    hyp_label = hyp_labels[hyp_ind]
-                else:
-                    hyp_label = None
+        matched = {}
 
-                matching.append(utils.LabelPair(ref_label, hyp_label))
+        for ref_ind, hyp_ind in zip(row_ind.tolist(), col_ind.tolist()):
+            if ref_ind < n_ref and hyp_ind < n_hyp:
+                matched[refs[ref_ind]] = hyps[hyp_ind]
 
-        return matching
+        return matched
 
 
 class FullMatchingAligner(aligner.EventAligner):
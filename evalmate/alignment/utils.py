@@ -99,6 +99,10 @@ class Segment:
     Attributes:
         ref (Label, list): List of or single reference label in the segment.
         hyp (Label, list): List of or single hypothesis label in the segment.
+        ref_mask (int): Bitmask of the values of the reference labels in the segment,
+                        if created with value indices (see :meth:`InvariantSegmentAligner.iter_align_masks`).
+        hyp_mask (int): Bitmask of the values of the hypothesis labels in the segment,
+                        if created with value indices (see :meth:`InvariantSegmentAligner.iter_align_masks`).
     """
 
     def __init__(self, start, end, ref=None, hyp=None):
@@ -108,6 +112,9 @@ class Segment:
         self.ref = ref
         self.hyp = hyp
 
+        self.ref_mask = None
+        self.hyp_mask = None
+
     @property
     def duration(self):
         return self.end - self.start
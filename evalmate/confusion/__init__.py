@@ -15,12 +15,24 @@ SegmentConfusion
 .. autoclass:: SegmentConfusion
    :members:
 
+SegmentDurationConfusion
+------------------------
+
+.. autoclass:: SegmentDurationConfusion
+   :members:
+
 EventConfusion
 ----------------
 
 .. autoclass:: EventConfusion
    :members:
 
+EventCountConfusion
+-------------------
+
+.. autoclass:: EventCountConfusion
+   :members:
+
 AggregatedConfusion
 -------------------
 
@@ -29,53 +41,156 @@ AggregatedConfusion
 
 """
 
+import collections
+
+import numpy as np
+
+from evalmate.alignment import edit_distance
+
 from .confusion import Confusion  # noqa: F401
 
 from .segment import SegmentConfusion  # noqa: F401
+from .segment import SegmentDurationConfusion  # noqa: F401
 from .event import EventConfusion  # noqa: F401
+from .event import EventCountConfusion  # noqa: F401
 from .aggregation import AggregatedConfusion  # noqa: F401
 
 
-def create_from_segments(segments):
+def create_from_segments(segments, cnf=None, keep_segments=True):
     """
     Create confusion from a list of segments.
     ``self.instances`` will contain the SegmentConfusion for every value occurring in the given segments.
 
     Arguments:
-        segments (list): List of Segments.
+        segments (iterable): List of Segments. Any iterable is accepted,
+                             so the segments can be passed in as they are created (e.g. from a generator).
+        cnf (AggregatedConfusion): If given, the segments are added to this confusion instead of a new one.
+                                   It has to contain only instances of the type given by ``keep_segments``.
+        keep_segments (bool): If ``False``, :class:`SegmentDurationConfusion` instances are created,
+                              which only sum up the durations instead of keeping the segments.
 
     Returns:
         AggregatedConfusion: The confusion.
     """
 
-    cnf = AggregatedConfusion()
+    if cnf is None:
+        cnf = AggregatedConfusion()
+
+    if keep_segments:
+        instance_type = SegmentConfusion
+    else:
+        instance_type = SegmentDurationConfusion
+
+    instances = cnf.instances
 
     for segment in segments:
-        if segment.ref is not None and segment.ref.value not in cnf.instances.keys():
-            cnf.instances[segment.ref.value] = SegmentConfusion(segment.ref.value)
+        ref = segment.ref
+        hyp = segment.hyp
+
+        if ref is not None and ref.value not in instances:
+            instances[ref.value] = instance_type(ref.value)
 
-        if segment.hyp is not None and segment.hyp.value not in cnf.instances.keys():
-            cnf.instances[segment.hyp.value] = SegmentConfusion(segment.hyp.value)
+        if hyp is not None and hyp.value not in instances:
+            instances[hyp.value] = instance_type(hyp.value)
 
-        if segment.ref is None and segment.hyp is None:
+        if ref is None and hyp is None:
             print('Got segment with ref=None and hyp=None, ignoring it!')
 
-        elif segment.ref is None:
-            cnf.instances[segment.hyp.value].insertion_segments.append(segment)
+        elif ref is None:
+            instances[hyp.value].add_insertion(segment)
 
-        elif segment.hyp is None:
-            cnf.instances[segment.ref.value].deletion_segments.append(segment)
+        elif hyp is None:
+            instances[ref.value].add_deletion(segment)
 
-        elif segment.ref.value == segment.hyp.value:
-            cnf.instances[segment.ref.value].correct_segments.append(segment)
+        elif ref.value == hyp.value:
+            instances[ref.value].add_correct(segment)
 
         else:
-            cnf.instances[segment.ref.value].substitution_segments[segment.hyp.value].append(segment)
-            cnf.instances[segment.hyp.value].substitution_out_segments[segment.ref.value].append(segment)
+            instances[ref.value].add_substitution(segment, hyp.value)
+            instances[hyp.value].add_substitution_out(segment, ref.value)
+
+    return cnf
+
+
+def create_from_segment_masks(segments, values, cnf=None):
+    """
+    Create a multi-label confusion from segments with bitmasks of the active values
+    (see :meth:`evalmate.alignment.InvariantSegmentAligner.iter_align_masks`).
+    Every value is evaluated independently of the other values.
+    For every value the time it is active in ref and hyp is correct (true positive),
+    the time it is only active in hyp is an insertion (false positive)
+    and the time it is only active in ref is a deletion (false negative).
+    There are no substitutions.
+
+    ``self.instances`` will contain a :class:`SegmentDurationConfusion` for every value in ``values``.
+
+    Arguments:
+        segments (iterable): Segments with ``ref_mask`` and ``hyp_mask``.
+        values (list): The values, where the value at index ``i`` corresponds to bit ``i`` of the masks.
+        cnf (AggregatedConfusion): If given, the durations are added to this confusion instead of a new one.
+                                   It has to contain only :class:`SegmentDurationConfusion`.
+
+    Returns:
+        AggregatedConfusion: The confusion.
+    """
+
+    if cnf is None:
+        cnf = AggregatedConfusion()
+
+    # Sum up durations per mask first, so the bits only have to be expanded once for every distinct mask
+    correct = collections.defaultdict(float)
+    insertions = collections.defaultdict(float)
+    deletions = collections.defaultdict(float)
+
+    for segment in segments:
+        ref_mask = segment.ref_mask
+        hyp_mask = segment.hyp_mask
+        duration = segment.end - segment.start
+
+        if ref_mask & hyp_mask:
+            correct[ref_mask & hyp_mask] += duration
+
+        if hyp_mask & ~ref_mask:
+            insertions[hyp_mask & ~ref_mask] += duration
+
+        if ref_mask & ~hyp_mask:
+            deletions[ref_mask & ~hyp_mask] += duration
+
+    instances = []
+
+    for value in values:
+        if value not in cnf.instances:
+            cnf.instances[value] = SegmentDurationConfusion(value)
+
+        instances.append(cnf.instances[value])
+
+    for mask, duration in correct.items():
+        for index in _bit_indices(mask):
+            instances[index].correct_duration += duration
+
+    for mask, duration in insertions.items():
+        for index in _bit_indices(mask):
+            instances[index].insertion_duration += duration
+
+    for mask, duration in deletions.items():
+        for index in _bit_indices(mask):
+            instances[index].deletion_duration += duration
 
     return cnf
 
 
+def _bit_indices(mask):
+    """ Return the indices of the set bits of ``mask``. """
+    indices = []
+
+    while mask:
+        lowest = mask & -mask
+        indices.append(lowest.bit_length() - 1)
+        mask ^= lowest
+
+    return indices
+
+
 def create_from_label_pairs(pairs):
     """
     Create confusion from a list of aligned labels.
@@ -113,3 +228,115 @@ def create_from_label_pairs(pairs):
             cnf.instances[pair.hyp.value].substitution_out_pairs[pair.ref.value].append(pair)
 
     return cnf
+
+
+def create_from_edit_operations(ops, ref_values, hyp_values, cnf=None):
+    """
+    Create confusion from the operations of a label-to-label alignment
+    (see :meth:`evalmate.alignment.EventAligner.align_ops`).
+    ``self.instances`` will contain the :class:`EventCountConfusion` for every value occurring in the alignment.
+    In contrast to :func:`create_from_label_pairs` only the counts are kept.
+
+    Arguments:
+        ops (str): The operations of the alignment (``C``, ``S``, ``I``, ``D``).
+        ref_values (list): The values of the reference labels in the order they were aligned.
+        hyp_values (list): The values of the hypothesis labels in the order they were aligned.
+        cnf (AggregatedConfusion): If given, the counts are added to this confusion
+                                   instead of a new one. It has to contain only :class:`EventCountConfusion`.
+
+    Returns:
+        AggregatedConfusion: Confusion
+    """
+
+    if cnf is None:
+        cnf = AggregatedConfusion()
+
+    instances = cnf.instances
+    ref_iter = iter(ref_values)
+    hyp_iter = iter(hyp_values)
+
+    for op in ops:
+        if op == 'I':
+            hyp_value = next(hyp_iter)
+
+            if hyp_value not in instances:
+                instances[hyp_value] = EventCountConfusion(hyp_value)
+
+            instances[hyp_value].insertion_count += 1
+
+        elif op == 'D':
+            ref_value = next(ref_iter)
+
+            if ref_value not in instances:
+                instances[ref_value] = EventCountConfusion(ref_value)
+
+            instances[ref_value].deletion_count += 1
+
+        else:
+            ref_value = next(ref_iter)
+            hyp_value = next(hyp_iter)
+
+            if ref_value not in instances:
+                instances[ref_value] = EventCountConfusion(ref_value)
+
+            if hyp_value not in instances:
+                instances[hyp_value] = EventCountConfusion(hyp_value)
+
+            if ref_value == hyp_value:
+                instances[ref_value].correct_count += 1
+            else:
+                instances[ref_value].substitution_counts[hyp_value] += 1
+                instances[hyp_value].substitution_out_counts[ref_value] += 1
+
+    return cnf
+
+
+def create_from_alignment_store(store, cnf=None):
+    """
+    Create confusion from the label-to-label alignments in a :class:`evalmate.alignment.AlignmentStore`.
+    ``self.instances`` will contain the :class:`EventCountConfusion` for every value occurring in the store.
+    The operations are counted with array operations over all pairs at once.
+
+    Arguments:
+        store (AlignmentStore): The alignments.
+        cnf (AggregatedConfusion): If given, the counts are added to this confusion
+                                   instead of a new one. It has to contain only :class:`EventCountConfusion`.
+
+    Returns:
+        AggregatedConfusion: Confusion
+    """
+
+    if cnf is None:
+        cnf = AggregatedConfusion()
+
+    num_values = len(store.values)
+    ops = store.ops
+    ref_ids = store.ref_value_ids
+    hyp_ids = store.hyp_value_ids
+
+    correct = np.bincount(ref_ids[ops == edit_distance.OP_CORRECT], minlength=num_values)
+    deletions = np.bincount(ref_ids[ops == edit_distance.OP_DELETION], minlength=num_values)
+    insertions = np.bincount(hyp_ids[ops == edit_distance.OP_INSERTION], minlength=num_values)
+
+    is_substitution = ops == edit_distance.OP_SUBSTITUTION
+    substitution_keys = ref_ids[is_substitution].astype(np.int64) * num_values + hyp_ids[is_substitution]
+    substitution_keys, substitution_counts = np.unique(substitution_keys, return_counts=True)
+
+    instances = cnf.instances
+
+    for value_id, value in enumerate(store.values):
+        if value not in instances:
+            instances[value] = EventCountConfusion(value)
+
+        instances[value].correct_count += int(correct[value_id])
+        instances[value].deletion_count += int(deletions[value_id])
+        instances[value].insertion_count += int(insertions[value_id])
+
+    for key, count in zip(substitution_keys.tolist(), substitution_counts.tolist()):
+        ref_value = store.values[key // num_values]
+        hyp_value = store.values[key % num_values]
+
+        instances[ref_value].substitution_counts[hyp_value] += count
+        instances[hyp_value].substitution_out_counts[ref_value] += count
+
+    return cnf
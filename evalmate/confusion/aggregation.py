@@ -46,6 +46,48 @@ class AggregatedConfusion(confusion.Confusion):
         per_instance = [conf.recall for conf in self.instances.values()]
         return np.mean(per_instance)
 
+    def add(self, other):
+        """
+        Add the confusions of the instances of another aggregated confusion to this one.
+        Instances that don't exist yet are created.
+
+        Args:
+            other (AggregatedConfusion): The confusion to add.
+                                         It has to contain the same type of instances as this confusion.
+        """
+        for key, instance in other.instances.items():
+            if key not in self.instances:
+                self.instances[key] = type(instance)(instance.value)
+
+            self.instances[key].add(instance)
+
+    def subtract(self, other):
+        """
+        Subtract the confusions of the instances of another aggregated confusion from this one
+        (e.g. to remove the confusion of some utterances).
+        Instances that are empty afterwards are removed.
+
+        Args:
+            other (AggregatedConfusion): The confusion to subtract.
+                                         It has to contain the same type of instances as this confusion.
+        """
+        for key, instance in other.instances.items():
+            if key not in self.instances:
+                if AggregatedConfusion._is_empty(instance):
+                    continue
+
+                raise ValueError('Instance with key "{}" not found!'.format(key))
+
+            self.instances[key].subtract(instance)
+
+            if AggregatedConfusion._is_empty(self.instances[key]):
+                del self.instances[key]
+
+    @staticmethod
+    def _is_empty(instance):
+        return instance.correct == 0 and instance.insertions == 0 and instance.deletions == 0 and \
+            instance.substitutions == 0 and instance.substitutions_out == 0
+
     def get_confusion_with_instances(self, instances):
         """
         Return a new AggregatedConfusion with only the given instances.
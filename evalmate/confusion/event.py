@@ -60,3 +60,116 @@ class EventConfusion(confusion.Confusion):
         """
         subs = [(x, len(y)) for x, y in self.substitution_pairs.items()]
         return sorted(subs, key=lambda x: (-x[1], x[0]))
+
+    def add(self, other):
+        """ Add the label-pairs of another confusion (of the same value). """
+        self.correct_pairs.extend(other.correct_pairs)
+        self.insertion_pairs.extend(other.insertion_pairs)
+        self.deletion_pairs.extend(other.deletion_pairs)
+
+        for value, pairs in other.substitution_pairs.items():
+            self.substitution_pairs[value].extend(pairs)
+
+        for value, pairs in other.substitution_out_pairs.items():
+            self.substitution_out_pairs[value].extend(pairs)
+
+    def subtract(self, other):
+        """ Remove the label-pairs of another confusion (of the same value). The pairs are compared by identity. """
+        self.correct_pairs = _without(self.correct_pairs, other.correct_pairs)
+        self.insertion_pairs = _without(self.insertion_pairs, other.insertion_pairs)
+        self.deletion_pairs = _without(self.deletion_pairs, other.deletion_pairs)
+
+        for own, removed in ((self.substitution_pairs, other.substitution_pairs),
+                             (self.substitution_out_pairs, other.substitution_out_pairs)):
+            for value, pairs in removed.items():
+                own[value] = _without(own[value], pairs)
+
+                if len(own[value]) == 0:
+                    del own[value]
+
+
+class EventCountConfusion(confusion.Confusion):
+    """
+    Class to represent confusions of a specific instance (e.g. some word) based on label-to-label alignment,
+    like :class:`EventConfusion`, but only the number of occurrences is stored and not the label-pairs.
+    Therefore the memory doesn't grow with the number of aligned labels.
+
+    Argument:
+        value (str): The value of the instance (e.g. the word "hello")
+
+    Attributes:
+        correct_count (int): Number of correct matches.
+        insertion_count (int): Number of insertions (ref = None, hyp = value)
+        deletion_count (int): Number of deletions (ref = value, hyp = None)
+        substitution_counts (Counter): Number of substitutions with other values (ref = value, hyp = other-value)
+                                       for every `other-value`.
+        substitution_out_counts (Counter): Number of substitutions from other values
+                                           (ref = other-value, hyp = value) for every `other-value`.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+        self.correct_count = 0
+        self.insertion_count = 0
+        self.deletion_count = 0
+        self.substitution_counts = collections.Counter()
+        self.substitution_out_counts = collections.Counter()
+
+    @property
+    def correct(self):
+        return self.correct_count
+
+    @property
+    def insertions(self):
+        return self.insertion_count
+
+    @property
+    def deletions(self):
+        return self.deletion_count
+
+    @property
+    def substitutions(self):
+        return sum(self.substitution_counts.values())
+
+    @property
+    def substitutions_out(self):
+        return sum(self.substitution_out_counts.values())
+
+    def substitutions_by_count(self):
+        """
+        Return a list of tuples (Substituted-value, Number-of-substitutions) ordered by number of substitutions
+        descending.
+
+        Returns:
+            list: List of tuples.
+        """
+        subs = list(self.substitution_counts.items())
+        return sorted(subs, key=lambda x: (-x[1], x[0]))
+
+    def add(self, other):
+        """ Add the counts of another confusion (of the same value). """
+        self.correct_count += other.correct_count
+        self.insertion_count += other.insertion_count
+        self.deletion_count += other.deletion_count
+        self.substitution_counts.update(other.substitution_counts)
+        self.substitution_out_counts.update(other.substitution_out_counts)
+
+    def subtract(self, other):
+        """ Subtract the counts of another confusion (of the same value). """
+        self.correct_count -= other.correct_count
+        self.insertion_count -= other.insertion_count
+        self.deletion_count -= other.deletion_count
+
+        for own, removed in ((self.substitution_counts, other.substitution_counts),
+                             (self.substitution_out_counts, other.substitution_out_counts)):
+            own.subtract(removed)
+
+            for value in [value for value, count in own.items() if count == 0]:
+                del own[value]
+
+
+def _without(items, removed):
+    """ Return the items that are not in ``removed`` (compared by identity). """
+    removed_ids = {id(item) for item in removed}
+    return [item for item in items if id(item) not in removed_ids]
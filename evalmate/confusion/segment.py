@@ -52,3 +52,178 @@ class SegmentConfusion(confusion.Confusion):
     @property
     def substitutions_out(self):
         return sum([x.duration for x in itertools.chain(*self.substitution_out_segments.values())])
+
+    def add_correct(self, segment):
+        """ Add a segment where ref and hyp are the value of this instance. """
+        self.correct_segments.append(segment)
+
+    def add_insertion(self, segment):
+        """ Add a segment where only the hyp is the value of this instance. """
+        self.insertion_segments.append(segment)
+
+    def add_deletion(self, segment):
+        """ Add a segment where only the ref is the value of this instance. """
+        self.deletion_segments.append(segment)
+
+    def add_substitution(self, segment, other_value):
+        """ Add a segment where the ref is the value of this instance and the hyp is ``other_value``. """
+        self.substitution_segments[other_value].append(segment)
+
+    def add_substitution_out(self, segment, other_value):
+        """ Add a segment where the hyp is the value of this instance and the ref is ``other_value``. """
+        self.substitution_out_segments[other_value].append(segment)
+
+    def add(self, other):
+        """ Add the segments of another confusion (of the same value). """
+        self.correct_segments.extend(other.correct_segments)
+        self.insertion_segments.extend(other.insertion_segments)
+        self.deletion_segments.extend(other.deletion_segments)
+
+        for value, segments in other.substitution_segments.items():
+            self.substitution_segments[value].extend(segments)
+
+        for value, segments in other.substitution_out_segments.items():
+            self.substitution_out_segments[value].extend(segments)
+
+    def subtract(self, other):
+        """ Remove the segments of another confusion (of the same value). The segments are compared by identity. """
+        self.correct_segments = _without(self.correct_segments, other.correct_segments)
+        self.insertion_segments = _without(self.insertion_segments, other.insertion_segments)
+        self.deletion_segments = _without(self.deletion_segments, other.deletion_segments)
+
+        for own, removed in ((self.substitution_segments, other.substitution_segments),
+                             (self.substitution_out_segments, other.substitution_out_segments)):
+            for value, segments in removed.items():
+                own[value] = _without(own[value], segments)
+
+                if len(own[value]) == 0:
+                    del own[value]
+
+
+class SegmentDurationConfusion(confusion.Confusion):
+    """
+    Class to represent confusions of a specific instance (e.g. some class) based on segments,
+    like :class:`SegmentConfusion`, but only the summed up durations are stored and not the segments.
+    Therefore the memory doesn't grow with the number of segments and reading the durations doesn't
+    have to sum up all segments.
+
+    Argument:
+        value (str): The value of the instance (e.g. the class "speech")
+
+    Attributes:
+        correct_duration (float): Seconds that are correct (ref == hyp).
+        insertion_duration (float): Seconds that are insertions (ref = None, hyp = 'value').
+        deletion_duration (float): Seconds that are deletions (ref = 'value', hyp = None)
+        substitution_durations (Dict): Seconds that are substitutions with other values
+                                       (ref = 'value', hyp = 'other-value') for every `other-value`.
+        substitution_out_durations (Dict): Seconds that are substitutions of other values
+                                           (ref = 'other-value', hyp = 'value') for every `other-value`.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+        self.correct_duration = 0.0
+        self.insertion_duration = 0.0
+        self.deletion_duration = 0.0
+        self.substitution_durations = collections.defaultdict(float)
+        self.substitution_out_durations = collections.defaultdict(float)
+
+        self._substitution_duration = 0.0
+        self._substitution_out_duration = 0.0
+
+    @property
+    def correct(self):
+        return self.correct_duration
+
+    @property
+    def insertions(self):
+        return self.insertion_duration
+
+    @property
+    def deletions(self):
+        return self.deletion_duration
+
+    @property
+    def substitutions(self):
+        return self._substitution_duration
+
+    @property
+    def substitutions_out(self):
+        return self._substitution_out_duration
+
+    def add_correct(self, segment):
+        """ Add a segment where ref and hyp are the value of this instance. """
+        self.correct_duration += segment.duration
+
+    def add_insertion(self, segment):
+        """ Add a segment where only the hyp is the value of this instance. """
+        self.insertion_duration += segment.duration
+
+    def add_deletion(self, segment):
+        """ Add a segment where only the ref is the value of this instance. """
+        self.deletion_duration += segment.duration
+
+    def add_substitution(self, segment, other_value):
+        """ Add a segment where the ref is the value of this instance and the hyp is ``other_value``. """
+        self.add_substitution_duration(segment.duration, other_value)
+
+    def add_substitution_out(self, segment, other_value):
+        """ Add a segment where the hyp is the value of this instance and the ref is ``other_value``. """
+        self.add_substitution_out_duration(segment.duration, other_value)
+
+    def add_substitution_duration(self, duration, other_value):
+        """ Add seconds where the ref is the value of this instance and the hyp is ``other_value``. """
+        self.substitution_durations[other_value] += duration
+        self._substitution_duration += duration
+
+    def add_substitution_out_duration(self, duration, other_value):
+        """ Add seconds where the hyp is the value of this instance and the ref is ``other_value``. """
+        self.substitution_out_durations[other_value] += duration
+        self._substitution_out_duration += duration
+
+    def add(self, other):
+        """ Add the durations of another confusion (of the same value). """
+        self.correct_duration += other.correct_duration
+        self.insertion_duration += other.insertion_duration
+        self.deletion_duration += other.deletion_duration
+
+        for value, duration in other.substitution_durations.items():
+            self.add_substitution_duration(duration, value)
+
+        for value, duration in other.substitution_out_durations.items():
+            self.add_substitution_out_duration(duration, value)
+
+    def subtract(self, other):
+        """
+        Subtract the durations of another confusion (of the same value).
+        Durations that are zero apart from rounding errors are set to zero.
+        """
+        self.correct_duration = _round_to_zero(self.correct_duration - other.correct_duration)
+        self.insertion_duration = _round_to_zero(self.insertion_duration - other.insertion_duration)
+        self.deletion_duration = _round_to_zero(self.deletion_duration - other.deletion_duration)
+
+        for own, removed in ((self.substitution_durations, other.substitution_durations),
+                             (self.substitution_out_durations, other.substitution_out_durations)):
+            for value, duration in removed.items():
+                own[value] = _round_to_zero(own[value] - duration)
+
+                if own[value] == 0.0:
+                    del own[value]
+
+        self._substitution_duration = _round_to_zero(sum(self.substitution_durations.values()))
+        self._substitution_out_duration = _round_to_zero(sum(self.substitution_out_durations.values()))
+
+
+def _without(items, removed):
+    """ Return the items that are not in ``removed`` (compared by identity). """
+    removed_ids = {id(item) for item in removed}
+    return [item for item in items if id(item) not in removed_ids]
+
+
+def _round_to_zero(duration, tolerance=1e-9):
+    """ Return ``0.0`` if the duration is zero apart from floating-point rounding errors. """
+    if abs(duration) < tolerance:
+        return 0.0
+
+    return duration
@@ -21,9 +21,21 @@ Outcome
 .. autoclass:: Outcome
    :members:
 
+.. autoclass:: IndexedLabelLists
+   :members:
+
+.. autoclass:: PreparedOutcome
+   :members:
+
+.. autoclass:: SummaryOutcome
+   :members:
+
 .. autoclass:: LabelSet
    :members:
 
+.. autoclass:: LengthStatistics
+   :members:
+
 Segment
 -------
 
@@ -33,6 +45,15 @@ Segment
 .. autoclass:: SegmentEvaluator
    :members:
 
+Frame
+-----
+
+.. autoclass:: FrameEvaluation
+   :members:
+
+.. autoclass:: FrameEvaluator
+   :members:
+
 Event
 -----
 
@@ -57,13 +78,39 @@ ASR
 .. autoclass:: ASREvaluation
    :members:
 
+.. autoclass:: ASRCountEvaluation
+   :members:
+
 .. autoclass:: ASREvaluator
    :members:
 
+Storage
+-------
+Evaluations can be saved to a file and loaded again, without aligning the labels again.
+
+.. autofunction:: save_evaluation
+
+.. autofunction:: load_evaluation
+
+Reader
+------
+Label files (tab-separated ``start end value``) are read into arrays (see :meth:`Outcome.from_label_files`).
+
+.. autofunction:: read_label_files
+
+.. autofunction:: parse_labels
+
+.. autoclass:: LazyLabelLists
+   :members:
+
 """
 
 from .outcome import Outcome  # noqa: F401
+from .outcome import IndexedLabelLists  # noqa: F401
+from .outcome import PreparedOutcome  # noqa: F401
+from .outcome import SummaryOutcome  # noqa: F401
 from .outcome import LabelSet  # noqa: F401
+from .outcome import LengthStatistics  # noqa: F401
 
 from .evaluator import Evaluation  # noqa: F401
 from .evaluator import Evaluator  # noqa: F401
@@ -74,8 +121,19 @@ from .event import EventEvaluation  # noqa: F401
 from .segment import SegmentEvaluator  # noqa: F401
 from .segment import SegmentEvaluation  # noqa: F401
 
+from .frame import FrameEvaluator  # noqa: F401
+from .frame import FrameEvaluation  # noqa: F401
+
 from .kws import KWSEvaluation  # noqa: F401
 from .kws import KWSEvaluator  # noqa: F401
 
 from .asr import ASREvaluation  # noqa: F401
+from .asr import ASRCountEvaluation  # noqa: F401
 from .asr import ASREvaluator  # noqa: F401
+
+from .storage import save_evaluation  # noqa: F401
+from .storage import load_evaluation  # noqa: F401
+
+from .reader import read_label_files  # noqa: F401
+from .reader import parse_labels  # noqa: F401
+from .reader import LazyLabelLists  # noqa: F401
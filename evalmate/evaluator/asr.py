@@ -1,7 +1,10 @@
 from audiomate import annotations
 
 from evalmate import alignment
+from evalmate import confusion
+from evalmate.alignment import batch
 
+from . import evaluator
 from . import event
 
 
@@ -10,12 +13,18 @@ class ASREvaluation(event.EventEvaluation):
     Result of an evaluation of a automatic speech recognition task.
 
     Arguments:
-        utt_to_label_pairs (dict) Dict containing the alignment for every utterance.
-                                  Key is the utterance-id, value is a list of :py:class:`evalmate.alignment.LabelPair`.
+        utt_to_label_pairs (dict, AlignmentStore): The alignment of all utterances.
+                                                   Either an :py:class:`evalmate.alignment.AlignmentStore`
+                                                   or a dict with the utterance-id as key
+                                                   and a list of :py:class:`evalmate.alignment.LabelPair` as value.
+                                                   ``None`` if the alignment was not kept.
+        confusion (AggregatedConfusion): The confusion of the alignment.
+                                         If ``None``, it is created from the alignment.
 
     Attributes:
         ref_outcome (Outcome): The outcome of the ground-truth/reference.
         hyp_outcome (Outcome): The outcome of the system-output/hypothesis.
+        alignment (AlignmentStore): The alignment of all utterances.
         confusion (AggregatedConfusion): Confusion statistics
     """
 
@@ -24,6 +33,52 @@ class ASREvaluation(event.EventEvaluation):
         return 'asr'
 
 
+class ASRCountEvaluation(evaluator.Evaluation):
+    """
+    Result of an evaluation of a automatic speech recognition task, that only contains counts.
+    In contrast to :class:`ASREvaluation` the alignment itself is not kept.
+    The confusion consists of :class:`evalmate.confusion.EventCountConfusion` for every word.
+    So the report ``asr_detail``, which lists the label-pairs of every utterance, is not available.
+
+    Arguments:
+        confusion (AggregatedConfusion): Confusion statistics
+
+    Attributes:
+        ref_outcome (Outcome): The outcome of the ground-truth/reference.
+        hyp_outcome (Outcome): The outcome of the system-output/hypothesis.
+        confusion (AggregatedConfusion): Confusion statistics
+    """
+
+    def __init__(self, ref_outcome, hyp_outcome, confusion):
+        super(ASRCountEvaluation, self).__init__(ref_outcome, hyp_outcome)
+        self.confusion = confusion
+
+    @property
+    def default_template(self):
+        return 'asr'
+
+    def _check_template(self, name):
+        if name == 'asr_detail':
+            raise ValueError('The template asr_detail needs the alignment, which is not kept with counts_only=True.')
+
+    def add_evaluation(self, other):
+        self._add_outcomes(other)
+        self.confusion.add(other.confusion)
+
+    def remove_evaluation(self, other):
+        self._remove_outcomes(other)
+        self.confusion.subtract(other.confusion)
+
+    @property
+    def template_data(self):
+        return {
+            'evaluation': self,
+            'ref_outcome': self.ref_outcome,
+            'hyp_outcome': self.hyp_outcome,
+            'confusion': self.confusion
+        }
+
+
 class ASREvaluator(event.EventEvaluator):
     """
     Class to retrieve evaluation results for a automatic speech recognition task.
@@ -31,34 +86,122 @@ class ASREvaluator(event.EventEvaluator):
     Arguments:
         aligner (EventAligner): An instance of an event-aligner to use.
                                 If not given, the :class:`alignment.LevenshteinAligner` is used.
+        counts_only (bool): If ``True``, the evaluation only counts the edit operations per word
+                            and returns a :class:`ASRCountEvaluation`, without creating label-pairs.
+                            This is much faster and uses less memory for large corpora,
+                            if only the error-rate and the confusion is needed.
+        cache (AlignmentCache): If given, the alignments of the utterances are loaded from/stored in this cache,
+                                so only utterances with changed transcriptions are aligned again.
+        workers (int): If greater than one, the utterances are aligned in a pool of this many processes
+                       (see :func:`evalmate.alignment.batch.align_utterances`).
+
+    If the aligner computes the edit operations of a sequence alignment itself
+    (overrides :meth:`evalmate.alignment.EventAligner.align_ops`, e.g. the :class:`alignment.LevenshteinAligner`),
+    only the operations are computed. Otherwise the alignment may not be monotonic
+    (e.g. :class:`alignment.BipartiteMatchingAligner`), so the tokens of the pairs are stored by index
+    and the operations are counted per pair.
     """
 
-    def __init__(self, aligner=None):
+    def __init__(self, aligner=None, counts_only=False, cache=None, workers=None):
         if aligner is None:
             aligner = alignment.LevenshteinAligner()
 
-        super(ASREvaluator, self).__init__(aligner)
+        super(ASREvaluator, self).__init__(aligner, cache=cache, workers=workers)
+        self.counts_only = counts_only
 
     @classmethod
     def default_label_list_idx(cls):
         return 'word-transcript'
 
     def do_evaluate(self, ref, hyp):
+        if self.counts_only:
+            return ASRCountEvaluation(ref, hyp, self.create_confusion(ref, hyp))
+
         utt_to_label_pairs = self.create_alignment(ref, hyp)
         return ASREvaluation(ref, hyp, utt_to_label_pairs)
 
     def create_alignment(self, ref, hyp):
-        utt_to_label_pairs = {}
+        store = alignment.AlignmentStore()
+
+        if not self._aligns_sequences():
+            for utterance_idx, ref_indices, hyp_indices, ref_tokens, hyp_tokens in self._iter_indices(ref, hyp):
+                store.append_indices(utterance_idx, ref_indices, hyp_indices, ref_tokens, hyp_tokens)
+
+            return store
+
+        for utterance_idx, ops, ref_tokens, hyp_tokens in self._iter_ops(ref, hyp):
+            store.append_ops(utterance_idx, ops, ref_tokens, hyp_tokens)
+
+        return store
+
+    def create_confusion(self, ref, hyp):
+        """
+        Align all utterances and count the edit operations per word, without keeping the alignments.
+
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+
+        Returns:
+            AggregatedConfusion: Confusion with a :class:`evalmate.confusion.EventCountConfusion` for every word.
+        """
+        if not self._aligns_sequences():
+            return confusion.create_from_alignment_store(self.create_alignment(ref, hyp))
+
+        cnf = confusion.AggregatedConfusion()
+
+        for utterance_idx, ops, ref_tokens, hyp_tokens in self._iter_ops(ref, hyp):
+            confusion.create_from_edit_operations(
+                ops,
+                [token.value for token in ref_tokens],
+                [token.value for token in hyp_tokens],
+                cnf=cnf
+            )
+
+        return cnf
+
+    def create_confusion_evaluation(self, ref, hyp, cnf):
+        return ASRCountEvaluation(ref, hyp, cnf)
+
+    def _aligns_sequences(self):
+        """ Return ``True`` if the aligner computes the edit operations of a sequence alignment itself. """
+        return type(self.aligner).align_ops is not alignment.EventAligner.align_ops
+
+    def _iter_ops(self, ref, hyp):
+        """ Tokenize and align all utterances, yield tuples ``(utterance-idx, ops, ref-tokens, hyp-tokens)``. """
+        for utterance_idx, arrays, ref_tokens, hyp_tokens in self._iter_arrays('ops', ref, hyp):
+            yield utterance_idx, arrays['ops'].tobytes().decode('ascii'), ref_tokens, hyp_tokens
+
+    def _iter_indices(self, ref, hyp):
+        """
+        Tokenize and align all utterances,
+        yield tuples ``(utterance-idx, ref-indices, hyp-indices, ref-tokens, hyp-tokens)``.
+        """
+        for utterance_idx, arrays, ref_tokens, hyp_tokens in self._iter_arrays('sequence-indices', ref, hyp):
+            yield utterance_idx, arrays['ref_indices'], arrays['hyp_indices'], ref_tokens, hyp_tokens
+
+    def _iter_arrays(self, kind, ref, hyp):
+        """ Tokenize and align all utterances, yield tuples ``(utterance-idx, arrays, ref-tokens, hyp-tokens)``. """
+        if self.cache is None and (self.workers is None or self.workers <= 1):
+            for utterance_idx in ref.label_lists.keys():
+                ref_tokens = ref.derived('tokens', utterance_idx, ASREvaluator.tokenize)
+                hyp_tokens = ASREvaluator.tokenize(hyp.label_lists[utterance_idx])
+                arrays = batch.compute_alignment(kind, self.aligner, ref_tokens, hyp_tokens)
+
+                yield utterance_idx, arrays, ref_tokens, hyp_tokens
 
-        for utterance_idx, ll_ref in ref.label_lists.items():
-            ll_hyp = hyp.label_lists[utterance_idx]
+            return
 
-            ref_tokens = ASREvaluator.tokenize(ll_ref)
-            hyp_tokens = ASREvaluator.tokenize(ll_hyp)
+        utterance_ids = list(ref.label_lists.keys())
+        utterances = [
+            (ref.derived('tokens', idx, ASREvaluator.tokenize), ASREvaluator.tokenize(hyp.label_lists[idx]))
+            for idx in utterance_ids
+        ]
 
-            utt_to_label_pairs[utterance_idx] = self.aligner.align(ref_tokens, hyp_tokens)
+        results = batch.align_utterances(kind, self.aligner, utterances, cache=self.cache, workers=self.workers)
 
-        return utt_to_label_pairs
+        for utterance_idx, (ref_tokens, hyp_tokens), arrays in zip(utterance_ids, utterances, results):
+            yield utterance_idx, arrays, ref_tokens, hyp_tokens
 
     @staticmethod
     def tokenize(ll, overlap_threshold=0.1):
@@ -4,6 +4,8 @@ import audiomate
 from audiomate import annotations
 from jinja2 import Environment, PackageLoader, select_autoescape
 
+from evalmate import confusion
+
 from . import outcome
 
 env = Environment(
@@ -35,6 +37,59 @@ class Evaluation(abc.ABC):
     def default_template(cls):
         return 'default'
 
+    def add_evaluation(self, other):
+        """
+        Add the utterances of another evaluation to this evaluation.
+        The alignments and the confusion of the other evaluation are added to this evaluation,
+        without evaluating the existing utterances again (see :meth:`Evaluator.add_utterances`).
+
+        Arguments:
+            other (Evaluation): Evaluation of the utterances to add, created by the same evaluator.
+                                It must not contain an utterance that is already in this evaluation.
+        """
+        raise NotImplementedError('Adding utterances is not supported by {}.'.format(type(self).__name__))
+
+    def remove_evaluation(self, other):
+        """
+        Remove the utterances of another evaluation from this evaluation.
+        The alignments and the confusion of the utterances are removed from this evaluation,
+        without evaluating the remaining utterances again (see :meth:`Evaluator.remove_utterances`).
+
+        Arguments:
+            other (Evaluation): Evaluation of the utterances to remove,
+                                created by the same evaluator from the labels of this evaluation.
+        """
+        raise NotImplementedError('Removing utterances is not supported by {}.'.format(type(self).__name__))
+
+    def _add_outcomes(self, other):
+        """ Add the label-lists and durations of the outcomes of another evaluation. """
+        utt_ids = list(other.ref_outcome.label_lists.keys())
+        existing = [utt_idx for utt_idx in utt_ids if utt_idx in self.ref_outcome.label_lists]
+
+        if len(existing) > 0:
+            raise ValueError('The utterance {} is already in the evaluation.'.format(existing[0]))
+
+        for own, added in ((self.ref_outcome, other.ref_outcome), (self.hyp_outcome, other.hyp_outcome)):
+            own.label_lists.update(added.label_lists)
+            own.utterance_durations.update(added.utterance_durations)
+
+        return utt_ids
+
+    def _remove_outcomes(self, other):
+        """ Remove the label-lists and durations of the utterances of another evaluation. """
+        utt_ids = list(other.ref_outcome.label_lists.keys())
+        missing = [utt_idx for utt_idx in utt_ids if utt_idx not in self.ref_outcome.label_lists]
+
+        if len(missing) > 0:
+            raise ValueError('The utterance {} is not in the evaluation.'.format(missing[0]))
+
+        for own in (self.ref_outcome, self.hyp_outcome):
+            for utt_idx in utt_ids:
+                own.label_lists.pop(utt_idx, None)
+                own.utterance_durations.pop(utt_idx, None)
+
+        return utt_ids
+
     def write_report(self, path, template=None, template_param=None):
         """
         Write the report to the given path.
@@ -61,6 +116,8 @@ class Evaluation(abc.ABC):
         if template is None:
             template = self.default_template
 
+        self._check_template(template)
+
         template = self._load_template(template)
         template_data = self.template_data
 
@@ -71,6 +128,13 @@ class Evaluation(abc.ABC):
 
         return template.render(**template_data)
 
+    def _check_template(self, name):
+        """
+        Raise an error, if the evaluation doesn't contain the data needed by the template with the given name
+        (e.g. the alignment was not kept). Otherwise the template would render the missing data as empty.
+        """
+        pass
+
     def _load_template(self, name):
         return env.get_template('{}.txt'.format(name))
 
@@ -115,12 +179,14 @@ class Evaluator(abc.ABC):
           See ``do_evaluate``
         * ref = Corpus / hyp = dict: The dict contains label-lists which are compared against the corpus.
           See ``evaluate_label_lists_against_corpus``
+        * ref = Corpus / hyp = Outcome: The label-lists of the outcome are compared against the corpus
+          (e.g. an outcome read with ``Outcome.from_label_files``).
         * ref = LabelList / hyp = LabelList: Ref label-list is compared against the other.
           See ``evaluate_label_lists``
 
         Arguments:
             ref (LabelList, Corpus): A label-list, a corpus.
-            hyp (LabelList, dict): A label-list, a dict.
+            hyp (LabelList, dict, Outcome): A label-list, a dict, an outcome.
             label_list_idx (str): The label-list to use when reading from a corpus.
 
         Returns:
@@ -136,8 +202,237 @@ class Evaluator(abc.ABC):
         if isinstance(ref, audiomate.Corpus) and isinstance(hyp, dict):
             return self.evaluate_label_lists_against_corpus(ref, hyp, label_list_idx=label_list_idx)
 
+        if isinstance(ref, audiomate.Corpus) and isinstance(hyp, outcome.Outcome):
+            return self.evaluate_label_lists_against_corpus(ref, hyp.label_lists, label_list_idx=label_list_idx)
+
         raise ValueError('Invalid arguments!')
 
+    def evaluate_many(self, ref, hyps, label_list_idx=None):
+        """
+        Evaluate the outcomes of multiple systems against the same reference.
+        The reference is read and prepared only once (e.g. the transcriptions are tokenized once),
+        instead of once for every system as with separate calls of :meth:`evaluate`.
+
+        Arguments:
+            ref (Corpus, Outcome): The corpus or outcome containing the reference label-lists.
+            hyps (list): The outcomes of the systems. Either an :class:`Outcome` or a dict
+                         with label-lists (utterance-idx as key) for every system.
+            label_list_idx (str): The idx of the label-lists to use as reference from a corpus.
+                                  If ``None``, ``default_label_list_idx`` is used.
+
+        Returns:
+            list: The evaluation results of every system, in the order of ``hyps``.
+        """
+        if isinstance(ref, audiomate.Corpus):
+            label_list_idx = label_list_idx or self.default_label_list_idx()
+            ref_outcome = outcome.PreparedOutcome()
+
+            for utterance in ref.utterances.values():
+                ref_outcome.label_lists[utterance.idx] = utterance.label_lists[label_list_idx]
+                ref_outcome.utterance_durations[utterance.idx] = utterance.duration
+
+        elif isinstance(ref, outcome.Outcome):
+            ref_outcome = outcome.PreparedOutcome(label_lists=dict(ref.label_lists),
+                                                  utterance_durations=dict(ref.utterance_durations))
+
+        else:
+            raise ValueError('Invalid arguments!')
+
+        evaluations = []
+
+        for hyp in hyps:
+            if isinstance(hyp, dict):
+                missing = [utt_idx for utt_idx in ref_outcome.label_lists.keys() if utt_idx not in hyp]
+
+                if len(missing) > 0:
+                    raise ValueError('There is no hypothesis label-list with idx {}'.format(missing[0]))
+
+                hyp = outcome.Outcome(label_lists={utt_idx: hyp[utt_idx] for utt_idx in ref_outcome.label_lists.keys()},
+                                      utterance_durations=dict(ref_outcome.utterance_durations))
+
+            elif not isinstance(hyp, outcome.Outcome):
+                raise ValueError('Invalid arguments!')
+
+            evaluation = self.do_evaluate(ref_outcome, hyp)
+
+            # Every evaluation gets its own reference outcome, so the evaluations can be updated independently
+            evaluation.ref_outcome = outcome.Outcome(label_lists=dict(ref_outcome.label_lists),
+                                                     utterance_durations=dict(ref_outcome.utterance_durations))
+            evaluations.append(evaluation)
+
+        return evaluations
+
+    def create_confusion(self, ref, hyp):
+        """
+        Create the confusion of all utterances, without keeping the alignments.
+        Used by :meth:`evaluate_stream`.
+
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+
+        Returns:
+            AggregatedConfusion: The confusion.
+        """
+        raise NotImplementedError('{} does not support creating only the confusion.'.format(type(self).__name__))
+
+    def create_confusion_evaluation(self, ref, hyp, cnf):
+        """
+        Create an evaluation, that only consists of the outcomes and the confusion (without alignments).
+        Used by :meth:`evaluate_stream`.
+
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+            cnf (AggregatedConfusion): The confusion (as created by :meth:`create_confusion`).
+
+        Returns:
+            Evaluation: The evaluation results.
+        """
+        raise NotImplementedError('{} does not support creating only the confusion.'.format(type(self).__name__))
+
+    def evaluate_stream(self, ref, hyps, label_list_idx=None, batch_size=100, keep_lengths=False):
+        """
+        Evaluate hypothesis label-lists one after another as they are produced, e.g. by a decoder.
+        The reference of every utterance is looked up when its hypothesis arrives.
+        The utterances are evaluated in batches of ``batch_size``, the confusion of a batch is added
+        to the total confusion and the batch is dropped.
+        So in contrast to :meth:`evaluate` the hypotheses don't have to be collected up front
+        and the alignments are not kept.
+
+        Arguments:
+            ref (Corpus, Outcome): The corpus or outcome containing the reference label-lists.
+            hyps (iterable): Iterable of tuples ``(utterance-idx, hyp-label-list)``.
+            label_list_idx (str): The idx of the label-lists to use as reference from a corpus.
+                                  If ``None``, ``default_label_list_idx`` is used.
+            batch_size (int): Number of utterances to evaluate at once.
+                              Larger batches are faster if the utterances are aligned in multiple processes.
+            keep_lengths (bool): If ``True``, the outcomes keep the lengths of all labels for exact statistics.
+                                 Otherwise only mergeable statistics of the label lengths are kept,
+                                 so the memory doesn't grow with the stream (see :class:`SummaryOutcome`).
+
+        Returns:
+            Evaluation: The evaluation results (see :meth:`create_confusion_evaluation`)
+            with a :class:`SummaryOutcome` as ref and hyp outcome.
+        """
+        label_list_idx = label_list_idx or self.default_label_list_idx()
+
+        if isinstance(ref, audiomate.Corpus):
+            num_ref_utterances = ref.num_utterances
+        else:
+            num_ref_utterances = len(ref.label_lists)
+
+        ref_summary = outcome.SummaryOutcome(keep_lengths=keep_lengths)
+        hyp_summary = outcome.SummaryOutcome(keep_lengths=keep_lengths)
+        cnf = confusion.AggregatedConfusion()
+
+        utt_ids = set()
+        batch_ref = outcome.Outcome()
+        batch_hyp = outcome.Outcome()
+
+        for utt_idx, ll_hyp in hyps:
+            if utt_idx in utt_ids:
+                raise ValueError('There are multiple hypothesis label-lists with idx {}'.format(utt_idx))
+
+            ll_ref, duration = Evaluator._reference_label_list(ref, utt_idx, label_list_idx)
+            utt_ids.add(utt_idx)
+
+            batch_ref.label_lists[utt_idx] = ll_ref
+            batch_hyp.label_lists[utt_idx] = ll_hyp
+
+            if duration is not None:
+                batch_ref.utterance_durations[utt_idx] = duration
+                batch_hyp.utterance_durations[utt_idx] = duration
+
+            ref_summary.add_label_list(ll_ref, duration=duration)
+            hyp_summary.add_label_list(ll_hyp, duration=duration)
+
+            if len(batch_ref.label_lists) >= batch_size:
+                cnf.add(self.create_confusion(batch_ref, batch_hyp))
+
+                batch_ref = outcome.Outcome()
+                batch_hyp = outcome.Outcome()
+
+        if len(batch_ref.label_lists) > 0:
+            cnf.add(self.create_confusion(batch_ref, batch_hyp))
+
+        if len(utt_ids) < num_ref_utterances:
+            raise ValueError('There are no hypothesis label-lists for {} utterances'.format(
+                num_ref_utterances - len(utt_ids)))
+
+        return self.create_confusion_evaluation(ref_summary, hyp_summary, cnf)
+
+    @staticmethod
+    def _reference_label_list(ref, utt_idx, label_list_idx):
+        """ Return the reference label-list and the duration (``None`` if unknown) of the utterance. """
+        if isinstance(ref, audiomate.Corpus):
+            if utt_idx not in ref.utterances:
+                raise ValueError('There is no reference utterance with idx {}'.format(utt_idx))
+
+            utterance = ref.utterances[utt_idx]
+            return utterance.label_lists[label_list_idx], utterance.duration
+
+        if utt_idx not in ref.label_lists:
+            raise ValueError('There is no reference label-list with idx {}'.format(utt_idx))
+
+        return ref.label_lists[utt_idx], ref.utterance_durations.get(utt_idx)
+
+    def add_utterances(self, evaluation, ref, hyp):
+        """
+        Evaluate additional utterances and add them to an existing evaluation.
+        Only the given utterances are aligned, the confusion of the evaluation is updated by their confusion.
+
+        Arguments:
+            evaluation (Evaluation): The evaluation to update, created by this evaluator.
+            ref (Outcome): The ground-truth/reference outcome of the utterances to add.
+            hyp (Outcome): The system-output/hypothesis outcome of the utterances to add.
+
+        Returns:
+            Evaluation: The updated evaluation.
+        """
+        evaluation.add_evaluation(self.do_evaluate(ref, hyp))
+        return evaluation
+
+    def remove_utterances(self, evaluation, utt_ids):
+        """
+        Remove utterances from an existing evaluation.
+        The removed utterances are evaluated again from the label-lists in the outcomes of the evaluation,
+        to know what has to be subtracted from the confusion. The other utterances are not evaluated again.
+
+        Arguments:
+            evaluation (Evaluation): The evaluation to update, created by this evaluator.
+            utt_ids (list): The ids of the utterances to remove.
+
+        Returns:
+            Evaluation: The updated evaluation.
+        """
+        ref = evaluation.ref_outcome.subset(utt_ids)
+        hyp = evaluation.hyp_outcome.subset(utt_ids)
+
+        evaluation.remove_evaluation(self.do_evaluate(ref, hyp))
+        return evaluation
+
+    def replace_utterances(self, evaluation, ref, hyp):
+        """
+        Replace the ref and hyp of utterances in an existing evaluation.
+        Utterances that are not in the evaluation yet are added.
+        Only the given utterances are evaluated (see :meth:`add_utterances` and :meth:`remove_utterances`).
+
+        Arguments:
+            evaluation (Evaluation): The evaluation to update, created by this evaluator.
+            ref (Outcome): The new ground-truth/reference outcome of the utterances.
+            hyp (Outcome): The new system-output/hypothesis outcome of the utterances.
+
+        Returns:
+            Evaluation: The updated evaluation.
+        """
+        existing = [utt_idx for utt_idx in ref.label_lists.keys() if utt_idx in evaluation.ref_outcome.label_lists]
+
+        if len(existing) > 0:
+            self.remove_utterances(evaluation, existing)
+
+        return self.add_utterances(evaluation, ref, hyp)
+
     def evaluate_label_lists(self, ll_ref, ll_hyp, duration=None):
         """
         Create Evaluation for ref and hyp label-list.
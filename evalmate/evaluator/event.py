@@ -1,4 +1,6 @@
+from evalmate import alignment
 from evalmate import confusion
+from evalmate.alignment import batch
 
 from . import evaluator
 
@@ -8,68 +10,117 @@ class EventEvaluation(evaluator.Evaluation):
     Result of an evaluation of any event-based alignment.
 
     Arguments:
-        utt_to_label_pairs (dict) Dict containing the alignment for every utterance.
-                                  Key is the utterance-id, value is a list of :py:class:`evalmate.alignment.LabelPair`.
+        utt_to_label_pairs (dict, AlignmentStore): The alignment of all utterances.
+                                                   Either an :py:class:`evalmate.alignment.AlignmentStore`
+                                                   or a dict with the utterance-id as key
+                                                   and a list of :py:class:`evalmate.alignment.LabelPair` as value.
+                                                   ``None`` if the alignment was not kept,
+                                                   in which case ``confusion`` has to be given.
+        confusion (AggregatedConfusion): The confusion of the alignment.
+                                         If ``None``, it is created from the alignment.
 
     Attributes:
         ref_outcome (Outcome): The outcome of the ground-truth/reference.
         hyp_outcome (Outcome): The outcome of the system-output/hypothesis.
-        confusion (AggregatedConfusion): Confusion statistics
+        alignment (AlignmentStore): The alignment of all utterances (``None`` if not kept).
+        confusion (AggregatedConfusion): Confusion statistics,
+                                         with a :class:`evalmate.confusion.EventCountConfusion` for every value.
+                                         For the label-pairs of every value see :attr:`pair_confusion`.
     """
 
-    def __init__(self, ref_outcome, hyp_outcome, utt_to_label_pairs):
+    def __init__(self, ref_outcome, hyp_outcome, utt_to_label_pairs, confusion=None):
         super(EventEvaluation, self).__init__(ref_outcome, hyp_outcome)
-        self.utt_to_label_pairs = utt_to_label_pairs
-        self.confusion = confusion.create_from_label_pairs(self.label_pairs)
+
+        if utt_to_label_pairs is None or isinstance(utt_to_label_pairs, alignment.AlignmentStore):
+            self.alignment = utt_to_label_pairs
+        else:
+            self.alignment = alignment.AlignmentStore.from_label_pairs(utt_to_label_pairs)
+
+        if confusion is None:
+            confusion = self._confusion_from_alignment()
+
+        self.confusion = confusion
+        self._pair_confusion = None
+
+    def _confusion_from_alignment(self):
+        if self.alignment is None:
+            raise ValueError('Either the alignment or the confusion has to be given.')
+
+        return confusion.create_from_alignment_store(self.alignment)
 
     @property
     def default_template(self):
         return 'event'
 
+    def add_evaluation(self, other):
+        if self.alignment is not None and other.alignment is None:
+            raise ValueError('The alignment of the evaluation to add was not kept.')
+
+        self._add_outcomes(other)
+
+        if self.alignment is not None:
+            self.alignment.extend(other.alignment)
+
+        self.confusion.add(other.confusion)
+        self._pair_confusion = None
+
+    def remove_evaluation(self, other):
+        utt_ids = self._remove_outcomes(other)
+        self._pair_confusion = None
+
+        if self.alignment is None:
+            self.confusion.subtract(other.confusion)
+        else:
+            # The confusion is updated from the stored alignment, which is exactly what was added before
+            removed = self.alignment.remove(utt_ids)
+            self.confusion.subtract(confusion.create_from_alignment_store(removed))
+
     @property
     def template_data(self):
         return {
             'evaluation': self,
             'ref_outcome': self.ref_outcome,
             'hyp_outcome': self.hyp_outcome,
-            'utt_to_label_pairs': self.utt_to_label_pairs,
-            'label_pairs': self.label_pairs,
+            'utt_to_label_pairs': self.utt_to_label_pairs if self.alignment is not None else None,
+            'label_pairs': self.label_pairs if self.alignment is not None else None,
             'confusion': self.confusion
         }
 
     @property
-    def label_pairs(self):
+    def pair_confusion(self):
         """
-        Return a list of all label-pairs (from all utterances together).
+        Return the confusion with a :class:`evalmate.confusion.EventConfusion` for every value,
+        which contains the label-pairs of the correct, substituted, deleted and inserted labels
+        (see :func:`evalmate.confusion.create_from_label_pairs`).
+        It is created from the alignment on first access.
         """
-        lp = []
+        if self._pair_confusion is None:
+            self._pair_confusion = confusion.create_from_label_pairs(self._kept_alignment().label_pairs)
+
+        return self._pair_confusion
 
-        for pairs in self.utt_to_label_pairs.values():
-            lp.extend(pairs)
+    @property
+    def utt_to_label_pairs(self):
+        """
+        Return a mapping with the list of label-pairs (:py:class:`evalmate.alignment.LabelPair`) for every utterance.
+        The label-pairs are created from the alignment on access.
+        """
+        return self._kept_alignment().utt_to_label_pairs
 
-        return lp
+    @property
+    def label_pairs(self):
+        """
+        Return a sequence of all label-pairs (from all utterances together).
+        The label-pairs are created from the alignment on access.
+        """
+        return self._kept_alignment().label_pairs
 
     @property
     def failing_utterances(self):
         """
         Return list of utterance-ids that are not correct.
         """
-
-        utt_ids = []
-
-        for utt_idx, pairs in self.utt_to_label_pairs.items():
-            is_ok = True
-
-            for pair in pairs:
-                if pair.ref is None or pair.hyp is None:
-                    is_ok = False
-                elif pair.ref.value != pair.hyp.value:
-                    is_ok = False
-
-            if not is_ok:
-                utt_ids.append(utt_idx)
-
-        return utt_ids
+        return self._kept_alignment().failing_utterances()
 
     @property
     def correct_utterances(self):
@@ -80,6 +131,12 @@ class EventEvaluation(evaluator.Evaluation):
         correct = set(self.utt_to_label_pairs.keys()) - set(failing)
         return list(correct)
 
+    def _kept_alignment(self):
+        if self.alignment is None:
+            raise ValueError('The alignment was not kept for this evaluation.')
+
+        return self.alignment
+
 
 class EventEvaluator(evaluator.Evaluator):
     """
@@ -87,10 +144,17 @@ class EventEvaluator(evaluator.Evaluator):
 
     Arguments:
         aligner (EventAligner): An instance of an event-aligner to use.
+        cache (AlignmentCache): If given, the alignments of the utterances are loaded from/stored in this cache,
+                                so only utterances with changed labels are aligned again.
+        workers (int): If greater than one, the utterances are aligned in a pool of this many processes
+                       (see :func:`evalmate.alignment.batch.align_utterances`).
+                       The aligner has to be picklable.
     """
 
-    def __init__(self, aligner):
+    def __init__(self, aligner, cache=None, workers=None):
         self.aligner = aligner
+        self.cache = cache
+        self.workers = workers
 
     @classmethod
     def default_label_list_idx(cls):
@@ -100,12 +164,53 @@ class EventEvaluator(evaluator.Evaluator):
         utt_to_label_pairs = self.create_alignment(ref, hyp)
         return EventEvaluation(ref, hyp, utt_to_label_pairs)
 
+    def create_confusion(self, ref, hyp):
+        """
+        Align all utterances and return the confusion, without keeping the alignments.
+
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+
+        Returns:
+            AggregatedConfusion: Confusion with a :class:`evalmate.confusion.EventCountConfusion` for every value.
+        """
+        return confusion.create_from_alignment_store(self.create_alignment(ref, hyp))
+
+    def create_confusion_evaluation(self, ref, hyp, cnf):
+        return EventEvaluation(ref, hyp, None, confusion=cnf)
+
     def create_alignment(self, ref, hyp):
-        utt_to_label_pairs = {}
+        """
+        Align all utterances and return the alignments.
+        The labels are aligned in canonical order (see :meth:`evalmate.alignment.AlignmentCache.canonical_order`),
+        so the result is the same with and without cache or workers.
+
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+
+        Returns:
+            AlignmentStore: The alignments of all utterances.
+        """
+        store = alignment.AlignmentStore()
+        utterance_ids = list(ref.label_lists.keys())
+        utterances = []
+
+        for utterance_idx in utterance_ids:
+            ref_labels = ref.derived('canonical-labels', utterance_idx, alignment.AlignmentCache.canonical_order)
+            hyp_labels = alignment.AlignmentCache.canonical_order(hyp.label_lists[utterance_idx])
+            utterances.append((ref_labels, hyp_labels))
+
+        if self.cache is None and (self.workers is None or self.workers <= 1):
+            for utterance_idx, (ref_labels, hyp_labels) in zip(utterance_ids, utterances):
+                store.append(utterance_idx, self.aligner.align(ref_labels, hyp_labels), ref_labels, hyp_labels)
+
+            return store
 
-        for utterance_idx, ll_ref in ref.label_lists.items():
-            ll_hyp = hyp.label_lists[utterance_idx]
+        results = batch.align_utterances('indices', self.aligner, utterances, cache=self.cache, workers=self.workers)
 
-            utt_to_label_pairs[utterance_idx] = self.aligner.align(ll_ref.labels, ll_hyp.labels)
+        for utterance_idx, (ref_labels, hyp_labels), arrays in zip(utterance_ids, utterances, results):
+            store.append_indices(utterance_idx, arrays['ref_indices'], arrays['hyp_indices'], ref_labels, hyp_labels)
 
-        return utt_to_label_pairs
+        return store
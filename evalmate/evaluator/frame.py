@@ -0,0 +1,261 @@
+import numpy as np
+
+from evalmate import confusion
+
+from . import evaluator
+
+
+class FrameEvaluation(evaluator.Evaluation):
+    """
+    Result of an evaluation of a frame-based alignment.
+
+    Arguments:
+        confusion (AggregatedConfusion): Confusion statistics
+        hop (float): The length of a frame in seconds.
+
+    Attributes:
+        ref_outcome (Outcome): The outcome of the ground-truth/reference.
+        hyp_outcome (Outcome): The outcome of the system-output/hypothesis.
+        confusion (AggregatedConfusion): Confusion statistics,
+                                         with a :class:`evalmate.confusion.SegmentDurationConfusion` for every value.
+        hop (float): The length of a frame in seconds.
+    """
+
+    def __init__(self, ref_outcome, hyp_outcome, confusion, hop):
+        super(FrameEvaluation, self).__init__(ref_outcome, hyp_outcome)
+        self.confusion = confusion
+        self.hop = hop
+
+    @property
+    def default_template(self):
+        return 'segment'
+
+    def add_evaluation(self, other):
+        self._add_outcomes(other)
+        self.confusion.add(other.confusion)
+
+    def remove_evaluation(self, other):
+        self._remove_outcomes(other)
+        self.confusion.subtract(other.confusion)
+
+    @property
+    def template_data(self):
+        return {
+            'evaluation': self,
+            'ref_outcome': self.ref_outcome,
+            'hyp_outcome': self.hyp_outcome,
+            'confusion': self.confusion
+        }
+
+
+class FrameEvaluator(evaluator.Evaluator):
+    """
+    Evaluation based on frames of fixed length.
+
+    The labels of every utterance are rasterized into a boolean matrix (values x frames),
+    which indicates for every frame which values are active. A frame is active for a label,
+    if the center of the frame lies within the label. The confusion is computed from these matrices.
+    In contrast to the :class:`SegmentEvaluator` overlapping labels are allowed.
+
+    Within a frame, a reference value that is not in the hypothesis is a substitution,
+    if there is a hypothesis value that is not in the reference. Otherwise it is a deletion.
+    If there are multiple of these values in a frame, they are paired in order of the values.
+    The remaining hypothesis values that are not in the reference are insertions.
+    So if there is at most one active value in every frame, the results are equal
+    to the :class:`SegmentEvaluator` (apart from rounding to frames).
+
+    Arguments:
+        hop (float): The length of a frame in seconds.
+    """
+
+    def __init__(self, hop=0.01):
+        self.hop = hop
+
+    @classmethod
+    def default_label_list_idx(cls):
+        return 'domain'
+
+    def do_evaluate(self, ref, hyp):
+        return FrameEvaluation(ref, hyp, self.create_confusion(ref, hyp), self.hop)
+
+    def create_confusion(self, ref, hyp):
+        """
+        Create the confusion of all utterances.
+
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+
+        Returns:
+            AggregatedConfusion: Confusion with a :class:`evalmate.confusion.SegmentDurationConfusion`
+            for every value.
+        """
+        values = sorted(ref.all_values | hyp.all_values)
+        value_ids = {value: index for index, value in enumerate(values)}
+        num_values = len(values)
+
+        correct = np.zeros(num_values, dtype=np.int64)
+        insertions = np.zeros(num_values, dtype=np.int64)
+        deletions = np.zeros(num_values, dtype=np.int64)
+        substitutions = np.zeros((num_values, num_values), dtype=np.int64)
+
+        for utt_idx, ll_ref in ref.label_lists.items():
+            ll_hyp = hyp.label_lists[utt_idx]
+
+            duration = ref.utterance_durations.get(utt_idx, hyp.utterance_durations.get(utt_idx))
+            num_frames = self.num_frames([ll_ref, ll_hyp], duration=duration)
+
+            ref_frames = self.rasterize(ll_ref, value_ids, num_frames, open_end=duration)
+            hyp_frames = self.rasterize(ll_hyp, value_ids, num_frames, open_end=duration)
+
+            counts = FrameEvaluator.count_frames(ref_frames, hyp_frames)
+
+            correct += counts[0]
+            insertions += counts[1]
+            deletions += counts[2]
+            substitutions += counts[3]
+
+        cnf = confusion.AggregatedConfusion()
+
+        for index, value in enumerate(values):
+            instance = confusion.SegmentDurationConfusion(value)
+            instance.correct_duration = int(correct[index]) * self.hop
+            instance.insertion_duration = int(insertions[index]) * self.hop
+            instance.deletion_duration = int(deletions[index]) * self.hop
+
+            for other_index in np.flatnonzero(substitutions[index]):
+                duration = int(substitutions[index, other_index]) * self.hop
+                instance.add_substitution_duration(duration, values[other_index])
+
+            for other_index in np.flatnonzero(substitutions[:, index]):
+                duration = int(substitutions[other_index, index]) * self.hop
+                instance.add_substitution_out_duration(duration, values[other_index])
+
+            cnf.instances[value] = instance
+
+        return cnf
+
+    def create_confusion_evaluation(self, ref, hyp, cnf):
+        return FrameEvaluation(ref, hyp, cnf, self.hop)
+
+    def frame_index(self, time):
+        """ Return the index of the first frame, whose center is not before ``time``. """
+        return int(np.floor(time / self.hop + 0.5))
+
+    def num_frames(self, label_lists, duration=None):
+        """
+        Return the number of frames of an utterance, so that all labels are covered.
+
+        Arguments:
+            label_lists (list): The label-lists of the utterance.
+            duration (float): The duration of the utterance in seconds.
+                              If ``None``, the utterance ends with the last label end (or start).
+
+        Returns:
+            int: Number of frames.
+        """
+        end = 0.0
+
+        if duration is not None:
+            end = duration
+
+        for ll in label_lists:
+            for label in ll:
+                end = max(end, label.start)
+
+                if label.end >= 0 and label.end != float('inf'):
+                    end = max(end, label.end)
+
+        return self.frame_index(end)
+
+    def rasterize(self, label_list, value_ids, num_frames, open_end=None):
+        """
+        Return a boolean matrix (values x frames) indicating the active values in every frame.
+
+        Arguments:
+            label_list (LabelList): The labels to rasterize.
+            value_ids (dict): The row index for every value.
+            num_frames (int): The number of frames.
+            open_end (float): The end in seconds of labels with an end of ``-1`` or ``inf``.
+                              If ``None``, they last until the last frame.
+
+        Returns:
+            np.ndarray: Boolean matrix with shape ``(len(value_ids), num_frames)``.
+        """
+        if open_end is None:
+            open_end = num_frames * self.hop
+
+        frames = np.zeros((len(value_ids), num_frames), dtype=bool)
+
+        for label in label_list:
+            end = label.end
+
+            if end < 0 or end == float('inf'):
+                end = open_end
+
+            first = min(max(self.frame_index(label.start), 0), num_frames)
+            last = min(max(self.frame_index(end), 0), num_frames)
+
+            frames[value_ids[label.value], first:last] = True
+
+        return frames
+
+    @staticmethod
+    def count_frames(ref_frames, hyp_frames):
+        """
+        Count the correct, inserted, deleted and substituted frames per value.
+
+        Arguments:
+            ref_frames (np.ndarray): Boolean matrix (values x frames) of the reference.
+            hyp_frames (np.ndarray): Boolean matrix (values x frames) of the hypothesis.
+
+        Returns:
+            tuple: ``(correct, insertions, deletions, substitutions)``.
+            The first three are arrays with the number of frames per value.
+            ``substitutions`` is a matrix with the number of frames
+            for every pair (ref-value, hyp-value).
+        """
+        num_values = ref_frames.shape[0]
+
+        missed = ref_frames & ~hyp_frames
+        false_alarms = hyp_frames & ~ref_frames
+
+        # The n-th missed value of a frame is substituted by the n-th false alarm of the frame
+        missed_rank, num_missed = FrameEvaluator._ranks(missed)
+        false_alarm_rank, num_false_alarms = FrameEvaluator._ranks(false_alarms)
+
+        correct = np.sum(ref_frames & hyp_frames, axis=1)
+        deletions = np.sum(missed_rank > num_false_alarms, axis=1)
+        insertions = np.sum(false_alarm_rank > num_missed, axis=1)
+
+        substitutions = np.zeros(num_values * num_values, dtype=np.int64)
+        max_rank = int(np.minimum(num_missed, num_false_alarms).max(initial=0))
+
+        for rank in range(1, max_rank + 1):
+            ref_rank = missed_rank == rank
+            hyp_rank = false_alarm_rank == rank
+            frames = ref_rank.any(axis=0) & hyp_rank.any(axis=0)
+
+            ref_ids = ref_rank[:, frames].argmax(axis=0)
+            hyp_ids = hyp_rank[:, frames].argmax(axis=0)
+
+            substitutions += np.bincount(ref_ids * num_values + hyp_ids, minlength=num_values * num_values)
+
+        return correct, insertions, deletions, substitutions.reshape(num_values, num_values)
+
+    @staticmethod
+    def _ranks(frames):
+        """
+        Return the rank of every active value within its frame (``0`` if not active)
+        and the number of active values per frame.
+        """
+        dtype = np.int16 if frames.shape[0] < np.iinfo(np.int16).max else np.int64
+
+        ranks = np.zeros(frames.shape, dtype=dtype)
+        count = np.zeros(frames.shape[1], dtype=dtype)
+
+        for index in range(frames.shape[0]):
+            count += frames[index]
+            ranks[index] = count * frames[index]
+
+        return ranks, count
@@ -10,12 +10,18 @@ class KWSEvaluation(event.EventEvaluation):
     Result of an evaluation of a keyword spotting task.
 
     Arguments:
-        utt_to_label_pairs (dict) Dict containing the alignment for every utterance.
-                                  Key is the utterance-id, value is a list of :py:class:`evalmate.alignment.LabelPair`.
+        utt_to_label_pairs (dict, AlignmentStore): The alignment of all utterances.
+                                                   Either an :py:class:`evalmate.alignment.AlignmentStore`
+                                                   or a dict with the utterance-id as key
+                                                   and a list of :py:class:`evalmate.alignment.LabelPair` as value.
+                                                   ``None`` if the alignment was not kept.
+        confusion (AggregatedConfusion): The confusion of the alignment.
+                                         If ``None``, it is created from the alignment.
 
     Attributes:
         ref_outcome (Outcome): The outcome of the ground-truth/reference.
         hyp_outcome (Outcome): The outcome of the system-output/hypothesis.
+        alignment (AlignmentStore): The alignment of all utterances.
         confusion (AggregatedConfusion): Confusion statistics
     """
 
@@ -135,13 +141,17 @@ class KWSEvaluator(event.EventEvaluator):
     Arguments:
         aligner (EventAligner): An instance of an event-aligner to use.
                                 If not given the :class:`evalmate.alignment.BipartiteMatchingAligner` is user.
+        cache (AlignmentCache): If given, the alignments of the utterances are loaded from/stored in this cache,
+                                so only utterances with changed labels are aligned again.
+        workers (int): If greater than one, the utterances are aligned in a pool of this many processes
+                       (see :func:`evalmate.alignment.batch.align_utterances`).
     """
 
-    def __init__(self, aligner=None):
+    def __init__(self, aligner=None, cache=None, workers=None):
         if aligner is None:
             aligner = alignment.BipartiteMatchingAligner()
 
-        super(KWSEvaluator, self).__init__(aligner)
+        super(KWSEvaluator, self).__init__(aligner, cache=cache, workers=workers)
 
     @classmethod
     def default_label_list_idx(cls):
@@ -150,3 +160,6 @@ class KWSEvaluator(event.EventEvaluator):
     def do_evaluate(self, ref, hyp):
         utt_to_label_pairs = self.create_alignment(ref, hyp)
         return KWSEvaluation(ref, hyp, utt_to_label_pairs)
+
+    def create_confusion_evaluation(self, ref, hyp, cnf):
+        return KWSEvaluation(ref, hyp, None, confusion=cnf)
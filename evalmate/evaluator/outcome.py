@@ -1,5 +1,10 @@
+import array
+import collections.abc
+
 import numpy as np
 
+from . import reader
+
 
 class Outcome:
     """
@@ -10,7 +15,9 @@ class Outcome:
     some methods may not work or throw exceptions.
 
     Attributes:
-        label_lists (dict): Dictionary containing all label-lists with the utterance-idx/sample-idx as key.
+        label_lists (IndexedLabelLists): Dictionary containing all label-lists with the utterance-idx/sample-idx as key.
+                                         A dictionary assigned to it is wrapped in an :class:`IndexedLabelLists`,
+                                         which keeps an index of the labels by value.
         utterance_durations (dict): Dictionary (utterance-idx/duration) containing the durations of all utterances.
     """
 
@@ -18,6 +25,75 @@ class Outcome:
         self.label_lists = label_lists or {}
         self.utterance_durations = utterance_durations or {}
 
+    @property
+    def label_lists(self):
+        return self._label_lists
+
+    @label_lists.setter
+    def label_lists(self, label_lists):
+        self._label_lists = IndexedLabelLists(label_lists)
+
+    @classmethod
+    def from_label_files(cls, path, label_list_idx='default', suffix='.txt', workers=None, utterance_durations=None):
+        """
+        Create an outcome from a directory with a label file per utterance or a single file with all labels
+        (see :func:`evalmate.evaluator.reader.read_label_files`).
+        The labels are read into arrays, the label-lists are only created when they are accessed.
+
+        Arguments:
+            path (str): Path to the directory or the single file.
+            label_list_idx (str): The idx of the created label-lists.
+            suffix (str): Only files in the directory ending with this suffix are read.
+            workers (int): If greater than one, the files of the directory are read in this many threads.
+            utterance_durations (dict): Durations of the utterances (utterance-idx/duration).
+
+        Returns:
+            Outcome: The outcome with the label-lists of all utterances.
+
+        Example:
+            >>> hyp = Outcome.from_label_files('/path/to/hyp', workers=8)
+            >>> KWSEvaluator().evaluate(ref, hyp)
+        """
+        arrays = reader.read_label_files(path, suffix=suffix, workers=workers)
+        utt_ids, offsets, values, value_ids, starts, ends = arrays
+        label_lists = reader.LazyLabelLists(utt_ids, [label_list_idx] * len(utt_ids), offsets,
+                                            values, value_ids, starts, ends)
+
+        return cls(label_lists=label_lists, utterance_durations=utterance_durations)
+
+    def subset(self, utt_ids):
+        """
+        Return a new outcome with only the given utterances.
+        The label-lists are not copied.
+
+        Arguments:
+            utt_ids (list): The ids of the utterances.
+
+        Returns:
+            Outcome: The outcome with the given utterances.
+        """
+        label_lists = {utt_idx: self.label_lists[utt_idx] for utt_idx in utt_ids}
+        durations = {utt_idx: self.utterance_durations[utt_idx]
+                     for utt_idx in utt_ids if utt_idx in self.utterance_durations}
+
+        return Outcome(label_lists=label_lists, utterance_durations=durations)
+
+    def derived(self, name, utt_idx, create):
+        """
+        Return data derived from the label-list of an utterance (e.g. the tokens of a transcription).
+        In a plain outcome the data is created on every call,
+        a :class:`PreparedOutcome` creates it only once.
+
+        Arguments:
+            name (str): The name of the derived data.
+            utt_idx (str): The utterance-idx.
+            create (func): Function that creates the data from the label-list.
+
+        Returns:
+            object: The derived data.
+        """
+        return create(self.label_lists[utt_idx])
+
     def label_set(self):
         """ Return a label-set containing all labels. """
         ls = LabelSet()
@@ -37,14 +113,7 @@ class Outcome:
         Returns:
             LabelSet: Label-set containing all labels with the given value.
         """
-        ls = LabelSet()
-
-        for label_list in self.label_lists.values():
-            for label in label_list:
-                if label.value == value:
-                    ls.labels.append(label)
-
-        return ls
+        return LabelSet(labels=self.label_lists.labels_for_value(value))
 
     @property
     def total_duration(self):
@@ -64,12 +133,227 @@ class Outcome:
         """
         Return a set of all values, occurring in the outcome.
         """
+        return self.label_lists.label_values()
+
+
+class IndexedLabelLists(collections.abc.MutableMapping):
+    """
+    Mapping of utterance-ids to label-lists (the ``label_lists`` of an :class:`Outcome`),
+    with an index of the labels by value.
+    The index is created on first use and updated, whenever a label-list is added, replaced or removed,
+    so the labels with a given value are found without iterating over all labels.
+
+    Changes of a label-list itself (e.g. adding a label) are not detected,
+    a changed label-list has to be set again.
+
+    Arguments:
+        label_lists (dict): Mapping of utterance-ids to label-lists, which is wrapped (not copied).
+                            Changes have to be made through this mapping, to keep the index up to date.
+    """
+
+    def __init__(self, label_lists):
+        self._label_lists = label_lists
+
+        # value -> utterance-idx -> labels
+        self._index = None
+        self._utt_values = None
+
+    def __getitem__(self, utt_idx):
+        return self._label_lists[utt_idx]
+
+    def __setitem__(self, utt_idx, ll):
+        if self._index is not None:
+            self._remove_from_index(utt_idx)
+
+        self._label_lists[utt_idx] = ll
+
+        if self._index is not None:
+            self._add_to_index(utt_idx, ll)
+
+    def __delitem__(self, utt_idx):
+        del self._label_lists[utt_idx]
+
+        if self._index is not None:
+            self._remove_from_index(utt_idx)
+
+    def __contains__(self, utt_idx):
+        return utt_idx in self._label_lists
+
+    def __iter__(self):
+        return iter(self._label_lists)
+
+    def __len__(self):
+        return len(self._label_lists)
+
+    def labels_for_value(self, value):
+        """
+        Return all labels with the given value.
+
+        Arguments:
+            value (str): The value.
+
+        Returns:
+            list: The labels.
+        """
+        utt_labels = self._value_index().get(value, {})
+        return [label for labels in utt_labels.values() for label in labels]
+
+    def label_values(self):
+        """
+        Return the values of all labels.
+
+        Returns:
+            set: The values.
+        """
+        return set(self._value_index().keys())
+
+    def _value_index(self):
+        if self._index is None:
+            self._index = {}
+            self._utt_values = {}
+
+            for utt_idx, ll in self._label_lists.items():
+                self._add_to_index(utt_idx, ll)
+
+        return self._index
+
+    def _add_to_index(self, utt_idx, ll):
         values = set()
 
-        for ll in self.label_lists.values():
-            values.update(ll.label_values())
+        for label in ll:
+            self._index.setdefault(label.value, {}).setdefault(utt_idx, []).append(label)
+            values.add(label.value)
+
+        self._utt_values[utt_idx] = values
+
+    def _remove_from_index(self, utt_idx):
+        for value in self._utt_values.pop(utt_idx, ()):
+            utt_labels = self._index[value]
+            del utt_labels[utt_idx]
+
+            if len(utt_labels) == 0:
+                del self._index[value]
+
+
+class PreparedOutcome(Outcome):
+    """
+    An outcome that caches the data derived from its label-lists (see :meth:`Outcome.derived`).
+    This is used for the reference,
+    when evaluating multiple hypotheses against it (see :meth:`Evaluator.evaluate_many`),
+    so the preparation of the reference is done once and not for every hypothesis.
+
+    The label-lists must not be changed after the outcome was created.
+    """
+
+    def __init__(self, label_lists=None, utterance_durations=None):
+        super(PreparedOutcome, self).__init__(label_lists=label_lists, utterance_durations=utterance_durations)
+
+        self._derived = {}
 
-        return values
+    def derived(self, name, utt_idx, create):
+        key = (name, utt_idx)
+
+        if key not in self._derived:
+            self._derived[key] = create(self.label_lists[utt_idx])
+
+        return self._derived[key]
+
+
+class SummaryOutcome(Outcome):
+    """
+    An outcome, that doesn't keep the label-lists, but only a summary of them.
+    Kept are the number of utterances, the total duration and statistics of the label lengths for every value,
+    so the label statistics are available while the memory doesn't grow with the labels.
+    This is used for evaluating a stream of utterances (see :meth:`Evaluator.evaluate_stream`).
+
+    ``label_lists`` and ``utterance_durations`` are always empty.
+
+    Arguments:
+        keep_lengths (bool): If ``True``, the lengths of all labels are kept for exact statistics.
+                             Otherwise only :class:`LengthStatistics` are kept for every value,
+                             so the memory doesn't grow with the number of labels. The median is then an estimate.
+
+    Attributes:
+        num_utterances (int): Number of added utterances.
+    """
+
+    def __init__(self, keep_lengths=False):
+        super(SummaryOutcome, self).__init__()
+
+        self.keep_lengths = keep_lengths
+        self.num_utterances = 0
+
+        self._total_duration = 0.0
+        self._num_missing_durations = 0
+        self._label_lengths = {}
+
+    def add_label_list(self, label_list, duration=None):
+        """
+        Add the summary of the label-list of an utterance.
+
+        Arguments:
+            label_list (LabelList): The label-list of the utterance.
+            duration (float): The duration of the utterance.
+        """
+        self.num_utterances += 1
+
+        if duration is None:
+            self._num_missing_durations += 1
+        else:
+            self._total_duration += duration
+
+        for label in label_list:
+            if label.value not in self._label_lengths:
+                if self.keep_lengths:
+                    self._label_lengths[label.value] = array.array('d')
+                else:
+                    self._label_lengths[label.value] = LengthStatistics()
+
+            if self.keep_lengths:
+                self._label_lengths[label.value].append(label.duration)
+            else:
+                self._label_lengths[label.value].add(label.duration)
+
+    def label_set(self):
+        """
+        Return a label-set with the lengths of all labels.
+        If the lengths are not kept, the merged :class:`LengthStatistics` of all values are returned.
+        """
+        if not self.keep_lengths:
+            statistics = LengthStatistics()
+
+            for value_statistics in self._label_lengths.values():
+                statistics.merge(value_statistics)
+
+            return statistics
+
+        lengths = array.array('d')
+
+        for value_lengths in self._label_lengths.values():
+            lengths.extend(value_lengths)
+
+        return LabelSet(lengths=lengths)
+
+    def label_set_for_value(self, value):
+        """
+        Return a label-set with the lengths of all labels with the given value.
+        If the lengths are not kept, the :class:`LengthStatistics` of the value are returned.
+        """
+        if not self.keep_lengths:
+            return self._label_lengths.get(value, LengthStatistics())
+
+        return LabelSet(lengths=self._label_lengths.get(value, array.array('d')))
+
+    @property
+    def total_duration(self):
+        if self._num_missing_durations > 0:
+            raise ValueError('Missing durations for some utterances!')
+
+        return self._total_duration
+
+    @property
+    def all_values(self):
+        return set(self._label_lengths.keys())
 
 
 class LabelSet:
@@ -79,42 +363,263 @@ class LabelSet:
 
     For example we want to compute the average length of all labels with the value 'music'.
     We can then collect all these in a label-set and perform the computation.
+
+    The statistics are computed from the current labels on every access,
+    so labels can be added, replaced or changed at any time.
+    :meth:`describe` computes all statistics together in one pass over the lengths.
+
+    Arguments:
+        labels (list): The labels.
+        lengths (list): Lengths of additional labels, whose label objects are not available
+                        (e.g. from a :class:`SummaryOutcome`).
     """
 
-    def __init__(self, labels=None):
+    def __init__(self, labels=None, lengths=None):
         self.labels = labels or []
+        self.lengths = lengths if lengths is not None else []
 
     @property
     def count(self):
         """ Return the number of labels. """
-        return len(self.labels)
+        return len(self.labels) + len(self.lengths)
 
     @property
     def length_min(self):
         """ Return the length of the shortest label. """
-        return np.min(self.label_lengths)
+        return self.describe()['min']
 
     @property
     def length_max(self):
         """ Return the length of the longest label. """
-        return np.max(self.label_lengths)
+        return self.describe()['max']
 
     @property
     def length_mean(self):
         """ Return the mean length of all labels. """
-        return np.mean(self.label_lengths)
+        return self.describe()['mean']
 
     @property
     def length_median(self):
         """ Return the median of all label lengths. """
-        return np.median(self.label_lengths)
+        return self.describe()['median']
 
     @property
     def length_variance(self):
         """ Return the variance of all label lengths. """
-        return np.var(self.label_lengths)
+        return self.describe()['variance']
 
     @property
     def label_lengths(self):
         """ Return a list containing all label lengths. """
-        return [label.duration for label in self.labels]
+        return self._length_array().tolist()
+
+    def _length_array(self):
+        """ Return the lengths of all labels as array (float). """
+        label_lengths = np.fromiter((label.duration for label in self.labels), dtype=np.float64,
+                                    count=len(self.labels))
+        return np.concatenate([label_lengths, np.asarray(self.lengths, dtype=np.float64)])
+
+    def describe(self):
+        """
+        Return all statistics of the label lengths.
+        Min, max and median are taken from the sorted lengths, mean and variance from the same array.
+
+        Returns:
+            dict: The ``count``, ``min``, ``max``, ``mean``, ``median`` and ``variance``.
+            Except for the count, the values are ``nan`` if there are no labels.
+        """
+        lengths = self._length_array()
+
+        if len(lengths) == 0:
+            return {'count': 0, 'min': np.nan, 'max': np.nan, 'mean': np.nan, 'median': np.nan, 'variance': np.nan}
+
+        sorted_lengths = np.sort(lengths)
+        mean = np.mean(lengths)
+
+        return {
+            'count': len(lengths),
+            'min': sorted_lengths[0],
+            'max': sorted_lengths[-1],
+            'mean': mean,
+            'median': (sorted_lengths[(len(lengths) - 1) // 2] + sorted_lengths[len(lengths) // 2]) / 2,
+            'variance': np.mean((lengths - mean) ** 2)
+        }
+
+
+class LengthStatistics:
+    """
+    Statistics of label lengths, that are updated with every added length without keeping the lengths.
+    It provides the same statistics as a :class:`LabelSet` and can be merged with other statistics,
+    e.g. to combine the statistics of multiple values or of outcomes evaluated separately.
+
+    Count, min, max, mean and variance are exact. The added lengths are buffered
+    and added in batches, combining mean and variance with the parallel variant of Welford's algorithm.
+    The median is estimated with a quantile sketch, which counts the lengths in logarithmic bins.
+    The estimate has a relative error of at most ``relative_accuracy``.
+
+    Arguments:
+        relative_accuracy (float): Maximal relative error of the median.
+        buffer_size (int): Number of lengths that are collected before they are added at once.
+
+    Attributes:
+        relative_accuracy (float): Maximal relative error of the median.
+    """
+
+    def __init__(self, relative_accuracy=0.01, buffer_size=4096):
+        self.relative_accuracy = relative_accuracy
+        self.buffer_size = buffer_size
+
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self._gamma)
+
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+
+        # Bin index -> count, for positive lengths and for the absolute value of negative lengths
+        self._positive_bins = collections.Counter()
+        self._negative_bins = collections.Counter()
+        self._num_zeros = 0
+
+        self._buffer = array.array('d')
+
+    def add(self, length):
+        """
+        Add the length of a label.
+
+        Arguments:
+            length (float): The length.
+        """
+        self._buffer.append(length)
+
+        if len(self._buffer) >= self.buffer_size:
+            self._flush()
+
+    def merge(self, other):
+        """
+        Add all lengths of other statistics to these statistics.
+
+        Arguments:
+            other (LengthStatistics): The statistics to add. Must have the same relative accuracy.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Statistics with different relative accuracy can not be merged.')
+
+        self._flush()
+        other._flush()
+
+        self._combine(other._count, other._mean, other._m2, other._min, other._max)
+
+        self._positive_bins.update(other._positive_bins)
+        self._negative_bins.update(other._negative_bins)
+        self._num_zeros += other._num_zeros
+
+    @property
+    def count(self):
+        """ Return the number of labels. """
+        return self._count + len(self._buffer)
+
+    @property
+    def length_min(self):
+        """ Return the length of the shortest label. """
+        return self.describe()['min']
+
+    @property
+    def length_max(self):
+        """ Return the length of the longest label. """
+        return self.describe()['max']
+
+    @property
+    def length_mean(self):
+        """ Return the mean length of all labels. """
+        return self.describe()['mean']
+
+    @property
+    def length_median(self):
+        """ Return the (estimated) median of all label lengths. """
+        return self.describe()['median']
+
+    @property
+    def length_variance(self):
+        """ Return the variance of all label lengths. """
+        return self.describe()['variance']
+
+    def describe(self):
+        """
+        Return all statistics of the label lengths (see :meth:`LabelSet.describe`).
+
+        Returns:
+            dict: The ``count``, ``min``, ``max``, ``mean``, ``median`` and ``variance``.
+            Except for the count, the values are ``nan`` if there are no labels.
+        """
+        self._flush()
+
+        if self._count == 0:
+            return {'count': 0, 'min': np.nan, 'max': np.nan, 'mean': np.nan, 'median': np.nan, 'variance': np.nan}
+
+        median_rank = (self._count - 1) / 2
+        median = (self._value_at_rank(int(np.floor(median_rank))) + self._value_at_rank(int(np.ceil(median_rank)))) / 2
+
+        return {
+            'count': self._count,
+            'min': self._min,
+            'max': self._max,
+            'mean': self._mean,
+            'median': median,
+            'variance': self._m2 / self._count
+        }
+
+    def _flush(self):
+        """ Add the buffered lengths. """
+        if len(self._buffer) == 0:
+            return
+
+        lengths = np.array(self._buffer, dtype=np.float64)
+        self._buffer = array.array('d')
+
+        mean = np.mean(lengths)
+        self._combine(len(lengths), mean, np.sum((lengths - mean) ** 2), np.min(lengths), np.max(lengths))
+
+        for bins, values in ((self._positive_bins, lengths[lengths > 0]), (self._negative_bins, -lengths[lengths < 0])):
+            indices, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64),
+                                        return_counts=True)
+            bins.update(dict(zip(indices.tolist(), counts.tolist())))
+
+        self._num_zeros += int(np.count_nonzero(lengths == 0))
+
+    def _combine(self, count, mean, m2, length_min, length_max):
+        """ Combine the moments with the moments of other lengths. """
+        if count == 0:
+            return
+
+        total = self._count + count
+        delta = mean - self._mean
+
+        self._mean += delta * count / total
+        self._m2 += m2 + delta ** 2 * self._count * count / total
+        self._count = total
+
+        self._min = min(self._min, length_min)
+        self._max = max(self._max, length_max)
+
+    def _value_at_rank(self, rank):
+        """ Return the estimated length at the given position of the sorted lengths. """
+        bins = [(-self._bin_value(index), count) for index, count in sorted(self._negative_bins.items(), reverse=True)]
+        bins.append((0.0, self._num_zeros))
+        bins.extend((self._bin_value(index), count) for index, count in sorted(self._positive_bins.items()))
+
+        position = 0
+
+        for value, count in bins:
+            position += count
+
+            if rank < position:
+                return min(max(value, self._min), self._max)
+
+        return self._max
+
+    def _bin_value(self, index):
+        """ Return the value with the smallest relative error to all values in the bin. """
+        return 2 * self._gamma ** index / (self._gamma + 1)
@@ -0,0 +1,357 @@
+import collections.abc
+import concurrent.futures
+import os
+import re
+import warnings
+
+import numpy as np
+from audiomate import annotations
+
+TIME_JUNK_PATTERN = re.compile(r'[^0-9.\-]')
+
+# Lookup table of the bytes of ASCII whitespace, as removed by ``str.strip``
+IS_WHITESPACE = np.zeros(256, dtype=bool)
+IS_WHITESPACE[[ord(x) for x in ' \t\n\r\x0b\x0c']] = True
+
+
+def read_label_files(path, suffix='.txt', workers=None):
+    """
+    Read the labels of all utterances from a directory with one label file per utterance,
+    or from a single file containing the labels of all utterances.
+
+    The label files contain one label per line, with tab-separated start, end and value
+    (as written by audacity). The utterance-idx is the name of the file without ``suffix``.
+    The single file contains the utterance-idx as additional first column
+    (``utt-idx start end value``).
+
+    All files are read into one buffer, which is parsed at once (see :func:`parse_labels`).
+
+    Arguments:
+        path (str): Path to the directory or the single file.
+        suffix (str): Only files in the directory ending with this suffix are read.
+        workers (int): If greater than one, the files of the directory are read in this many threads.
+
+    Returns:
+        tuple: A tuple ``(utt-ids, offsets, values, value-ids, starts, ends)``.
+        The labels of the i-th utterance are at the positions ``offsets[i]:offsets[i + 1]``
+        of ``value-ids``, ``starts`` and ``ends`` (see :class:`LazyLabelLists`).
+    """
+    if not os.path.isdir(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        utt_fields, values, starts, ends = parse_labels(data, num_key_columns=1)
+        utt_ids, utt_indices = _unique_in_order(utt_fields)
+
+        # Group the labels by utterance, keeping the order within an utterance
+        order = np.argsort(utt_indices, kind='stable')
+        offsets = np.append(0, np.cumsum(np.bincount(utt_indices, minlength=len(utt_ids))))
+
+        value_table, value_ids = _unique_in_order([values[x] for x in order.tolist()])
+
+        return utt_ids, offsets.tolist(), value_table, value_ids.tolist(), \
+            starts[order].tolist(), ends[order].tolist()
+
+    file_names = sorted(name for name in os.listdir(path) if name.endswith(suffix))
+    file_paths = [os.path.join(path, name) for name in file_names]
+    utt_ids = [name[:len(name) - len(suffix)] for name in file_names]
+
+    if workers is not None and workers > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            contents = list(executor.map(_read_file, file_paths))
+    else:
+        contents = [_read_file(file_path) for file_path in file_paths]
+
+    # Every file has to end with a newline, so the last line of a file doesn't run into the next file
+    contents = [data if data.endswith(b'\n') or len(data) == 0 else data + b'\n' for data in contents]
+    file_starts = np.cumsum([0] + [len(data) for data in contents])
+
+    utt_indices, values, starts, ends = parse_labels(b''.join(contents), line_offsets=file_starts[:-1])
+    offsets = np.append(0, np.cumsum(np.bincount(utt_indices, minlength=len(utt_ids))))
+
+    value_table, value_ids = _unique_in_order(values)
+
+    return utt_ids, offsets.tolist(), value_table, value_ids.tolist(), starts.tolist(), ends.tolist()
+
+
+def parse_labels(data, num_key_columns=0, line_offsets=None):
+    """
+    Parse lines of tab-separated labels ``start end value``.
+    Like the audacity reader, whitespace around lines and fields is removed, empty lines are skipped
+    and lines without value get an empty value.
+
+    The lines are split with array operations on the raw bytes and all times are converted at once.
+    Only the values are extracted one by one.
+    If the times can't be parsed this way (e.g. a comma as decimal separator),
+    the lines are parsed one by one, removing invalid characters from the times.
+
+    Arguments:
+        data (bytes): The UTF-8 encoded lines.
+        num_key_columns (int): Number of columns before the start (``0`` or ``1``),
+                               which are returned instead of the line indices.
+        line_offsets (np.ndarray): Sorted byte offsets in ``data``.
+                                   If given, the index of the offset that precedes a line is returned for every line
+                                   (e.g. the file, if ``data`` consists of multiple files).
+
+    Returns:
+        tuple: A tuple ``(keys, values, starts, ends)``, with an entry for every label.
+        ``keys`` contains the key columns (list of str), if ``num_key_columns`` is ``1``,
+        otherwise the index of the line offset (if ``line_offsets`` is given) or the line (np.ndarray).
+        ``values`` is a list of str, ``starts`` and ``ends`` are float arrays.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+
+    line_ends = np.flatnonzero(buffer == ord('\n'))
+
+    if len(buffer) > 0 and buffer[-1] != ord('\n'):
+        line_ends = np.append(line_ends, len(buffer))
+
+    line_starts = np.append(0, line_ends + 1)[:-1]
+
+    line_starts, line_ends = _strip_lines(data, buffer, line_starts, line_ends)
+
+    # Skip empty lines
+    non_empty = line_ends > line_starts
+    line_starts = line_starts[non_empty]
+    line_ends = line_ends[non_empty]
+
+    if line_offsets is not None:
+        line_keys = np.searchsorted(line_offsets, line_starts, side='right') - 1
+    else:
+        line_keys = np.arange(len(line_starts))
+
+    # Positions of the first tabs of every line (``len(buffer)`` if there are no more tabs)
+    tabs = np.append(np.flatnonzero(buffer == ord('\t')), [len(buffer)] * (num_key_columns + 2))
+    first_tab = np.searchsorted(tabs, line_starts)
+    columns = [tabs[first_tab + x] for x in range(num_key_columns + 2)]
+
+    field_starts = [line_starts] + [column + 1 for column in columns]
+    field_ends = [np.minimum(column, line_ends) for column in columns] + [line_ends]
+
+    start_column = num_key_columns
+    value_column = num_key_columns + 2
+
+    # Lines without value end after the end time
+    has_value = columns[value_column - 1] < line_ends
+
+    if not np.all(columns[start_column] < line_ends):
+        return _parse_lines(data, line_starts, line_ends, line_keys, num_key_columns)
+
+    times = _parse_times(buffer, [
+        (field_starts[start_column], field_ends[start_column]),
+        (field_starts[start_column + 1], field_ends[start_column + 1])
+    ])
+
+    if times is None:
+        return _parse_lines(data, line_starts, line_ends, line_keys, num_key_columns)
+
+    values = _extract_fields(data, field_starts[value_column], field_ends[value_column], has_value)
+
+    if num_key_columns > 0:
+        keys = _extract_fields(data, field_starts[0], field_ends[0], np.ones(len(line_starts), dtype=bool))
+    else:
+        keys = line_keys
+
+    return keys, values, times[:, 0], times[:, 1]
+
+
+class LazyLabelLists(collections.abc.MutableMapping):
+    """
+    Mapping of utterance-ids to label-lists, stored as columnar arrays.
+    The label-lists are only created, when they are accessed the first time.
+    Label-lists can be added, replaced and removed like in a dict.
+
+    Arguments:
+        utt_ids (list): The utterance-ids.
+        label_list_ids (list): The idx of the label-list of every utterance.
+        offsets (list): The labels of the i-th utterance are at the positions ``offsets[i]:offsets[i + 1]``.
+        values (list): The distinct values.
+        value_ids (list): The index of the value of every label.
+        starts (list): The start of every label.
+        ends (list): The end of every label.
+    """
+
+    def __init__(self, utt_ids, label_list_ids, offsets, values, value_ids, starts, ends):
+        self._utt_positions = {utt_idx: index for index, utt_idx in enumerate(utt_ids)}
+        self._utt_ids = dict.fromkeys(utt_ids)
+        self._label_list_ids = label_list_ids
+        self._offsets = offsets
+        self._values = values
+        self._value_ids = value_ids
+        self._starts = starts
+        self._ends = ends
+        self._label_lists = {}
+
+    def __getitem__(self, utt_idx):
+        ll = self._label_lists.get(utt_idx)
+
+        if ll is None:
+            if utt_idx not in self._utt_ids:
+                raise KeyError(utt_idx)
+
+            index = self._utt_positions[utt_idx]
+            start = self._offsets[index]
+            end = self._offsets[index + 1]
+
+            labels = [
+                annotations.Label(self._values[value_id], label_start, label_end)
+                for value_id, label_start, label_end in zip(self._value_ids[start:end],
+                                                            self._starts[start:end],
+                                                            self._ends[start:end])
+            ]
+
+            ll = annotations.LabelList(idx=self._label_list_ids[index], labels=labels)
+            self._label_lists[utt_idx] = ll
+
+        return ll
+
+    def __setitem__(self, utt_idx, ll):
+        self._utt_ids[utt_idx] = None
+        self._label_lists[utt_idx] = ll
+
+    def __delitem__(self, utt_idx):
+        del self._utt_ids[utt_idx]
+        self._label_lists.pop(utt_idx, None)
+
+    def __iter__(self):
+        return iter(self._utt_ids)
+
+    def __len__(self):
+        return len(self._utt_ids)
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _strip_lines(data, buffer, starts, ends, vectorized_steps=2):
+    """
+    Remove whitespace at the start and end of the lines (given by the start and end positions in the buffer).
+    Usually there is none or a single byte (e.g. a carriage return), which is removed with array operations
+    in the first steps. Lines with more whitespace are stripped one by one.
+    """
+    starts = starts.copy()
+    ends = ends.copy()
+
+    for _ in range(vectorized_steps):
+        at_start = starts < ends
+        at_start[at_start] = IS_WHITESPACE[buffer[starts[at_start]]]
+        starts += at_start
+
+        at_end = starts < ends
+        at_end[at_end] = IS_WHITESPACE[buffer[ends[at_end] - 1]]
+        ends -= at_end
+
+        if not at_start.any() and not at_end.any():
+            return starts, ends
+
+    remaining = starts < ends
+    remaining[remaining] = IS_WHITESPACE[buffer[starts[remaining]]] | IS_WHITESPACE[buffer[ends[remaining] - 1]]
+
+    for index in np.flatnonzero(remaining).tolist():
+        line = data[starts[index]:ends[index]]
+        stripped = line.strip()
+
+        if len(stripped) == 0:
+            ends[index] = starts[index]
+        else:
+            starts[index] += len(line) - len(line.lstrip())
+            ends[index] = starts[index] + len(stripped)
+
+    return starts, ends
+
+
+def _parse_times(buffer, fields):
+    """
+    Parse the times in the given fields (tuples of start and end positions in the buffer) at once.
+    Return an array with the times of all lines (the fields of a line in order),
+    ``None`` if any time contains other characters than digits, ``.`` and ``-``.
+    """
+    # Mark the bytes of the fields with +1 at the start and -1 after the end
+    counts = np.zeros(len(buffer) + 1, dtype=np.int64)
+
+    for starts, ends in fields:
+        counts += np.bincount(starts, minlength=len(counts)) - np.bincount(ends, minlength=len(counts))
+
+    in_field = np.cumsum(counts[:-1]) > 0
+    field_bytes = buffer[in_field]
+
+    is_number = ((field_bytes >= ord('0')) & (field_bytes <= ord('9'))) | \
+        (field_bytes == ord('.')) | (field_bytes == ord('-'))
+
+    if not np.all(is_number):
+        return None
+
+    # All other bytes become whitespace, which separates the times
+    times_buffer = np.where(in_field, buffer, np.uint8(ord(' ')))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+
+        try:
+            times = np.fromstring(times_buffer.tobytes(), dtype=np.float64, sep=' ')
+        except ValueError:
+            return None
+
+    if len(times) != len(fields) * len(fields[0][0]):
+        return None
+
+    return times.reshape(-1, len(fields))
+
+
+def _extract_fields(data, starts, ends, mask):
+    """
+    Return the decoded and stripped fields between ``starts`` and ``ends`` (empty string where ``mask`` is False).
+    """
+    return [
+        data[start:end].decode('utf-8').strip() if valid else ''
+        for start, end, valid in zip(starts.tolist(), ends.tolist(), mask.tolist())
+    ]
+
+
+def _parse_lines(data, line_starts, line_ends, line_keys, num_key_columns):
+    """ Parse the lines one by one, removing invalid characters from the times (like the audacity reader). """
+    keys = []
+    values = []
+    times = []
+
+    for start, end, key in zip(line_starts.tolist(), line_ends.tolist(), line_keys.tolist()):
+        line = data[start:end].decode('utf-8').strip()
+
+        # Lines with other than ASCII whitespace only are not skipped before
+        if line == '':
+            continue
+
+        record = [field.strip() for field in line.split('\t', num_key_columns + 2)]
+
+        if len(record) < num_key_columns + 2:
+            raise ValueError('Invalid label line: {}'.format(line))
+
+        if num_key_columns > 0:
+            key = record[0]
+            record = record[num_key_columns:]
+
+        keys.append(key)
+        values.append(record[2] if len(record) > 2 else '')
+        times.append(float(_clean_time(record[0])))
+        times.append(float(_clean_time(record[1])))
+
+    times = np.array(times, dtype=np.float64)
+
+    if num_key_columns == 0:
+        keys = np.array(keys, dtype=np.int64)
+
+    return keys, values, times[0::2], times[1::2]
+
+
+def _clean_time(time_str):
+    return re.sub(TIME_JUNK_PATTERN, '', time_str.replace(',', '.'))
+
+
+def _unique_in_order(items):
+    """ Return the distinct items in order of their first occurrence and the index of every item. """
+    table = {}
+    indices = np.array([table.setdefault(item, len(table)) for item in items], dtype=np.int64)
+
+    return list(table.keys()), indices
@@ -1,5 +1,6 @@
 from evalmate import confusion
 from evalmate import alignment
+from evalmate.alignment import batch
 
 from . import evaluator
 
@@ -11,6 +12,9 @@ class SegmentEvaluation(evaluator.Evaluation):
     Arguments:
         utt_to_segments (dict): Dict of lists with :py:class:`evalmate.alignment.Segment`.
                                 Key is the utterance-idx.
+                                ``None`` if the segments were not kept, in which case ``confusion`` has to be given.
+        confusion (AggregatedConfusion): The confusion of the segments.
+                                         If ``None``, it is created from ``utt_to_segments``.
 
     Attributes:
         ref_outcome (Outcome): The outcome of the ground-truth/reference.
@@ -18,16 +22,50 @@ class SegmentEvaluation(evaluator.Evaluation):
         confusion (AggregatedConfusion): Confusion result
     """
 
-    def __init__(self, ref_outcome, hyp_outcome, utt_to_segments):
+    def __init__(self, ref_outcome, hyp_outcome, utt_to_segments, confusion=None):
         super(SegmentEvaluation, self).__init__(ref_outcome, hyp_outcome)
 
         self.utt_to_segments = utt_to_segments
-        self.confusion = confusion.create_from_segments(self.segments)
+
+        if confusion is None:
+            confusion = self._confusion_from_segments()
+
+        self.confusion = confusion
+
+    def _confusion_from_segments(self):
+        return confusion.create_from_segments(self.segments)
 
     @property
     def default_template(self):
         return 'segment'
 
+    def add_evaluation(self, other):
+        if self.utt_to_segments is not None and other.utt_to_segments is None:
+            raise ValueError('The segments of the evaluation to add were not kept.')
+
+        self._add_outcomes(other)
+
+        if self.utt_to_segments is not None:
+            self.utt_to_segments.update(other.utt_to_segments)
+
+        self.confusion.add(other.confusion)
+
+    def remove_evaluation(self, other):
+        utt_ids = self._remove_outcomes(other)
+        removed_confusion = other.confusion
+
+        if self.utt_to_segments is not None:
+            removed_segments = []
+
+            for utt_idx in utt_ids:
+                removed_segments.extend(self.utt_to_segments.pop(utt_idx))
+
+            # A confusion keeping the segments has to be updated with the stored segment objects
+            if any(isinstance(x, confusion.SegmentConfusion) for x in self.confusion.instances.values()):
+                removed_confusion = confusion.create_from_segments(removed_segments)
+
+        self.confusion.subtract(removed_confusion)
+
     @property
     def template_data(self):
         return {
@@ -38,9 +76,17 @@ class SegmentEvaluation(evaluator.Evaluation):
             'confusion': self.confusion
         }
 
+    def _check_template(self, name):
+        if name == 'segment_detail' and self.utt_to_segments is None:
+            raise ValueError('The template segment_detail needs the segments, '
+                             'which are not kept with keep_segments=False (use keep_segments=True).')
+
     @property
     def segments(self):
         """ Return a list of all segment (from all utterances together). """
+        if self.utt_to_segments is None:
+            raise ValueError('The segments were not kept for this evaluation.')
+
         all_segments = []
 
         for utt_segments in self.utt_to_segments.values():
@@ -56,14 +102,43 @@ class SegmentEvaluator(evaluator.Evaluator):
     Arguments:
         aligner (SegmentAligner): An instance of an event-aligner to use.
                                   If not given, the :class:`alignment.InvariantSegmentAligner` is used.
+        keep_segments (bool): If ``False``, the segments of every utterance are added to the confusion
+                              as they are created and are not kept in the evaluation
+                              (``SegmentEvaluation.utt_to_segments`` is ``None``).
+                              The confusion only sums up the durations
+                              (:class:`evalmate.confusion.SegmentDurationConfusion`).
+                              So only the segments of a single utterance are kept in memory at once.
+                              The report ``segment_detail``, which lists the segments of every utterance,
+                              needs ``keep_segments=True``.
+        multi_label (bool): If ``True``, overlapping labels are allowed and every value is evaluated
+                            independently (see :func:`evalmate.confusion.create_from_segment_masks`).
+                            The time a value is active in ref and hyp is correct, the time it is only active
+                            in hyp is an insertion and the time it is only active in ref is a deletion.
+                            The segments keep the lists of ref/hyp labels and carry bitmasks of the active values.
+                            As with a single label, the report ``segment_detail`` needs ``keep_segments=True``.
+                            Requires an aligner that supports ``iter_align_masks``
+                            (e.g. :class:`alignment.InvariantSegmentAligner`).
+        cache (AlignmentCache): If given, the alignments of the utterances are loaded from/stored in this cache,
+                                so only utterances with changed labels are aligned again.
+                                Not used with ``multi_label=True``.
+        workers (int): If greater than one, the utterances are aligned in a pool of this many processes
+                       (see :func:`evalmate.alignment.batch.align_utterances`).
+                       All segments are created before they are added to the confusion,
+                       so even with ``keep_segments=False`` the segments of all utterances are kept in memory at once.
+                       Not used with ``multi_label=True``.
     """
 
-    def __init__(self, aligner=None):
+    def __init__(self, aligner=None, keep_segments=True, multi_label=False, cache=None, workers=None):
         if aligner is None:
             self.aligner = alignment.InvariantSegmentAligner()
         else:
             self.aligner = aligner
 
+        self.keep_segments = keep_segments
+        self.multi_label = multi_label
+        self.cache = cache
+        self.workers = workers
+
     @classmethod
     def default_label_list_idx(cls):
         return 'domain'
@@ -71,17 +146,116 @@ class SegmentEvaluator(evaluator.Evaluator):
     def create_alignment(self, ref, hyp):
         utt_segments = {}
 
-        for key, ll_ref in ref.label_lists.items():
-            ll_hyp = hyp.label_lists[key]
+        for key, aligned_segments in self.iter_alignment(ref, hyp):
+            utt_segments[key] = list(aligned_segments)
 
-            aligned_segments = self.aligner.align(ll_ref, ll_hyp)
-            aligned_segments = SegmentEvaluator.flatten_overlapping_labels(aligned_segments)
+        return utt_segments
 
-            utt_segments[key] = aligned_segments
+    def iter_alignment(self, ref, hyp):
+        """
+        Align the label-lists of all utterances one after another.
 
-        return utt_segments
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+
+        Returns:
+            generator: A generator yielding a tuple ``(utterance-idx, segments)`` for every utterance.
+            ``segments`` is an iterator over the flattened segments of the utterance
+            (see :meth:`flatten_overlapping_labels`).
+        """
+        if self.cache is None and (self.workers is None or self.workers <= 1):
+            for key in ref.label_lists.keys():
+                ref_labels = ref.derived('canonical-labels', key, alignment.AlignmentCache.canonical_order)
+                hyp_labels = alignment.AlignmentCache.canonical_order(hyp.label_lists[key])
+                aligned_segments = self.aligner.iter_align(ref_labels, hyp_labels)
+                yield key, SegmentEvaluator.iter_flatten_overlapping_labels(aligned_segments)
+
+            return
+
+        keys = list(ref.label_lists.keys())
+        utterances = [
+            (
+                ref.derived('canonical-labels', key, alignment.AlignmentCache.canonical_order),
+                alignment.AlignmentCache.canonical_order(hyp.label_lists[key])
+            )
+            for key in keys
+        ]
+
+        results = batch.align_utterances('segments', self.aligner, utterances, cache=self.cache, workers=self.workers)
+
+        for key, (ref_labels, hyp_labels), arrays in zip(keys, utterances, results):
+            aligned_segments = batch.segments_from_arrays(arrays, ref_labels, hyp_labels)
+            yield key, SegmentEvaluator.iter_flatten_overlapping_labels(aligned_segments)
+
+    def iter_multi_label_alignment(self, ref, hyp, value_ids):
+        """
+        Align the label-lists of all utterances one after another,
+        with bitmasks of the active values in every segment.
+
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+            value_ids (dict): The index (bit) for every value.
+
+        Returns:
+            generator: A generator yielding a tuple ``(utterance-idx, segments)`` for every utterance.
+            ``segments`` is an iterator over the segments of the utterance
+            (see :meth:`alignment.InvariantSegmentAligner.iter_align_masks`).
+        """
+        for key in ref.label_lists.keys():
+            ref_labels = ref.derived('canonical-labels', key, alignment.AlignmentCache.canonical_order)
+            yield key, self.aligner.iter_align_masks(ref_labels, hyp.label_lists[key], value_ids)
+
+    def create_confusion(self, ref, hyp):
+        """
+        Create the confusion of all utterances, without keeping the segments of the alignment.
+        The confusion contains a :class:`evalmate.confusion.SegmentDurationConfusion` for every value.
+
+        Arguments:
+            ref (Outcome): The ground-truth/reference outcome.
+            hyp (Outcome): The system-output/hypothesis outcome.
+
+        Returns:
+            AggregatedConfusion: The confusion.
+        """
+        if self.multi_label:
+            return self._evaluate_multi_label(ref, hyp, keep_segments=False)[1]
+
+        cnf = confusion.AggregatedConfusion()
+
+        for key, aligned_segments in self.iter_alignment(ref, hyp):
+            confusion.create_from_segments(aligned_segments, cnf=cnf, keep_segments=False)
+
+        return cnf
+
+    def create_confusion_evaluation(self, ref, hyp, cnf):
+        return SegmentEvaluation(ref, hyp, None, confusion=cnf)
+
+    def _evaluate_multi_label(self, ref, hyp, keep_segments):
+        values = sorted(ref.all_values | hyp.all_values)
+        value_ids = {value: index for index, value in enumerate(values)}
+
+        cnf = confusion.AggregatedConfusion()
+        utt_segments = {} if keep_segments else None
+
+        for key, aligned_segments in self.iter_multi_label_alignment(ref, hyp, value_ids):
+            if keep_segments:
+                aligned_segments = list(aligned_segments)
+                utt_segments[key] = aligned_segments
+
+            confusion.create_from_segment_masks(aligned_segments, values, cnf=cnf)
+
+        return utt_segments, cnf
 
     def do_evaluate(self, ref, hyp):
+        if self.multi_label:
+            utt_segments, cnf = self._evaluate_multi_label(ref, hyp, keep_segments=self.keep_segments)
+            return SegmentEvaluation(ref, hyp, utt_segments, confusion=cnf)
+
+        if not self.keep_segments:
+            return SegmentEvaluation(ref, hyp, None, confusion=self.create_confusion(ref, hyp))
+
         utt_segments = self.create_alignment(ref, hyp)
         return SegmentEvaluation(ref, hyp, utt_segments)
 
@@ -97,6 +271,22 @@ class SegmentEvaluator(evaluator.Evaluator):
         Returns:
             list: List of segments where ref and hyp is a single label.
 
+        Raises:
+            ValueError: A segment contains overlapping labels.
+        """
+        return list(SegmentEvaluator.iter_flatten_overlapping_labels(aligned_segments))
+
+    @staticmethod
+    def iter_flatten_overlapping_labels(aligned_segments):
+        """
+        Same as :meth:`flatten_overlapping_labels`, but process and yield the segments one after another.
+
+        Arguments:
+            aligned_segments (iterable): Segments.
+
+        Returns:
+            generator: A generator yielding segments where ref and hyp is a single label.
+
         Raises:
             ValueError: A segment contains overlapping labels.
         """
@@ -117,4 +307,4 @@ class SegmentEvaluator(evaluator.Evaluator):
             else:
                 segment.hyp = None
 
-        return aligned_segments
+            yield segment
@@ -0,0 +1,437 @@
+import numpy as np
+from audiomate import annotations
+
+from evalmate import alignment
+from evalmate import confusion
+
+from . import outcome
+from . import reader
+from . import event
+from . import asr
+from . import kws
+from . import segment
+
+FORMAT_VERSION = 1
+
+EVALUATION_TYPES = {
+    cls.__name__: cls for cls in [
+        event.EventEvaluation,
+        asr.ASREvaluation,
+        kws.KWSEvaluation,
+        segment.SegmentEvaluation
+    ]
+}
+
+
+def save_evaluation(evaluation, path):
+    """
+    Save an evaluation to a compressed ``.npz`` file.
+    The outcomes, the alignment and the confusion are stored as arrays,
+    so the evaluation can be loaded with :func:`load_evaluation` without aligning the labels again.
+
+    Only the value, start and end of the labels are stored.
+    Supported are :class:`EventEvaluation`, :class:`SegmentEvaluation` and their subclasses.
+
+    Arguments:
+        evaluation (Evaluation): The evaluation to save.
+        path (str): Path of the file to write.
+    """
+    evaluation_type = type(evaluation).__name__
+
+    if evaluation_type not in EVALUATION_TYPES:
+        raise ValueError('Saving evaluations of type {} is not supported.'.format(evaluation_type))
+
+    if isinstance(evaluation.ref_outcome, outcome.SummaryOutcome) or \
+            isinstance(evaluation.hyp_outcome, outcome.SummaryOutcome):
+        raise ValueError('Saving evaluations with summary outcomes is not supported.')
+
+    if isinstance(evaluation, event.EventEvaluation) and evaluation.alignment is None:
+        raise ValueError('Saving evaluations without alignment is not supported.')
+
+    arrays = {
+        'format_version': np.array(FORMAT_VERSION),
+        'evaluation_type': np.array(evaluation_type)
+    }
+
+    arrays.update(_outcome_arrays('ref_outcome', evaluation.ref_outcome))
+    arrays.update(_outcome_arrays('hyp_outcome', evaluation.hyp_outcome))
+
+    if isinstance(evaluation, event.EventEvaluation):
+        arrays.update(_alignment_store_arrays('alignment', evaluation.alignment))
+    else:
+        arrays.update(_segment_arrays('segments', evaluation.utt_to_segments))
+        arrays.update(_segment_confusion_arrays('confusion', evaluation.confusion, evaluation.utt_to_segments))
+
+    np.savez_compressed(path, **arrays)
+
+
+def load_evaluation(path):
+    """
+    Load an evaluation, that was saved with :func:`save_evaluation`.
+
+    Arguments:
+        path (str): Path of the file to load.
+
+    Returns:
+        Evaluation: The evaluation.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = dict(data.items())
+
+    if int(arrays['format_version']) != FORMAT_VERSION:
+        raise ValueError('Unsupported format version {}.'.format(int(arrays['format_version'])))
+
+    evaluation_cls = EVALUATION_TYPES[str(arrays['evaluation_type'])]
+
+    ref_outcome = _create_outcome('ref_outcome', arrays)
+    hyp_outcome = _create_outcome('hyp_outcome', arrays)
+
+    if issubclass(evaluation_cls, event.EventEvaluation):
+        store = _create_alignment_store('alignment', arrays)
+        return evaluation_cls(ref_outcome, hyp_outcome, store)
+
+    utt_to_segments = _create_segments('segments', arrays)
+    cnf = _create_segment_confusion('confusion', arrays)
+
+    return evaluation_cls(ref_outcome, hyp_outcome, utt_to_segments, confusion=cnf)
+
+
+class _LabelTable(object):
+    """ Collects labels into arrays (value-id, start, end), every distinct label object is stored once. """
+
+    def __init__(self):
+        self.values = []
+        self.value_ids = {}
+        self.label_indices = {}
+
+        self.label_value_ids = []
+        self.starts = []
+        self.ends = []
+
+    def add(self, label):
+        """ Add the label (if not already added) and return its index. """
+        index = self.label_indices.get(id(label))
+
+        if index is None:
+            value_id = self.value_ids.get(label.value)
+
+            if value_id is None:
+                value_id = len(self.values)
+                self.value_ids[label.value] = value_id
+                self.values.append(label.value)
+
+            index = len(self.starts)
+            self.label_indices[id(label)] = index
+            self.label_value_ids.append(value_id)
+            self.starts.append(label.start)
+            self.ends.append(label.end)
+
+        return index
+
+    def arrays(self, prefix):
+        return {
+            '{}_values'.format(prefix): _string_array(self.values),
+            '{}_value_ids'.format(prefix): np.array(self.label_value_ids, dtype=np.int32),
+            '{}_starts'.format(prefix): np.array(self.starts, dtype=np.float64),
+            '{}_ends'.format(prefix): np.array(self.ends, dtype=np.float64)
+        }
+
+    @staticmethod
+    def create_labels(prefix, arrays):
+        """ Create the labels from the arrays with the given prefix. """
+        values = arrays['{}_values'.format(prefix)].tolist()
+        value_ids = arrays['{}_value_ids'.format(prefix)].tolist()
+        starts = arrays['{}_starts'.format(prefix)].tolist()
+        ends = arrays['{}_ends'.format(prefix)].tolist()
+
+        return [
+            annotations.Label(values[value_id], start, end)
+            for value_id, start, end in zip(value_ids, starts, ends)
+        ]
+
+
+def _string_array(strings):
+    return np.array([str(x) for x in strings], dtype=np.str_)
+
+
+def _outcome_arrays(prefix, outcome_to_save):
+    table = _LabelTable()
+    offsets = [0]
+    label_list_ids = []
+
+    for ll in outcome_to_save.label_lists.values():
+        for label in ll:
+            table.add(label)
+
+        offsets.append(len(table.starts))
+        label_list_ids.append(ll.idx)
+
+    durations = outcome_to_save.utterance_durations
+
+    arrays = {
+        '{}_utt_ids'.format(prefix): _string_array(outcome_to_save.label_lists.keys()),
+        '{}_label_list_ids'.format(prefix): _string_array(label_list_ids),
+        '{}_label_offsets'.format(prefix): np.array(offsets, dtype=np.int64),
+        '{}_duration_utt_ids'.format(prefix): _string_array(durations.keys()),
+        '{}_durations'.format(prefix): np.array(list(durations.values()), dtype=np.float64)
+    }
+
+    arrays.update(table.arrays('{}_label'.format(prefix)))
+
+    return arrays
+
+
+def _create_outcome(prefix, arrays):
+    label_lists = reader.LazyLabelLists(
+        arrays['{}_utt_ids'.format(prefix)].tolist(),
+        arrays['{}_label_list_ids'.format(prefix)].tolist(),
+        arrays['{}_label_offsets'.format(prefix)].tolist(),
+        arrays['{}_label_values'.format(prefix)].tolist(),
+        arrays['{}_label_value_ids'.format(prefix)].tolist(),
+        arrays['{}_label_starts'.format(prefix)].tolist(),
+        arrays['{}_label_ends'.format(prefix)].tolist()
+    )
+
+    durations = dict(zip(
+        arrays['{}_duration_utt_ids'.format(prefix)].tolist(),
+        arrays['{}_durations'.format(prefix)].tolist()
+    ))
+
+    return outcome.Outcome(label_lists=label_lists, utterance_durations=durations)
+
+
+def _alignment_store_arrays(prefix, store):
+    arrays = {
+        '{}_utt_ids'.format(prefix): _string_array(store.utt_ids),
+        '{}_values'.format(prefix): _string_array(store.values)
+    }
+
+    for name, array in store.arrays().items():
+        arrays['{}_{}'.format(prefix, name)] = array
+
+    return arrays
+
+
+def _create_alignment_store(prefix, arrays):
+    start = len(prefix) + 1
+    store_arrays = {key[start:]: value for key, value in arrays.items() if key.startswith('{}_'.format(prefix))}
+
+    return alignment.AlignmentStore.from_arrays(
+        store_arrays.pop('utt_ids').tolist(),
+        store_arrays.pop('values').tolist(),
+        store_arrays
+    )
+
+
+def _segment_arrays(prefix, utt_to_segments):
+    if utt_to_segments is None:
+        return {'{}_kept'.format(prefix): np.array(False)}
+
+    ref_table = _LabelTable()
+    hyp_table = _LabelTable()
+
+    utt_offsets = [0]
+    starts = []
+    ends = []
+    ref_offsets = [0]
+    ref_indices = []
+    hyp_offsets = [0]
+    hyp_indices = []
+    ref_masks = []
+    hyp_masks = []
+
+    flattened = True
+    with_masks = True
+
+    for utt_segments in utt_to_segments.values():
+        for seg in utt_segments:
+            starts.append(seg.start)
+            ends.append(seg.end)
+
+            for labels, table, indices, offsets in ((seg.ref, ref_table, ref_indices, ref_offsets),
+                                                    (seg.hyp, hyp_table, hyp_indices, hyp_offsets)):
+                if isinstance(labels, list):
+                    flattened = False
+                elif labels is None:
+                    labels = []
+                else:
+                    labels = [labels]
+
+                indices.extend(table.add(label) for label in labels)
+                offsets.append(len(indices))
+
+            with_masks = with_masks and seg.ref_mask is not None and seg.hyp_mask is not None
+            ref_masks.append(seg.ref_mask)
+            hyp_masks.append(seg.hyp_mask)
+
+        utt_offsets.append(len(starts))
+
+    arrays = {
+        '{}_kept'.format(prefix): np.array(True),
+        '{}_flattened'.format(prefix): np.array(flattened),
+        '{}_utt_ids'.format(prefix): _string_array(utt_to_segments.keys()),
+        '{}_utt_offsets'.format(prefix): np.array(utt_offsets, dtype=np.int64),
+        '{}_starts'.format(prefix): np.array(starts, dtype=np.float64),
+        '{}_ends'.format(prefix): np.array(ends, dtype=np.float64),
+        '{}_ref_offsets'.format(prefix): np.array(ref_offsets, dtype=np.int64),
+        '{}_ref_indices'.format(prefix): np.array(ref_indices, dtype=np.int64),
+        '{}_hyp_offsets'.format(prefix): np.array(hyp_offsets, dtype=np.int64),
+        '{}_hyp_indices'.format(prefix): np.array(hyp_indices, dtype=np.int64)
+    }
+
+    arrays.update(ref_table.arrays('{}_ref_label'.format(prefix)))
+    arrays.update(hyp_table.arrays('{}_hyp_label'.format(prefix)))
+
+    if with_masks and len(starts) > 0:
+        arrays['{}_ref_masks'.format(prefix)] = _masks_to_words(ref_masks)
+        arrays['{}_hyp_masks'.format(prefix)] = _masks_to_words(hyp_masks)
+
+    return arrays
+
+
+def _create_segments(prefix, arrays):
+    if not bool(arrays['{}_kept'.format(prefix)]):
+        return None
+
+    flattened = bool(arrays['{}_flattened'.format(prefix)])
+    ref_labels = _LabelTable.create_labels('{}_ref_label'.format(prefix), arrays)
+    hyp_labels = _LabelTable.create_labels('{}_hyp_label'.format(prefix), arrays)
+
+    starts = arrays['{}_starts'.format(prefix)].tolist()
+    ends = arrays['{}_ends'.format(prefix)].tolist()
+    ref_offsets = arrays['{}_ref_offsets'.format(prefix)].tolist()
+    ref_indices = arrays['{}_ref_indices'.format(prefix)].tolist()
+    hyp_offsets = arrays['{}_hyp_offsets'.format(prefix)].tolist()
+    hyp_indices = arrays['{}_hyp_indices'.format(prefix)].tolist()
+
+    ref_masks = None
+    hyp_masks = None
+
+    if '{}_ref_masks'.format(prefix) in arrays:
+        ref_masks = _words_to_masks(arrays['{}_ref_masks'.format(prefix)])
+        hyp_masks = _words_to_masks(arrays['{}_hyp_masks'.format(prefix)])
+
+    segments = []
+
+    for index, (start, end) in enumerate(zip(starts, ends)):
+        ref = [ref_labels[x] for x in ref_indices[ref_offsets[index]:ref_offsets[index + 1]]]
+        hyp = [hyp_labels[x] for x in hyp_indices[hyp_offsets[index]:hyp_offsets[index + 1]]]
+
+        if flattened:
+            ref = ref[0] if len(ref) > 0 else None
+            hyp = hyp[0] if len(hyp) > 0 else None
+
+        seg = alignment.Segment(start, end, ref, hyp)
+
+        if ref_masks is not None:
+            seg.ref_mask = ref_masks[index]
+            seg.hyp_mask = hyp_masks[index]
+
+        segments.append(seg)
+
+    utt_ids = arrays['{}_utt_ids'.format(prefix)].tolist()
+    utt_offsets = arrays['{}_utt_offsets'.format(prefix)].tolist()
+
+    return {
+        utt_idx: segments[utt_offsets[index]:utt_offsets[index + 1]]
+        for index, utt_idx in enumerate(utt_ids)
+    }
+
+
+def _masks_to_words(masks):
+    """ Split integer bitmasks into a matrix of 64-bit words (lowest word first). """
+    num_words = max(1, (max(masks).bit_length() + 63) // 64)
+    words = np.zeros((len(masks), num_words), dtype=np.uint64)
+
+    for word_index in range(num_words):
+        shift = 64 * word_index
+        words[:, word_index] = [(mask >> shift) & 0xFFFFFFFFFFFFFFFF for mask in masks]
+
+    return words
+
+
+def _words_to_masks(words):
+    """ Join a matrix of 64-bit words (lowest word first) into integer bitmasks. """
+    masks = [0] * words.shape[0]
+
+    for word_index in range(words.shape[1]):
+        shift = 64 * word_index
+
+        for index, word in enumerate(words[:, word_index].tolist()):
+            masks[index] |= word << shift
+
+    return masks
+
+
+def _segment_confusion_arrays(prefix, cnf, utt_to_segments):
+    instances = list(cnf.instances.values())
+
+    if all(isinstance(x, confusion.SegmentConfusion) for x in instances) and utt_to_segments is not None:
+        # Created from the segments again when loading
+        return {'{}_from_segments'.format(prefix): np.array(True)}
+
+    if not all(isinstance(x, confusion.SegmentDurationConfusion) for x in instances):
+        raise ValueError('The confusion has to consist of segment confusions.')
+
+    values = [x.value for x in instances]
+    value_ids = {value: index for index, value in enumerate(values)}
+
+    for instance in instances:
+        for other_value in instance.substitution_durations.keys():
+            if other_value not in value_ids:
+                value_ids[other_value] = len(values)
+                values.append(other_value)
+
+    substitutions = np.zeros((len(values), len(values)), dtype=np.float64)
+    substitutions_out = np.zeros((len(values), len(values)), dtype=np.float64)
+
+    for index, instance in enumerate(instances):
+        for other_value, duration in instance.substitution_durations.items():
+            substitutions[index, value_ids[other_value]] = duration
+
+        for other_value, duration in instance.substitution_out_durations.items():
+            if other_value not in value_ids:
+                raise ValueError('Unknown value {} in the confusion.'.format(other_value))
+
+            substitutions_out[index, value_ids[other_value]] = duration
+
+    return {
+        '{}_from_segments'.format(prefix): np.array(False),
+        '{}_values'.format(prefix): _string_array(values),
+        '{}_num_instances'.format(prefix): np.array(len(instances)),
+        '{}_correct'.format(prefix): np.array([x.correct_duration for x in instances], dtype=np.float64),
+        '{}_insertions'.format(prefix): np.array([x.insertion_duration for x in instances], dtype=np.float64),
+        '{}_deletions'.format(prefix): np.array([x.deletion_duration for x in instances], dtype=np.float64),
+        '{}_substitutions'.format(prefix): substitutions,
+        '{}_substitutions_out'.format(prefix): substitutions_out
+    }
+
+
+def _create_segment_confusion(prefix, arrays):
+    if bool(arrays['{}_from_segments'.format(prefix)]):
+        return None
+
+    values = arrays['{}_values'.format(prefix)].tolist()
+    correct = arrays['{}_correct'.format(prefix)].tolist()
+    insertions = arrays['{}_insertions'.format(prefix)].tolist()
+    deletions = arrays['{}_deletions'.format(prefix)].tolist()
+    substitutions = arrays['{}_substitutions'.format(prefix)]
+    substitutions_out = arrays['{}_substitutions_out'.format(prefix)]
+
+    cnf = confusion.AggregatedConfusion()
+
+    for index in range(int(arrays['{}_num_instances'.format(prefix)])):
+        instance = confusion.SegmentDurationConfusion(values[index])
+        instance.correct_duration = correct[index]
+        instance.insertion_duration = insertions[index]
+        instance.deletion_duration = deletions[index]
+
+        for other_index in np.flatnonzero(substitutions[index]).tolist():
+            instance.add_substitution_duration(float(substitutions[index, other_index]), values[other_index])
+
+        for other_index in np.flatnonzero(substitutions_out[index]).tolist():
+            instance.add_substitution_out_duration(float(substitutions_out[index, other_index]), values[other_index])
+
+        cnf.instances[values[index]] = instance
+
+    return cnf
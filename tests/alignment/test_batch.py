@@ -0,0 +1,172 @@
+import os
+
+from audiomate import annotations
+
+from evalmate import alignment
+from evalmate import evaluator
+from evalmate.alignment import batch
+
+import pytest
+
+
+def labels(*values):
+    return [annotations.Label(value, index, index + 1) for index, value in enumerate(values)]
+
+
+@pytest.fixture
+def utterances():
+    return [
+        (labels('a', 'b', 'c', 'd'), labels('a', 'x', 'd', 'e')),
+        (labels('a', 'b'), labels()),
+        (labels(), labels('x', 'y')),
+        (labels('k', 'l', 'm'), labels('k', 'l', 'm')),
+        (labels('s', 't'), labels('u', 's', 't'))
+    ]
+
+
+def test_align_utterances_ops_in_pool(utterances):
+    aligner = alignment.LevenshteinAligner()
+    results = batch.align_utterances('ops', aligner, utterances, workers=2, chunks_per_worker=2)
+
+    assert [x['ops'].tobytes().decode('ascii') for x in results] == \
+        [aligner.align_ops(ref, hyp) for ref, hyp in utterances]
+
+
+def test_align_utterances_indices_in_pool(utterances):
+    aligner = alignment.BipartiteMatchingAligner()
+    serial = batch.align_utterances('indices', aligner, utterances)
+    parallel = batch.align_utterances('indices', aligner, utterances, workers=3)
+
+    assert len(parallel) == len(utterances)
+
+    for expected, result in zip(serial, parallel):
+        assert result['ref_indices'].tolist() == expected['ref_indices'].tolist()
+        assert result['hyp_indices'].tolist() == expected['hyp_indices'].tolist()
+
+
+def test_align_utterances_segments_in_pool():
+    aligner = alignment.InvariantSegmentAligner()
+    ref = [annotations.Label('a', 0, 3), annotations.Label('b', 3, 6)]
+    hyp = [annotations.Label('a', 0, 4), annotations.Label('c', 1, 2)]
+
+    results = batch.align_utterances('segments', aligner, [(ref, hyp), (hyp, ref)], workers=2)
+    segments = batch.segments_from_arrays(results[0], ref, hyp)
+
+    assert segments == aligner.align(ref, hyp)
+    assert segments[1].hyp[0] is hyp[0]
+    assert batch.segments_from_arrays(results[1], hyp, ref) == aligner.align(hyp, ref)
+
+
+def test_align_utterances_with_cache(utterances, tmpdir):
+    cache = alignment.AlignmentCache(os.path.join(tmpdir.strpath, 'cache'))
+    aligner = alignment.LevenshteinAligner()
+
+    batch.align_utterances('ops', aligner, utterances[:2], cache=cache, workers=2)
+    results = batch.align_utterances('ops', aligner, utterances, cache=cache, workers=2)
+
+    assert cache.hits == 2
+    assert cache.misses == 5
+    assert [x['ops'].tobytes().decode('ascii') for x in results] == \
+        [aligner.align_ops(ref, hyp) for ref, hyp in utterances]
+
+
+def test_compute_alignment_is_independent_of_label_order():
+    aligner = alignment.BipartiteMatchingAligner()
+    ref = [annotations.Label('a', 0, 2), annotations.Label('a', 1, 3), annotations.Label('b', 5, 6)]
+    hyp = [annotations.Label('a', 1, 2), annotations.Label('b', 5, 6), annotations.Label('a', 1, 2)]
+
+    expected = batch.compute_alignment('indices', aligner, ref, hyp)
+    result = batch.compute_alignment('indices', aligner, ref[::-1], hyp[::-1])
+
+    def aligned(arrays, ref_labels, hyp_labels):
+        return [
+            alignment.LabelPair(ref_labels[r] if r >= 0 else None, hyp_labels[h] if h >= 0 else None)
+            for r, h in zip(arrays['ref_indices'].tolist(), arrays['hyp_indices'].tolist())
+        ]
+
+    assert aligned(result, ref[::-1], hyp[::-1]) == aligned(expected, ref, hyp)
+
+
+def test_compute_alignment_with_unknown_kind():
+    with pytest.raises(ValueError):
+        batch.compute_alignment('pairs', alignment.LevenshteinAligner(), labels('a'), labels('a'))
+
+
+def test_evaluators_with_workers(kws_ref_corpus_and_hyp_labels, classification_ref_corpus_and_hyp_labels):
+    ref, hyp = kws_ref_corpus_and_hyp_labels
+    expected = evaluator.KWSEvaluator().evaluate(ref, hyp).get_report(template='kws_detail')
+
+    assert evaluator.KWSEvaluator(workers=2).evaluate(ref, hyp).get_report(template='kws_detail') == expected
+
+    ref, hyp = classification_ref_corpus_and_hyp_labels
+    expected = evaluator.SegmentEvaluator().evaluate(ref, hyp).get_report()
+
+    assert evaluator.SegmentEvaluator(workers=2).evaluate(ref, hyp).get_report() == expected
+    assert evaluator.SegmentEvaluator(workers=2, keep_segments=False).evaluate(ref, hyp).get_report() == expected
+
+
+def test_asr_evaluator_with_workers():
+    ref = evaluator.Outcome(label_lists={
+        'a': annotations.LabelList(labels=[annotations.Label('a b a d f a b')]),
+        'b': annotations.LabelList(labels=[annotations.Label('x y z')]),
+        'c': annotations.LabelList(labels=[annotations.Label('x')])
+    })
+
+    hyp = evaluator.Outcome(label_lists={
+        'a': annotations.LabelList(labels=[annotations.Label('a b d f i b')]),
+        'b': annotations.LabelList(labels=[annotations.Label('x z')]),
+        'c': annotations.LabelList(labels=[annotations.Label('y x')])
+    })
+
+    expected = evaluator.ASREvaluator().evaluate(ref, hyp)
+    result = evaluator.ASREvaluator(workers=2).evaluate(ref, hyp)
+
+    assert list(result.utt_to_label_pairs.keys()) == list(expected.utt_to_label_pairs.keys())
+    assert dict(result.utt_to_label_pairs) == dict(expected.utt_to_label_pairs)
+
+    result = evaluator.ASREvaluator(workers=2, counts_only=True).evaluate(ref, hyp)
+
+    assert result.confusion.correct == expected.confusion.correct
+    assert result.confusion.substitutions == expected.confusion.substitutions
+    assert result.confusion.insertions == expected.confusion.insertions
+
+
+def test_event_evaluator_serial_cached_and_with_workers_are_equal(tmpdir):
+    ref = evaluator.Outcome(label_lists={
+        'a': annotations.LabelList(labels=[
+            annotations.Label('up', 0, 2), annotations.Label('up', 1, 3),
+            annotations.Label('down', 4, 5), annotations.Label('up', 4, 5)
+        ]),
+        'b': annotations.LabelList(labels=[annotations.Label('down', 0, 1), annotations.Label('down', 0, 1)])
+    })
+
+    hyp = evaluator.Outcome(label_lists={
+        'a': annotations.LabelList(labels=[
+            annotations.Label('up', 1, 2), annotations.Label('down', 4, 5),
+            annotations.Label('up', 1, 2), annotations.Label('up', 4, 5)
+        ]),
+        'b': annotations.LabelList(labels=[annotations.Label('down', 0, 1), annotations.Label('up', 0, 1)])
+    })
+
+    cache = alignment.AlignmentCache(os.path.join(tmpdir.strpath, 'cache'))
+
+    evaluators = [
+        evaluator.KWSEvaluator(),
+        evaluator.KWSEvaluator(cache=cache),
+        evaluator.KWSEvaluator(cache=cache),
+        evaluator.KWSEvaluator(workers=2)
+    ]
+
+    results = [x.evaluate(ref, hyp) for x in evaluators]
+    expected = results[0]
+
+    assert cache.hits == 2
+
+    for result in results[1:]:
+        assert dict(result.utt_to_label_pairs) == dict(expected.utt_to_label_pairs)
+        assert result.alignment.ref_indices.tolist() == expected.alignment.ref_indices.tolist()
+        assert result.alignment.hyp_indices.tolist() == expected.alignment.hyp_indices.tolist()
+        assert result.confusion.correct == expected.confusion.correct
+        assert result.confusion.substitutions == expected.confusion.substitutions
+        assert result.confusion.insertions == expected.confusion.insertions
+        assert result.confusion.deletions == expected.confusion.deletions
@@ -0,0 +1,249 @@
+import functools
+import os
+
+from audiomate import annotations
+import numpy as np
+
+from evalmate import alignment
+from evalmate import evaluator
+from evalmate.alignment import cache as alignment_cache
+
+import pytest
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return alignment.AlignmentCache(os.path.join(tmpdir.strpath, 'cache'))
+
+
+def labels(*values):
+    return [annotations.Label(value, index, index + 1) for index, value in enumerate(values)]
+
+
+class TestAlignmentCache:
+
+    def test_key(self, cache):
+        aligner = alignment.LevenshteinAligner()
+        key = cache.key('ops', aligner, labels('a', 'b'), labels('a', 'c'))
+
+        assert key == cache.key('ops', alignment.LevenshteinAligner(), labels('a', 'b'), labels('a', 'c'))
+
+        assert key != cache.key('indices', aligner, labels('a', 'b'), labels('a', 'c'))
+        assert key != cache.key('ops', aligner, labels('a', 'b'), labels('a', 'd'))
+        assert key != cache.key('ops', aligner, labels('ab'), labels('a', 'c'))
+        assert key != cache.key('ops', aligner, labels('a', 'b'), [annotations.Label('a', 0, 2), labels('c')[0]])
+        assert key != cache.key('ops', alignment.LevenshteinAligner(substitution_cost=2),
+                                labels('a', 'b'), labels('a', 'c'))
+
+    def test_align_ops(self, cache):
+        aligner = alignment.LevenshteinAligner()
+        ref = labels('a', 'b', 'c', 'd')
+        hyp = labels('a', 'x', 'd', 'e')
+
+        assert cache.align_ops(aligner, ref, hyp) == aligner.align_ops(ref, hyp)
+        assert cache.hits == 0
+        assert cache.misses == 1
+
+        assert cache.align_ops(aligner, labels('a', 'b', 'c', 'd'), labels('a', 'x', 'd', 'e')) == \
+            aligner.align_ops(ref, hyp)
+        assert cache.hits == 1
+
+    def test_align_indices(self, cache):
+        aligner = alignment.BipartiteMatchingAligner()
+        ref = [annotations.Label('a', 0, 1), annotations.Label('b', 2, 3)]
+        hyp = [annotations.Label('b', 2.1, 3), annotations.Label('c', 5, 6)]
+
+        expected = cache.align_indices(aligner, ref, hyp)
+        ref_indices, hyp_indices = cache.align_indices(aligner, ref, hyp)
+
+        assert cache.hits == 1
+        assert sorted(zip(ref_indices.tolist(), hyp_indices.tolist())) == [(-1, 1), (0, -1), (1, 0)]
+        assert ref_indices.tolist() == expected[0].tolist()
+        assert hyp_indices.tolist() == expected[1].tolist()
+
+    def test_align_segments(self, cache):
+        aligner = alignment.InvariantSegmentAligner()
+        ref = [annotations.Label('a', 0, 3), annotations.Label('b', 3, 6)]
+        hyp = [annotations.Label('a', 0, 4), annotations.Label('c', 1, 2)]
+
+        expected = aligner.align(ref, hyp)
+
+        assert cache.align_segments(aligner, ref, hyp) == expected
+
+        segments = cache.align_segments(aligner, ref, hyp)
+
+        assert cache.hits == 1
+        assert segments == expected
+        assert segments[1].hyp[0] is hyp[0]
+
+    def test_evict_least_recently_used(self, cache):
+        cache.save('aa01', {'x': [0] * 100})
+        cache.save('aa02', {'x': [0] * 100})
+        cache.save('aa03', {'x': [0] * 100})
+
+        for index, key in enumerate(['aa02', 'aa01', 'aa03']):
+            os.utime(cache._file_path(key), (index * 10, index * 10))
+
+        cache.max_size = cache.size - 1
+        cache.evict()
+
+        assert cache.load('aa02') is None
+        assert cache.load('aa01') is not None
+        assert cache.load('aa03') is not None
+        assert cache.size <= cache.max_size
+
+    def test_size_is_restored(self, cache):
+        cache.save('aa01', {'x': [0] * 100})
+
+        assert alignment.AlignmentCache(cache.path).size == cache.size
+
+        cache.clear()
+
+        assert cache.size == 0
+        assert cache.load('aa01') is None
+
+    def test_canonical_order(self):
+        ll = annotations.LabelList(labels=[
+            annotations.Label('b', 1, 2),
+            annotations.Label('a', 1, 2),
+            annotations.Label('c', 0, 5)
+        ])
+
+        assert [x.value for x in alignment.AlignmentCache.canonical_order(ll)] == ['c', 'a', 'b']
+
+
+def substitution_cost(a, b, cost=1):
+    return 0 if a == b else cost
+
+
+def test_describe_config():
+    config = alignment_cache.describe_config(
+        alignment.LevenshteinAligner(custom_substitution_cost_function=substitution_cost)
+    )
+
+    assert 'LevenshteinAligner' in config
+    assert 'test_cache.substitution_cost' in config
+    assert config == alignment_cache.describe_config(
+        alignment.LevenshteinAligner(custom_substitution_cost_function=substitution_cost)
+    )
+
+
+def test_describe_config_with_local_function_raises_error():
+    def cost(a, b):
+        return 1
+
+    with pytest.raises(ValueError):
+        alignment_cache.describe_config(alignment.LevenshteinAligner(custom_substitution_cost_function=cost))
+
+    with pytest.raises(ValueError):
+        alignment_cache.describe_config(alignment.LevenshteinAligner(custom_substitution_cost_function=lambda a, b: 1))
+
+
+def test_key_with_partials_does_not_collide(cache):
+    aligner_a = alignment.LevenshteinAligner(
+        custom_substitution_cost_function=functools.partial(substitution_cost, cost=1)
+    )
+    aligner_b = alignment.LevenshteinAligner(
+        custom_substitution_cost_function=functools.partial(substitution_cost, cost=5)
+    )
+
+    key_a = cache.key('ops', aligner_a, labels('a', 'b'), labels('a', 'c'))
+    key_b = cache.key('ops', aligner_b, labels('a', 'b'), labels('a', 'c'))
+
+    assert key_a != key_b
+    assert key_a == cache.key('ops', alignment.LevenshteinAligner(
+        custom_substitution_cost_function=functools.partial(substitution_cost, cost=1)
+    ), labels('a', 'b'), labels('a', 'c'))
+
+
+def test_key_with_cache_key(cache):
+    aligner = alignment.LevenshteinAligner(custom_substitution_cost_function=lambda a, b: 1)
+
+    with pytest.raises(ValueError):
+        cache.key('ops', aligner, labels('a'), labels('a'))
+
+    aligner.cache_key = 'constant-cost'
+    key = cache.key('ops', aligner, labels('a'), labels('a'))
+
+    aligner.cache_key = 'constant-cost-v2'
+
+    assert cache.key('ops', aligner, labels('a'), labels('a')) != key
+
+
+def test_key_depends_on_version(cache, monkeypatch):
+    key = cache.key('ops', alignment.LevenshteinAligner(), labels('a'), labels('a'))
+
+    monkeypatch.setattr(alignment_cache, 'FORMAT_VERSION', alignment_cache.FORMAT_VERSION + 1)
+
+    assert cache.key('ops', alignment.LevenshteinAligner(), labels('a'), labels('a')) != key
+
+
+def test_evaluators_with_cache(cache, kws_ref_corpus_and_hyp_labels, classification_ref_corpus_and_hyp_labels):
+    ref, hyp = kws_ref_corpus_and_hyp_labels
+    expected = evaluator.KWSEvaluator().evaluate(ref, hyp).get_report(template='kws_detail')
+
+    assert evaluator.KWSEvaluator(cache=cache).evaluate(ref, hyp).get_report(template='kws_detail') == expected
+    assert cache.hits == 0
+
+    assert evaluator.KWSEvaluator(cache=cache).evaluate(ref, hyp).get_report(template='kws_detail') == expected
+    assert cache.hits == cache.misses
+
+    ref, hyp = classification_ref_corpus_and_hyp_labels
+    expected = evaluator.SegmentEvaluator().evaluate(ref, hyp).get_report()
+
+    assert evaluator.SegmentEvaluator(cache=cache).evaluate(ref, hyp).get_report() == expected
+    assert evaluator.SegmentEvaluator(cache=cache).evaluate(ref, hyp).get_report() == expected
+    assert cache.hits == cache.misses
+
+
+def test_asr_evaluator_with_cache(cache):
+    ref = evaluator.Outcome(label_lists={
+        'a': annotations.LabelList(labels=[annotations.Label('a b a d f a b')]),
+        'b': annotations.LabelList(labels=[annotations.Label('x y z')])
+    })
+
+    hyp = evaluator.Outcome(label_lists={
+        'a': annotations.LabelList(labels=[annotations.Label('a b d f i b')]),
+        'b': annotations.LabelList(labels=[annotations.Label('x z')])
+    })
+
+    expected = evaluator.ASREvaluator().evaluate(ref, hyp)
+
+    result = evaluator.ASREvaluator(cache=cache).evaluate(ref, hyp)
+    assert dict(result.utt_to_label_pairs) == dict(expected.utt_to_label_pairs)
+
+    hyp.label_lists['b'] = annotations.LabelList(labels=[annotations.Label('x y')])
+    result = evaluator.ASREvaluator(cache=cache, counts_only=True).evaluate(ref, hyp)
+
+    assert cache.hits == 1
+    assert cache.misses == 3
+    assert result.confusion.deletions == 2
+
+
+def test_write_and_read_arrays():
+    arrays = {
+        'ops': np.frombuffer(b'CSID', dtype=np.uint8),
+        'empty': np.zeros((0, 2), dtype=np.float64),
+        'indices': np.array([[1, -1], [2, 3]], dtype=np.int32)
+    }
+
+    result = alignment_cache.read_arrays(alignment_cache.write_arrays(arrays))
+
+    assert sorted(result.keys()) == sorted(arrays.keys())
+
+    for name, array in arrays.items():
+        assert result[name].dtype == array.dtype
+        assert np.array_equal(result[name], array)
+
+    with pytest.raises(ValueError):
+        alignment_cache.read_arrays(alignment_cache.write_arrays(arrays)[:-1])
+
+
+def test_corrupt_file_is_a_miss(cache):
+    cache.save('aa01', {'x': np.arange(10)})
+
+    with open(cache._file_path('aa01'), 'wb') as f:
+        f.write(b'corrupt')
+
+    assert cache.load('aa01') is None
+    assert cache.misses == 1
@@ -1,6 +1,7 @@
 from audiomate import annotations
 
 from evalmate import alignment
+from evalmate.alignment import candidates
 
 
 class TestStartEndCandidateFinder:
@@ -26,6 +27,39 @@ class TestStartEndCandidateFinder:
         assert {2, 3, 4} == no_ref_match
         assert {2, 3} == no_hyp_match
 
+    def test_find_with_end_threshold(self):
+        ref_labels = [
+            annotations.Label('a', 2.0, 3.0),
+            annotations.Label('b', 5.0, 8.0),
+            annotations.Label('c', 5.1, 6.0)
+        ]
+
+        hyp_labels = [
+            annotations.Label('x', 5.2, 6.1),
+            annotations.Label('y', 2.1, 3.5),
+            annotations.Label('z', 1.9, 2.9),
+            annotations.Label('w', 4.8, 8.1)
+        ]
+
+        finder = alignment.StartEndCandidateFinder(0.25, 0.2)
+        matches, no_ref_match, no_hyp_match = finder.find(ref_labels, hyp_labels)
+
+        assert matches == [(0, 2), (1, 3), (2, 0)]
+        assert no_ref_match == set()
+        assert no_hyp_match == {1}
+
+    def test_find_returns_pairs_ordered_by_ref_and_hyp_index(self):
+        ref_labels = [annotations.Label('a', 3.0, 4.0), annotations.Label('b', 1.0, 2.0)]
+        hyp_labels = [annotations.Label('x', 1.1, 2.0), annotations.Label('y', 3.1, 4.0),
+                      annotations.Label('z', 2.9, 4.0), annotations.Label('w', 0.9, 2.0)]
+
+        finder = alignment.StartEndCandidateFinder(0.2)
+        matches, no_ref_match, no_hyp_match = finder.find(ref_labels, hyp_labels)
+
+        assert matches == [(0, 1), (0, 2), (1, 0), (1, 3)]
+        assert no_ref_match == set()
+        assert no_hyp_match == set()
+
 
 class TestOverlapCandidateFinder:
 
@@ -54,3 +88,41 @@ class TestOverlapCandidateFinder:
 
         assert ref_rest == {1}
         assert hyp_rest == {3}
+
+    def test_find_with_open_end(self):
+        ref_labels = [
+            annotations.Label('a', 2.0, -1),
+            annotations.Label('b', 0.0, 1.0)
+        ]
+
+        hyp_labels = [
+            annotations.Label('x', 0.5, 3.0),
+            annotations.Label('y', 4.0, -1),
+            annotations.Label('z', 1.0, 1.5)
+        ]
+
+        finder = alignment.OverlapCandidateFinder()
+        pairs, ref_rest, hyp_rest = finder.find(ref_labels, hyp_labels)
+
+        assert pairs == [(0, 0), (1, 0)]
+        assert ref_rest == set()
+        assert hyp_rest == {1, 2}
+
+
+def test_overlapping_pairs():
+    ref_labels = [
+        annotations.Label('a', 5.0, 8.0),
+        annotations.Label('b', 0.0, 2.0),
+        annotations.Label('c', 2.0, 2.0)
+    ]
+
+    hyp_labels = [
+        annotations.Label('x', 1.5, 5.5),
+        annotations.Label('y', 2.0, 3.0),
+        annotations.Label('z', 8.0, 9.0),
+        annotations.Label('w', 7.0, -1)
+    ]
+
+    pairs = candidates.overlapping_pairs(ref_labels, hyp_labels)
+
+    assert pairs == [(0, 0), (0, 3), (1, 0)]
@@ -0,0 +1,273 @@
+import random
+
+from audiomate import annotations
+import numpy as np
+
+from evalmate import alignment
+from evalmate.alignment import edit_distance
+
+
+def loop_distance_matrix(ref_labels, hyp_labels, ins_cost, del_cost, sub_cost_fn):
+    mat = np.zeros((len(ref_labels) + 1, len(hyp_labels) + 1))
+
+    for i in range(1, len(ref_labels) + 1):
+        mat[i, 0] = i * del_cost
+
+    for j in range(1, len(hyp_labels) + 1):
+        mat[0, j] = j * ins_cost
+
+    for i in range(1, len(ref_labels) + 1):
+        for j in range(1, len(hyp_labels) + 1):
+            mat[i, j] = min(
+                mat[i - 1, j - 1] + sub_cost_fn(ref_labels[i - 1], hyp_labels[j - 1]),
+                mat[i, j - 1] + ins_cost,
+                mat[i - 1, j] + del_cost
+            )
+
+    return mat
+
+
+def pair_ids(pairs):
+    return [(id(p.ref), id(p.hyp)) for p in pairs]
+
+
+def random_labels(rand, length, values='abcde'):
+    return [annotations.Label(rand.choice(values)) for _ in range(length)]
+
+
+def test_encode_values():
+    ref_ids, hyp_ids = edit_distance.encode_values(
+        [annotations.Label('a'), annotations.Label('b'), annotations.Label('a')],
+        [annotations.Label('c'), annotations.Label('a')]
+    )
+
+    assert ref_ids.tolist() == [0, 1, 0]
+    assert hyp_ids.tolist() == [2, 0]
+
+
+def test_substitution_costs():
+    costs = edit_distance.SubstitutionCosts(
+        [annotations.Label('a'), annotations.Label('b')],
+        [annotations.Label('a'), annotations.Label('c')],
+        4
+    )
+
+    assert costs(np.array([0, 0, 1, 1]), np.array([0, 1, 0, 1])).tolist() == [0, 4, 4, 4]
+
+
+def test_substitution_costs_with_custom_function():
+    costs = edit_distance.SubstitutionCosts(
+        [annotations.Label('a'), annotations.Label('b')],
+        [annotations.Label('a'), annotations.Label('cc')],
+        4,
+        custom_function=lambda ref, hyp: len(ref.value) + len(hyp.value)
+    )
+
+    assert costs(np.array([0, 0, 1, 1]), np.array([0, 1, 0, 1])).tolist() == [0, 3, 2, 3]
+
+
+def test_distance_matrix_equals_loop():
+    rand = random.Random(12)
+
+    for n_ref, n_hyp in [(0, 0), (0, 4), (5, 0), (1, 1), (7, 3), (3, 9), (25, 25), (40, 31)]:
+        ref = random_labels(rand, n_ref)
+        hyp = random_labels(rand, n_hyp)
+        costs = edit_distance.SubstitutionCosts(ref, hyp, 4)
+
+        expected = loop_distance_matrix(ref, hyp, 3, 3, lambda r, h: 0 if r.value == h.value else 4)
+        mat = edit_distance.distance_matrix(n_ref, n_hyp, costs, 3, 3, dtype=np.int32)
+
+        assert mat.tolist() == expected.tolist()
+
+
+def test_distance_matrix_with_custom_function_equals_loop():
+    rand = random.Random(3)
+    ref = random_labels(rand, 30)
+    hyp = random_labels(rand, 24)
+
+    def custom(r, h):
+        return 1.5 if r.value in 'ab' and h.value in 'ab' else 4.25
+
+    costs = edit_distance.SubstitutionCosts(ref, hyp, 4, custom_function=custom)
+
+    expected = loop_distance_matrix(ref, hyp, 3, 2, lambda r, h: 0 if r.value == h.value else custom(r, h))
+    mat = edit_distance.distance_matrix(30, 24, costs, 3, 2, dtype=np.float64)
+
+    assert mat.tolist() == expected.tolist()
+
+
+def test_levenshtein_aligner_with_custom_function():
+    lev = alignment.LevenshteinAligner(
+        custom_substitution_cost_function=lambda r, h: 1 if h.value == 'x' else 20
+    )
+
+    ali = lev.align(
+        [annotations.Label('a'), annotations.Label('b'), annotations.Label('c')],
+        [annotations.Label('a'), annotations.Label('x'), annotations.Label('y')]
+    )
+
+    assert ali == [
+        alignment.LabelPair(annotations.Label('a'), annotations.Label('a')),
+        alignment.LabelPair(annotations.Label('b'), annotations.Label('x')),
+        alignment.LabelPair(annotations.Label('c'), None),
+        alignment.LabelPair(None, annotations.Label('y')),
+    ]
+
+
+def test_select_dtype_uses_narrowest_integer_type():
+    assert edit_distance.select_dtype(5, 5, 3, 3, 4) == np.int8
+    assert edit_distance.select_dtype(100, 100, 3, 3, 4) == np.int16
+    assert edit_distance.select_dtype(10000, 10000, 3, 3, 4) == np.int32
+    assert edit_distance.select_dtype(10 ** 9, 10 ** 9, 3, 3, 4) == np.int64
+
+
+def test_select_dtype_uses_float_for_float_costs():
+    assert edit_distance.select_dtype(5, 5, 3, 3, 4.5) == np.float64
+    assert edit_distance.select_dtype(5, 5, 3, 3, 4, custom_costs=True) == np.float64
+
+
+def test_levenshtein_aligner_long_sequences_do_not_overflow():
+    lev = alignment.LevenshteinAligner()
+
+    ref = [annotations.Label('a')] * 12000
+    hyp = [annotations.Label('b')] * 2
+
+    assert lev.calculate_edit_distance(ref, hyp) == 11998 * 3 + 2 * 4
+
+
+def test_levenshtein_aligner_float_costs_are_not_truncated():
+    lev = alignment.LevenshteinAligner(
+        deletion_cost=1.5,
+        custom_substitution_cost_function=lambda r, h: 0.25
+    )
+
+    ref = [annotations.Label('a'), annotations.Label('b'), annotations.Label('c')]
+    hyp = [annotations.Label('a'), annotations.Label('x')]
+
+    assert lev.calculate_edit_distance(ref, hyp) == 1.75
+
+
+def test_linear_memory_alignment_equals_full_matrix_alignment():
+    rand = random.Random(7)
+
+    for n_ref, n_hyp in [(0, 5), (6, 0), (1, 1), (17, 11), (40, 44), (63, 20)]:
+        ref = random_labels(rand, n_ref, values='abc')
+        hyp = random_labels(rand, n_hyp, values='abc')
+
+        expected = alignment.LevenshteinAligner().align(ref, hyp)
+
+        for threshold in [0, 30, 300]:
+            lev = alignment.LevenshteinAligner(linear_memory_threshold=threshold)
+            assert pair_ids(lev.align(ref, hyp)) == pair_ids(expected)
+
+
+def test_linear_memory_alignment_with_float_costs_equals_full_matrix_alignment():
+    rand = random.Random(8)
+    ref = random_labels(rand, 45, values='abcd')
+    hyp = random_labels(rand, 38, values='abcd')
+
+    def custom(r, h):
+        return 2.5 if r.value in 'ab' and h.value in 'ab' else 3.75
+
+    expected = alignment.LevenshteinAligner(
+        deletion_cost=1.5,
+        custom_substitution_cost_function=custom
+    ).align(ref, hyp)
+
+    lev = alignment.LevenshteinAligner(
+        deletion_cost=1.5,
+        custom_substitution_cost_function=custom,
+        linear_memory_threshold=100
+    )
+
+    assert pair_ids(lev.align(ref, hyp)) == pair_ids(expected)
+
+
+def test_linear_memory_edit_distance():
+    rand = random.Random(9)
+    ref = random_labels(rand, 70)
+    hyp = random_labels(rand, 55)
+
+    expected = alignment.LevenshteinAligner().calculate_edit_distance(ref, hyp)
+
+    assert alignment.LevenshteinAligner(linear_memory_threshold=10).calculate_edit_distance(ref, hyp) == expected
+
+
+def test_band_limits():
+    assert edit_distance.band_limits(10, 10, 2) == (-2, 2)
+    assert edit_distance.band_limits(10, 14, 2) == (-2, 6)
+    assert edit_distance.band_limits(10, 7, 2) == (-5, 2)
+    assert edit_distance.band_limits(3, 4, 8) == (-3, 4)
+
+
+def test_outside_band_cost():
+    assert edit_distance.outside_band_cost(10, 10, 3, 2, -2, 2) == 15
+    assert edit_distance.outside_band_cost(10, 12, 3, 2, -2, 4) == 21
+    assert edit_distance.outside_band_cost(3, 4, 3, 3, -3, 4) == np.inf
+
+
+def test_banded_matrix_equals_full_matrix_within_band():
+    rand = random.Random(5)
+    ref = random_labels(rand, 30, values='ab')
+    hyp = random_labels(rand, 26, values='ab')
+    costs = edit_distance.SubstitutionCosts(ref, hyp, 4)
+
+    full = edit_distance.distance_matrix(30, 26, costs, 3, 3, dtype=np.int32)
+    band = edit_distance.banded_matrix(30, 26, costs, 3, 3, np.int32, -30, 26)
+
+    for i in range(31):
+        for j in range(27):
+            assert band[i, j - i + 30 + 1] == full[i, j]
+
+
+def test_banded_alignment_equals_full_matrix_alignment():
+    rand = random.Random(11)
+
+    for length in [0, 1, 12, 50, 80]:
+        ref = random_labels(rand, length, values='abcdef')
+        hyp = [label for label in ref if rand.random() > 0.1]
+        hyp = [annotations.Label('x') if rand.random() < 0.1 else label for label in hyp]
+
+        expected = alignment.LevenshteinAligner().align(ref, hyp)
+        expected_distance = alignment.LevenshteinAligner().calculate_edit_distance(ref, hyp)
+
+        for band_width in [1, 4, 20]:
+            lev = alignment.LevenshteinAligner(band_width=band_width)
+            assert pair_ids(lev.align(ref, hyp)) == pair_ids(expected)
+            assert lev.calculate_edit_distance(ref, hyp) == expected_distance
+
+
+def test_banded_alignment_of_dissimilar_sequences_equals_full_matrix_alignment():
+    rand = random.Random(13)
+    ref = random_labels(rand, 40, values='abc')
+    hyp = random_labels(rand, 25, values='abc')
+
+    expected = alignment.LevenshteinAligner().align(ref, hyp)
+
+    assert pair_ids(alignment.LevenshteinAligner(band_width=1).align(ref, hyp)) == pair_ids(expected)
+
+
+def test_align_ops_matches_label_pairs_in_all_modes():
+    rand = random.Random(5)
+
+    for _ in range(20):
+        ref = random_labels(rand, rand.randint(0, 40))
+        hyp = random_labels(rand, rand.randint(0, 40))
+        expected = alignment.LevenshteinAligner().align(ref, hyp)
+
+        for aligner in [alignment.LevenshteinAligner(),
+                        alignment.LevenshteinAligner(linear_memory_threshold=30),
+                        alignment.LevenshteinAligner(band_width=2)]:
+            ops = aligner.align_ops(ref, hyp)
+
+            assert len(ops) == len(expected)
+
+            for op, pair in zip(ops, expected):
+                if op == 'I':
+                    assert pair.ref is None
+                elif op == 'D':
+                    assert pair.hyp is None
+                elif op == 'C':
+                    assert pair.ref.value == pair.hyp.value
+                else:
+                    assert pair.ref.value != pair.hyp.value
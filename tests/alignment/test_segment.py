@@ -243,6 +243,91 @@ class TestInvariantSegmentAligner:
         assert segment.ref == [annotations.Label('b', 4, 9)]
         assert segment.hyp == []
 
+    def test_iter_align_yields_same_segments_as_align(self):
+        ref = annotations.LabelList(labels=[
+            annotations.Label('a', 0, 3),
+            annotations.Label('b', 3, 6),
+            annotations.Label('c', 7, 10)
+        ])
+
+        hyp = annotations.LabelList(labels=[
+            annotations.Label('a', 0, 3),
+            annotations.Label('b', 4, 8),
+            annotations.Label('c', 8, 10)
+        ])
+
+        aligner = alignment.InvariantSegmentAligner()
+        segments = aligner.iter_align(ref, hyp)
+
+        assert not isinstance(segments, list)
+        assert list(segments) == aligner.align(ref, hyp)
+
+    def test_iter_align_masks(self):
+        ref = annotations.LabelList(labels=[
+            annotations.Label('a', 0, 6),
+            annotations.Label('b', 2, 4),
+            annotations.Label('a', 3, 8)
+        ])
+
+        hyp = annotations.LabelList(labels=[
+            annotations.Label('b', 1, 4),
+            annotations.Label('c', 5, 8)
+        ])
+
+        aligner = alignment.InvariantSegmentAligner()
+        segments = list(aligner.iter_align_masks(ref, hyp, {'a': 0, 'b': 1, 'c': 2}))
+
+        assert [(x.start, x.end, x.ref_mask, x.hyp_mask) for x in segments] == [
+            (0, 1, 0b001, 0b000),
+            (1, 2, 0b001, 0b010),
+            (2, 3, 0b011, 0b010),
+            (3, 4, 0b011, 0b010),
+            (4, 5, 0b001, 0b000),
+            (5, 6, 0b001, 0b100),
+            (6, 8, 0b001, 0b100)
+        ]
+
+        assert segments == aligner.align(ref, hyp)
+
+    def test_align_empty(self):
+        result = alignment.InvariantSegmentAligner().align([], [])
+
+        assert result == []
+
+    def test_align_label_shorter_than_threshold_at_start(self):
+        ref = annotations.LabelList(labels=[
+            annotations.Label('a', 1.0, 1.005),
+            annotations.Label('b', 1.0, 3.0)
+        ])
+
+        hyp = annotations.LabelList(labels=[
+            annotations.Label('b', 2.0, 3.0)
+        ])
+
+        result = alignment.InvariantSegmentAligner().align(ref, hyp)
+
+        assert len(result) == 2
+        assert result[0].ref == [annotations.Label('b', 1.0, 3.0)]
+        assert result[0].hyp == []
+        assert result[1].ref == [annotations.Label('b', 1.0, 3.0)]
+        assert result[1].hyp == [annotations.Label('b', 2.0, 3.0)]
+
+    def test_sort_events(self):
+        ref = [
+            annotations.Label('b', 0.0, 2.0),
+            annotations.Label('a', 0.0, 2.0)
+        ]
+
+        hyp = [
+            annotations.Label('a', 2.005, 4.0)
+        ]
+
+        times, order, group_starts = alignment.InvariantSegmentAligner.sort_events(ref, hyp, time_threshold=0.01)
+
+        assert times == [0.0, 2.0, 0.0, 2.0, 2.005, 4.0]
+        assert order == [2, 0, 3, 1, 4, 5]
+        assert group_starts == [0, 2, 5, 6]
+
     def test_create_event_list(self):
         ll_ref = annotations.LabelList(labels=[
             annotations.Label('a', 0.89, 13.73),
@@ -99,3 +99,24 @@ class TestLevenshteinAligner:
             alignment.LabelPair(None, annotations.Label('x')),
             alignment.LabelPair(annotations.Label('c'), annotations.Label('c')),
         ]
+
+    def test_align_ops(self):
+        lev = alignment.LevenshteinAligner()
+
+        assert lev.align_ops(ll_with_values(['a', 'b', 'c']), ll_with_values(['a', 'c'])) == 'CDC'
+        assert lev.align_ops(ll_with_values(['a', 'b', 'c']), ll_with_values(['a', 'b', 'd', 'c'])) == 'CCIC'
+        assert lev.align_ops(ll_with_values(['a', 'b', 'c']), ll_with_values(['a', 'x', 'c'])) == 'CSC'
+
+    def test_align_ops_with_empty_sequences(self):
+        lev = alignment.LevenshteinAligner()
+
+        assert lev.align_ops(ll_with_values(['a', 'b']), []) == 'DD'
+        assert lev.align_ops([], ll_with_values(['a', 'b'])) == 'II'
+        assert lev.align_ops([], []) == ''
+
+    def test_align_ops_high_substitution_cost(self):
+        lev = alignment.LevenshteinAligner(substitution_cost=20)
+
+        ops = lev.align_ops(ll_with_values(['a', 'b', 'c']), ll_with_values(['a', 'x', 'c']))
+
+        assert ops == 'CDIC'
@@ -0,0 +1,198 @@
+from audiomate import annotations
+import numpy as np
+
+from evalmate import alignment
+
+import pytest
+
+
+@pytest.fixture
+def sample_store():
+    ref_a = [annotations.Label('a', 0, 1), annotations.Label('b', 1, 2), annotations.Label('c', 2, 3)]
+    hyp_a = [annotations.Label('a', 0, 1), annotations.Label('x', 1, 2), annotations.Label('d', 3, 4)]
+
+    ref_b = [annotations.Label('a', 0, 2)]
+    hyp_b = [annotations.Label('a', 0, 2)]
+
+    store = alignment.AlignmentStore()
+    store.append('utt-a', [
+        alignment.LabelPair(ref_a[0], hyp_a[0]),
+        alignment.LabelPair(ref_a[1], hyp_a[1]),
+        alignment.LabelPair(ref_a[2], None),
+        alignment.LabelPair(None, hyp_a[2])
+    ], ref_a, hyp_a)
+    store.append('utt-b', [alignment.LabelPair(ref_b[0], hyp_b[0])], ref_b, hyp_b)
+
+    return store
+
+
+class TestAlignmentStore:
+
+    def test_columns(self, sample_store):
+        assert sample_store.utt_ids == ['utt-a', 'utt-b']
+        assert sample_store.values == ['a', 'b', 'c', 'x', 'd']
+        assert sample_store.num_pairs == 5
+
+        assert sample_store.utt_offsets.tolist() == [0, 4, 5]
+        assert bytes(sample_store.ops) == b'CSDIC'
+        assert sample_store.ref_value_ids.tolist() == [0, 1, 2, -1, 0]
+        assert sample_store.hyp_value_ids.tolist() == [0, 3, -1, 4, 0]
+        assert sample_store.ref_indices.tolist() == [0, 1, 2, -1, 0]
+        assert sample_store.hyp_indices.tolist() == [0, 1, -1, 2, 0]
+
+        assert np.array_equal(sample_store.ref_starts, [0, 1, 2, np.nan, 0], equal_nan=True)
+        assert np.array_equal(sample_store.hyp_ends, [1, 2, np.nan, 4, 2], equal_nan=True)
+
+    def test_utt_to_label_pairs(self, sample_store):
+        utt_to_label_pairs = sample_store.utt_to_label_pairs
+
+        assert len(utt_to_label_pairs) == 2
+        assert list(utt_to_label_pairs) == ['utt-a', 'utt-b']
+        assert 'utt-c' not in utt_to_label_pairs
+
+        assert utt_to_label_pairs['utt-a'] == [
+            alignment.LabelPair(annotations.Label('a', 0, 1), annotations.Label('a', 0, 1)),
+            alignment.LabelPair(annotations.Label('b', 1, 2), annotations.Label('x', 1, 2)),
+            alignment.LabelPair(annotations.Label('c', 2, 3), None),
+            alignment.LabelPair(None, annotations.Label('d', 3, 4))
+        ]
+
+        pair = utt_to_label_pairs['utt-b'][0]
+        assert pair.ref.value == 'a'
+        assert pair.ref.end == 2
+        assert pair.hyp.value == 'a'
+
+    def test_label_pairs(self, sample_store):
+        pairs = sample_store.label_pairs
+
+        assert len(pairs) == 5
+        assert list(pairs) == sample_store.create_pairs(0, 5)
+        assert pairs[-1] == alignment.LabelPair(annotations.Label('a', 0, 2), annotations.Label('a', 0, 2))
+        assert pairs[1:3] == sample_store.create_pairs(1, 3)
+        assert pairs[3].ref is None
+
+        with pytest.raises(IndexError):
+            pairs[5]
+
+    def test_pairs_contain_original_labels(self):
+        ref = [annotations.Label('a', 0, 1), annotations.Label('b', 1, 2)]
+        hyp = [annotations.Label('a', 0, 1), annotations.Label('c', 2, 3)]
+
+        store = alignment.AlignmentStore()
+        store.append('utt-a', [alignment.LabelPair(ref[0], hyp[0]), alignment.LabelPair(ref[1], None)], ref, hyp)
+        store.append_indices('utt-b', [-1, 1, 0], [1, 0, -1], ref, hyp)
+        store.append('utt-c', [alignment.LabelPair(None, hyp[1])])
+
+        pairs = list(store.label_pairs)
+
+        assert [(pair.ref, pair.hyp) for pair in pairs] == [
+            (ref[0], hyp[0]), (ref[1], None), (None, hyp[1]), (ref[1], hyp[0]), (ref[0], None), (None, hyp[1])
+        ]
+        assert all(x is y for x, y in zip([pair.ref for pair in pairs], [ref[0], ref[1], None, ref[1], ref[0], None]))
+        assert all(x is y for x, y in zip([pair.hyp for pair in pairs], [hyp[0], None, hyp[1], hyp[0], None, hyp[1]]))
+
+        assert store.create_pairs(1, 4)[2].ref is ref[1]
+
+        removed = store.remove(['utt-b'])
+
+        assert removed.utt_to_label_pairs['utt-b'][2].ref is ref[0]
+        assert store.utt_to_label_pairs['utt-c'][0].hyp is hyp[1]
+
+    def test_pairs_of_store_from_arrays_are_created(self, sample_store):
+        store = alignment.AlignmentStore.from_arrays(sample_store.utt_ids, sample_store.values, sample_store.arrays())
+
+        assert list(store.label_pairs) == list(sample_store.label_pairs)
+        assert store.label_pairs[0].ref is not sample_store.label_pairs[0].ref
+
+    def test_failing_utterances(self, sample_store):
+        assert sample_store.failing_utterances() == ['utt-a']
+
+    def test_append_after_access(self, sample_store):
+        assert sample_store.num_pairs == 5
+
+        sample_store.append('utt-c', [alignment.LabelPair(None, annotations.Label('b', 0, 1))])
+
+        assert sample_store.utt_offsets.tolist() == [0, 4, 5, 6]
+        assert bytes(sample_store.ops) == b'CSDICI'
+        assert sample_store.hyp_indices.tolist()[-1] == -1
+        assert sample_store.failing_utterances() == ['utt-a', 'utt-c']
+
+    def test_append_existing_utterance_raises_error(self, sample_store):
+        with pytest.raises(ValueError):
+            sample_store.append('utt-a', [])
+
+    def test_extend(self, sample_store):
+        other = alignment.AlignmentStore()
+        other.append('utt-c', [
+            alignment.LabelPair(annotations.Label('y', 0, 1), annotations.Label('a', 0, 1)),
+            alignment.LabelPair(None, annotations.Label('b', 1, 2))
+        ])
+
+        assert sample_store.num_pairs == 5
+
+        sample_store.extend(other)
+
+        assert sample_store.utt_ids == ['utt-a', 'utt-b', 'utt-c']
+        assert sample_store.values == ['a', 'b', 'c', 'x', 'd', 'y']
+        assert sample_store.utt_offsets.tolist() == [0, 4, 5, 7]
+        assert bytes(sample_store.ops) == b'CSDICSI'
+        assert sample_store.ref_value_ids.tolist()[5:] == [5, -1]
+        assert sample_store.hyp_value_ids.tolist()[5:] == [0, 1]
+        assert sample_store.utt_to_label_pairs['utt-c'] == other.utt_to_label_pairs['utt-c']
+
+        with pytest.raises(ValueError):
+            sample_store.extend(other)
+
+    def test_remove(self, sample_store):
+        expected = sample_store.utt_to_label_pairs['utt-b']
+        removed = sample_store.remove(['utt-a'])
+
+        assert removed.utt_ids == ['utt-a']
+        assert bytes(removed.ops) == b'CSDI'
+        assert removed.failing_utterances() == ['utt-a']
+
+        assert sample_store.utt_ids == ['utt-b']
+        assert sample_store.values == ['a']
+        assert sample_store.utt_offsets.tolist() == [0, 1]
+        assert bytes(sample_store.ops) == b'C'
+        assert sample_store.utt_to_label_pairs['utt-b'] == expected
+
+        sample_store.append('utt-a', [alignment.LabelPair(annotations.Label('b', 0, 1), None)])
+
+        assert sample_store.utt_ids == ['utt-b', 'utt-a']
+        assert sample_store.ref_value_ids.tolist() == [0, 1]
+
+        with pytest.raises(KeyError):
+            sample_store.remove(['utt-x'])
+
+    def test_append_ops(self):
+        ref = [annotations.Label('a'), annotations.Label('b'), annotations.Label('c'), annotations.Label('d')]
+        hyp = [annotations.Label('a'), annotations.Label('x'), annotations.Label('d'), annotations.Label('e')]
+
+        aligner = alignment.LevenshteinAligner()
+        ops = aligner.align_ops(ref, hyp)
+
+        store = alignment.AlignmentStore()
+        store.append_ops('utt', ops, ref, hyp)
+
+        expected = alignment.AlignmentStore()
+        expected.append('utt', aligner.align(ref, hyp), ref, hyp)
+
+        assert bytes(store.ops) == ops.encode('ascii')
+        assert store.values == expected.values
+        assert store.utt_to_label_pairs['utt'] == expected.utt_to_label_pairs['utt']
+
+        for name in ['ref_value_ids', 'hyp_value_ids', 'ref_indices', 'hyp_indices']:
+            assert getattr(store, name).tolist() == getattr(expected, name).tolist()
+
+    def test_append_ops_with_wrong_number_of_labels_raises_error(self):
+        with pytest.raises(ValueError):
+            alignment.AlignmentStore().append_ops('utt', 'CC', [annotations.Label('a')], [annotations.Label('a')])
+
+    def test_from_label_pairs(self, sample_store):
+        store = alignment.AlignmentStore.from_label_pairs(sample_store.utt_to_label_pairs)
+
+        assert store.utt_ids == sample_store.utt_ids
+        assert bytes(store.ops) == bytes(sample_store.ops)
+        assert store.ref_indices.tolist() == [-1] * 5
+        assert list(store.label_pairs) == list(sample_store.label_pairs)
@@ -1,6 +1,8 @@
 from audiomate import annotations
+import numpy as np
 
 from evalmate import alignment
+from evalmate.utils import label
 
 
 class TestBipartiteMatchingAligner:
@@ -106,6 +108,90 @@ class TestBipartiteMatchingAligner:
 
         assert len(matches) == 16
 
+    def test_align_multiple_components(self):
+        ll_ref = [
+            annotations.Label('a', 0.0, 1.0),
+            annotations.Label('b', 0.9, 2.0),
+            annotations.Label('c', 10.0, 11.0),
+            annotations.Label('d', 20.0, 21.0)
+        ]
+
+        ll_hyp = [
+            annotations.Label('d', 20.1, 21.0),
+            annotations.Label('b', 1.0, 2.0),
+            annotations.Label('x', 30.0, 31.0),
+            annotations.Label('a', 0.0, 0.95)
+        ]
+
+        aligner = alignment.BipartiteMatchingAligner()
+        matches = aligner.align(ll_ref, ll_hyp)
+
+        assert matches == [
+            alignment.LabelPair(ll_ref[0], ll_hyp[3]),
+            alignment.LabelPair(ll_ref[1], ll_hyp[1]),
+            alignment.LabelPair(ll_ref[2], None),
+            alignment.LabelPair(ll_ref[3], ll_hyp[0]),
+            alignment.LabelPair(None, ll_hyp[2])
+        ]
+
+        assert matches[4].hyp is ll_hyp[2]
+
+    def test_align_returns_pairs_sorted_by_start(self):
+        ll_ref = [
+            annotations.Label('c', 10.0, 11.0),
+            annotations.Label('a', 0.0, 1.0),
+            annotations.Label('a', 0.0, 1.0)
+        ]
+
+        ll_hyp = [
+            annotations.Label('x', 5.0, 6.0),
+            annotations.Label('c', 10.5, 11.0),
+            annotations.Label('y', 5.0, 6.0),
+            annotations.Label('a', 0.0, 1.0)
+        ]
+
+        matches = alignment.BipartiteMatchingAligner().align(ll_ref, ll_hyp)
+
+        assert matches == [
+            alignment.LabelPair(ll_ref[1], ll_hyp[3]),
+            alignment.LabelPair(ll_ref[2], None),
+            alignment.LabelPair(None, ll_hyp[0]),
+            alignment.LabelPair(None, ll_hyp[2]),
+            alignment.LabelPair(ll_ref[0], ll_hyp[1])
+        ]
+
+        assert matches[0].ref is ll_ref[1]
+        assert matches[1].ref is ll_ref[2]
+        assert matches[2].hyp is ll_hyp[0]
+
+    def test_pair_penalties(self):
+        ll_ref = [
+            annotations.Label('a', 0.0, 1.0),
+            annotations.Label('b', 2.0, -1),
+            annotations.Label('c', 3.0, 3.0)
+        ]
+
+        ll_hyp = [
+            annotations.Label('a', 0.5, 2.5),
+            annotations.Label('c', 2.5, -1),
+            annotations.Label('b', 2.8, 3.5)
+        ]
+
+        aligner = alignment.BipartiteMatchingAligner(substitution_penalty=1.5, non_overlap_penalty_weight=2)
+        pairs = np.array([(r, h) for r in range(3) for h in range(3)])
+
+        expected = []
+
+        for r, h in pairs:
+            penalty = 2 * (1 - label.overlap_percentage(ll_ref[r], ll_hyp[h]))
+
+            if ll_ref[r].value != ll_hyp[h].value:
+                penalty += 1.5
+
+            expected.append(penalty)
+
+        assert np.allclose(aligner._pair_penalties(ll_ref, ll_hyp, pairs), expected)
+
 
 class TestFullMatchingAligner:
 
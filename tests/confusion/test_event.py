@@ -77,3 +77,119 @@ class TestInstanceConfusionStats:
             ('down', 1),
             ('right', 1)
         ]
+
+
+@pytest.fixture()
+def sample_count_confusion():
+    conf = confusion.EventCountConfusion('up')
+
+    conf.correct_count = 2
+    conf.insertion_count = 3
+    conf.deletion_count = 3
+    conf.substitution_counts['right'] += 1
+    conf.substitution_counts['down'] += 1
+    conf.substitution_out_counts['left'] += 1
+    conf.substitution_out_counts['down'] += 1
+
+    return conf
+
+
+class TestEventCountConfusion:
+
+    def test_counts(self, sample_count_confusion):
+        assert sample_count_confusion.correct == 2
+        assert sample_count_confusion.insertions == 3
+        assert sample_count_confusion.deletions == 3
+        assert sample_count_confusion.substitutions == 2
+        assert sample_count_confusion.substitutions_out == 2
+        assert sample_count_confusion.total == 7
+
+    def test_metrics_equal_event_confusion(self, sample_confusion, sample_count_confusion):
+        assert sample_count_confusion.error_rate == sample_confusion.error_rate
+        assert sample_count_confusion.precision == sample_confusion.precision
+        assert sample_count_confusion.recall == sample_confusion.recall
+
+    def test_substitutions_by_count(self, sample_count_confusion):
+        sample_count_confusion.substitution_counts['right'] += 1
+
+        assert sample_count_confusion.substitutions_by_count() == [
+            ('right', 2),
+            ('down', 1)
+        ]
+
+
+def test_create_from_edit_operations():
+    cnf = confusion.create_from_edit_operations('CSDCI', ['a', 'b', 'c', 'a'], ['a', 'x', 'a', 'c'])
+
+    assert sorted(cnf.instances.keys()) == ['a', 'b', 'c', 'x']
+    assert cnf.instances['a'].correct == 2
+    assert cnf.instances['b'].substitution_counts == {'x': 1}
+    assert cnf.instances['x'].substitution_out_counts == {'b': 1}
+    assert cnf.instances['c'].deletions == 1
+    assert cnf.instances['c'].insertions == 1
+
+    assert cnf.correct == 2
+    assert cnf.substitutions == 1
+    assert cnf.deletions == 1
+    assert cnf.insertions == 1
+
+
+def test_create_from_edit_operations_adds_to_existing_confusion():
+    cnf = confusion.create_from_edit_operations('CD', ['a', 'b'], ['a'])
+    result = confusion.create_from_edit_operations('CI', ['a'], ['a', 'b'], cnf=cnf)
+
+    assert result is cnf
+    assert cnf.instances['a'].correct == 2
+    assert cnf.instances['b'].deletions == 1
+    assert cnf.instances['b'].insertions == 1
+
+
+def test_create_from_alignment_store():
+    pairs = [
+        alignment.LabelPair(annotations.Label('a'), annotations.Label('a')),
+        alignment.LabelPair(annotations.Label('b'), annotations.Label('x')),
+        alignment.LabelPair(annotations.Label('a'), None),
+        alignment.LabelPair(None, annotations.Label('c')),
+        alignment.LabelPair(annotations.Label('b'), annotations.Label('x')),
+        alignment.LabelPair(annotations.Label('x'), annotations.Label('a'))
+    ]
+
+    store = alignment.AlignmentStore.from_label_pairs({'u1': pairs[:3], 'u2': pairs[3:]})
+
+    expected = confusion.create_from_label_pairs(pairs)
+    cnf = confusion.create_from_alignment_store(store)
+
+    assert sorted(cnf.instances.keys()) == sorted(expected.instances.keys())
+
+    for value, instance in expected.instances.items():
+        assert isinstance(cnf.instances[value], confusion.EventCountConfusion)
+        assert cnf.instances[value].correct == instance.correct
+        assert cnf.instances[value].insertions == instance.insertions
+        assert cnf.instances[value].deletions == instance.deletions
+        assert cnf.instances[value].substitutions_by_count() == instance.substitutions_by_count()
+        assert cnf.instances[value].substitutions_out == instance.substitutions_out
+
+
+def test_add_and_subtract_event_count_confusion():
+    cnf = confusion.create_from_edit_operations('CSDI', ['a', 'b', 'a'], ['a', 'x', 'c'])
+    other = confusion.create_from_edit_operations('CSS', ['a', 'b', 'c'], ['a', 'y', 'x'])
+
+    cnf.add(other)
+
+    assert cnf.instances['a'].correct == 2
+    assert cnf.instances['b'].substitutions_by_count() == [('x', 1), ('y', 1)]
+    assert cnf.instances['x'].substitution_out_counts == {'b': 1, 'c': 1}
+    assert cnf.instances['y'].substitutions_out == 1
+
+    cnf.subtract(other)
+
+    expected = confusion.create_from_edit_operations('CSDI', ['a', 'b', 'a'], ['a', 'x', 'c'])
+
+    assert sorted(cnf.instances.keys()) == sorted(expected.instances.keys())
+    assert cnf.instances['a'].correct == 1
+    assert cnf.instances['a'].deletions == 1
+    assert cnf.instances['b'].substitutions_by_count() == [('x', 1)]
+    assert dict(cnf.instances['x'].substitution_out_counts) == {'b': 1}
+
+    with pytest.raises(ValueError):
+        cnf.subtract(other)
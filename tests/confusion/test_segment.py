@@ -1,3 +1,5 @@
+from audiomate import annotations
+
 from evalmate import alignment
 from evalmate import confusion
 
@@ -64,3 +66,159 @@ class TestSegmentConfusion:
 
     def test_substitutions_out(self, sample_confusion):
         assert sample_confusion.substitutions_out == pytest.approx(13.88)
+
+
+@pytest.fixture
+def sample_duration_confusion(sample_confusion):
+    cnf = confusion.SegmentDurationConfusion('music')
+
+    for segment in sample_confusion.correct_segments:
+        cnf.add_correct(segment)
+
+    for segment in sample_confusion.insertion_segments:
+        cnf.add_insertion(segment)
+
+    for segment in sample_confusion.deletion_segments:
+        cnf.add_deletion(segment)
+
+    for other_value, segments in sample_confusion.substitution_segments.items():
+        for segment in segments:
+            cnf.add_substitution(segment, other_value)
+
+    for other_value, segments in sample_confusion.substitution_out_segments.items():
+        for segment in segments:
+            cnf.add_substitution_out(segment, other_value)
+
+    return cnf
+
+
+class TestSegmentDurationConfusion:
+
+    def test_correct(self, sample_duration_confusion):
+        assert sample_duration_confusion.correct == pytest.approx(51.9)
+
+    def test_insertions(self, sample_duration_confusion):
+        assert sample_duration_confusion.insertions == pytest.approx(23.2)
+
+    def test_deletions(self, sample_duration_confusion):
+        assert sample_duration_confusion.deletions == pytest.approx(23.3)
+
+    def test_substitutions(self, sample_duration_confusion):
+        assert sample_duration_confusion.substitutions == pytest.approx(19.6)
+        assert sample_duration_confusion.substitution_durations['speech'] == pytest.approx(11.8)
+        assert sample_duration_confusion.substitution_durations['mix'] == pytest.approx(7.8)
+
+    def test_substitutions_out(self, sample_duration_confusion):
+        assert sample_duration_confusion.substitutions_out == pytest.approx(13.88)
+        assert sample_duration_confusion.substitution_out_durations['mix'] == pytest.approx(12.58)
+
+
+def test_create_from_segments_without_keeping_segments():
+    segments = [
+        alignment.Segment(0, 2, annotations.Label('a'), annotations.Label('a')),
+        alignment.Segment(2, 3, annotations.Label('a'), annotations.Label('b')),
+        alignment.Segment(3, 3.5, None, annotations.Label('b')),
+        alignment.Segment(3.5, 5, annotations.Label('b'), None)
+    ]
+
+    expected = confusion.create_from_segments(segments)
+    cnf = confusion.create_from_segments(iter(segments), keep_segments=False)
+
+    assert isinstance(cnf.instances['a'], confusion.SegmentDurationConfusion)
+    assert sorted(cnf.instances.keys()) == ['a', 'b']
+
+    for value, instance in expected.instances.items():
+        assert cnf.instances[value].correct == pytest.approx(instance.correct)
+        assert cnf.instances[value].insertions == pytest.approx(instance.insertions)
+        assert cnf.instances[value].deletions == pytest.approx(instance.deletions)
+        assert cnf.instances[value].substitutions == pytest.approx(instance.substitutions)
+        assert cnf.instances[value].substitutions_out == pytest.approx(instance.substitutions_out)
+
+    assert cnf.precision == pytest.approx(expected.precision)
+    assert cnf.recall == pytest.approx(expected.recall)
+
+
+def test_create_from_segment_masks():
+    segments = [
+        alignment.Segment(0, 2, [], []),
+        alignment.Segment(2, 3, [], []),
+        alignment.Segment(3, 3.5, [], []),
+        alignment.Segment(3.5, 5, [], [])
+    ]
+
+    # a: bit 0, b: bit 1, c: bit 2
+    masks = [(0b011, 0b001), (0b001, 0b110), (0b000, 0b010), (0b101, 0b101)]
+
+    for segment, (ref_mask, hyp_mask) in zip(segments, masks):
+        segment.ref_mask = ref_mask
+        segment.hyp_mask = hyp_mask
+
+    cnf = confusion.create_from_segment_masks(iter(segments), ['a', 'b', 'c', 'd'])
+
+    assert sorted(cnf.instances.keys()) == ['a', 'b', 'c', 'd']
+
+    for instance in cnf.instances.values():
+        assert isinstance(instance, confusion.SegmentDurationConfusion)
+        assert instance.substitutions == 0
+        assert instance.substitutions_out == 0
+
+    assert cnf.instances['a'].correct == pytest.approx(3.5)
+    assert cnf.instances['a'].insertions == pytest.approx(0)
+    assert cnf.instances['a'].deletions == pytest.approx(1)
+
+    assert cnf.instances['b'].correct == pytest.approx(0)
+    assert cnf.instances['b'].insertions == pytest.approx(1.5)
+    assert cnf.instances['b'].deletions == pytest.approx(2)
+
+    assert cnf.instances['c'].correct == pytest.approx(1.5)
+    assert cnf.instances['c'].insertions == pytest.approx(1)
+    assert cnf.instances['c'].deletions == pytest.approx(0)
+
+    assert cnf.instances['d'].total == 0
+
+
+def test_add_and_subtract_segment_confusion():
+    segments = [
+        alignment.Segment(0, 1.1, annotations.Label('a'), annotations.Label('a')),
+        alignment.Segment(1.1, 2.3, annotations.Label('a'), annotations.Label('b')),
+        alignment.Segment(2.3, 3, None, annotations.Label('b'))
+    ]
+    other_segments = [
+        alignment.Segment(0, 0.7, annotations.Label('a'), annotations.Label('a')),
+        alignment.Segment(0.7, 0.9, annotations.Label('c'), annotations.Label('b'))
+    ]
+
+    for keep_segments in [True, False]:
+        cnf = confusion.create_from_segments(segments, keep_segments=keep_segments)
+        other = confusion.create_from_segments(other_segments, keep_segments=keep_segments)
+
+        cnf.add(other)
+
+        assert cnf.instances['a'].correct == pytest.approx(1.8)
+        assert cnf.instances['b'].substitutions_out == pytest.approx(1.4)
+        assert cnf.instances['c'].substitutions == pytest.approx(0.2)
+
+        cnf.subtract(other)
+
+        assert sorted(cnf.instances.keys()) == ['a', 'b']
+        assert cnf.instances['a'].correct == pytest.approx(1.1)
+        assert cnf.instances['b'].substitutions_out == pytest.approx(1.2)
+        assert cnf.instances['b'].insertions == pytest.approx(0.7)
+
+    cnf = confusion.create_from_segments(segments)
+    cnf.subtract(confusion.create_from_segments(segments[1:2]))
+
+    assert cnf.instances['a'].correct_segments == segments[:1]
+    assert cnf.instances['a'].substitutions == 0
+    assert len(cnf.instances['b'].substitution_out_segments) == 0
+
+
+def test_subtract_segment_duration_confusion_rounds_to_zero():
+    segments = [alignment.Segment(0.1, 0.3, annotations.Label('a'), annotations.Label('b'))]
+    other_segments = [alignment.Segment(0.7, 0.8, annotations.Label('a'), annotations.Label('b'))]
+
+    cnf = confusion.create_from_segments(segments + other_segments, keep_segments=False)
+    cnf.subtract(confusion.create_from_segments(other_segments, keep_segments=False))
+    cnf.subtract(confusion.create_from_segments(segments, keep_segments=False))
+
+    assert cnf.instances == {}
@@ -3,6 +3,26 @@ from audiomate import annotations
 from evalmate import alignment
 from evalmate import evaluator
 
+import pytest
+
+
+class ValueMatchingAligner(alignment.EventAligner):
+    """ Matches every ref token with the first unmatched hyp token of the same value, regardless of the order. """
+
+    def align(self, ref_labels, hyp_labels):
+        unmatched = list(hyp_labels)
+        pairs = []
+
+        for ref_label in ref_labels:
+            match = next((x for x in unmatched if x.value == ref_label.value), None)
+
+            if match is not None:
+                unmatched.remove(match)
+
+            pairs.append(alignment.LabelPair(ref_label, match))
+
+        return pairs + [alignment.LabelPair(None, x) for x in unmatched]
+
 
 class TestASREvaluator:
 
@@ -61,3 +81,159 @@ class TestASREvaluator:
             alignment.LabelPair(annotations.Label('a'), annotations.Label('i')),
             alignment.LabelPair(annotations.Label('b'), annotations.Label('b')),
         ]
+
+    def test_evaluate_counts_only(self):
+        ref = evaluator.Outcome(
+            label_lists={
+                'a': annotations.LabelList(labels=[annotations.Label('a b a d f a b')]),
+                'b': annotations.LabelList(labels=[annotations.Label('x y z')])
+            }
+        )
+
+        hyp = evaluator.Outcome(
+            label_lists={
+                'a': annotations.LabelList(labels=[annotations.Label('a b d f i b')]),
+                'b': annotations.LabelList(labels=[annotations.Label('x y y z b')])
+            }
+        )
+
+        expected = evaluator.ASREvaluator().do_evaluate(ref, hyp)
+        result = evaluator.ASREvaluator(counts_only=True).do_evaluate(ref, hyp)
+
+        assert isinstance(result, evaluator.ASRCountEvaluation)
+        assert result.confusion.total == expected.confusion.total == 10
+        assert result.confusion.correct == expected.confusion.correct
+        assert result.confusion.substitutions == expected.confusion.substitutions
+        assert result.confusion.deletions == expected.confusion.deletions
+        assert result.confusion.insertions == expected.confusion.insertions
+        assert result.confusion.error_rate == expected.confusion.error_rate
+
+        assert sorted(result.confusion.instances.keys()) == sorted(expected.confusion.instances.keys())
+
+        for value, cnf in expected.confusion.instances.items():
+            assert result.confusion.instances[value].precision == cnf.precision
+            assert result.confusion.instances[value].recall == cnf.recall
+            assert result.confusion.instances[value].substitutions_by_count() == cnf.substitutions_by_count()
+
+        assert result.get_report() == expected.get_report()
+        assert result.get_report(template='asr_confusion') == expected.get_report(template='asr_confusion')
+
+    def test_counts_only_detail_report_raises_error(self):
+        ref = evaluator.Outcome(label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a b c')]),
+            'b': annotations.LabelList(labels=[annotations.Label('x y')])
+        })
+
+        hyp = evaluator.Outcome(label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a c')]),
+            'b': annotations.LabelList(labels=[annotations.Label('x z')])
+        })
+
+        result = evaluator.ASREvaluator(counts_only=True).evaluate(ref, hyp)
+
+        with pytest.raises(ValueError):
+            result.get_report(template='asr_detail')
+
+        assert 'Failing Utterances' in evaluator.ASREvaluator().evaluate(ref, hyp).get_report(template='asr_detail')
+
+    def test_evaluate_with_non_monotonic_aligner(self):
+        ref = evaluator.Outcome(label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a b c d')]),
+            'b': annotations.LabelList(labels=[annotations.Label('y z')])
+        })
+
+        hyp = evaluator.Outcome(label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('d x a b')]),
+            'b': annotations.LabelList(labels=[annotations.Label('z y')])
+        })
+
+        for options in [{}, {'counts_only': True}, {'workers': 2}, {'workers': 2, 'counts_only': True}]:
+            result = evaluator.ASREvaluator(aligner=ValueMatchingAligner(), **options).evaluate(ref, hyp)
+
+            assert result.confusion.correct == 5
+            assert result.confusion.substitutions == 0
+            assert result.confusion.deletions == 1
+            assert result.confusion.insertions == 1
+            assert result.confusion.instances['c'].deletions == 1
+            assert result.confusion.instances['x'].insertions == 1
+            assert result.confusion.instances['b'].insertions == 0
+
+        result = evaluator.ASREvaluator(aligner=ValueMatchingAligner()).evaluate(ref, hyp)
+
+        assert result.utt_to_label_pairs['b'] == [
+            alignment.LabelPair(annotations.Label('y'), annotations.Label('y')),
+            alignment.LabelPair(annotations.Label('z'), annotations.Label('z'))
+        ]
+
+    def test_add_and_remove_utterances(self):
+        ref = evaluator.Outcome(label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a b a d f a b')]),
+            'b': annotations.LabelList(labels=[annotations.Label('x y z')])
+        })
+
+        hyp = evaluator.Outcome(label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a b d f i b')]),
+            'b': annotations.LabelList(labels=[annotations.Label('x z')])
+        })
+
+        for counts_only in [False, True]:
+            asr_evaluator = evaluator.ASREvaluator(counts_only=counts_only)
+            result = asr_evaluator.evaluate(ref.subset(['a']), hyp.subset(['a']))
+
+            asr_evaluator.add_utterances(result, ref.subset(['b']), hyp.subset(['b']))
+            assert result.get_report() == asr_evaluator.evaluate(ref, hyp).get_report()
+
+            asr_evaluator.remove_utterances(result, ['a'])
+            assert sorted(result.ref_outcome.label_lists.keys()) == ['b']
+            assert result.confusion.deletions == 1
+            assert result.get_report() == asr_evaluator.evaluate(ref.subset(['b']), hyp.subset(['b'])).get_report()
+
+    def test_evaluate_many(self):
+        ref = evaluator.Outcome(label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a b a d f a b')]),
+            'b': annotations.LabelList(labels=[annotations.Label('x y z')])
+        })
+
+        hyps = [
+            {
+                'a': annotations.LabelList(labels=[annotations.Label('a b d f i b')]),
+                'b': annotations.LabelList(labels=[annotations.Label('x z')])
+            },
+            {
+                'a': annotations.LabelList(labels=[annotations.Label('a b a d f a b')]),
+                'b': annotations.LabelList()
+            }
+        ]
+
+        for asr_evaluator in [evaluator.ASREvaluator(), evaluator.ASREvaluator(counts_only=True)]:
+            results = asr_evaluator.evaluate_many(ref, hyps)
+
+            assert len(results) == 2
+
+            for result, hyp in zip(results, hyps):
+                expected = asr_evaluator.evaluate(ref, evaluator.Outcome(label_lists=hyp))
+                assert result.get_report() == expected.get_report()
+
+        results = evaluator.ASREvaluator().evaluate_many(ref, hyps)
+
+        assert results[1].confusion.correct == 7
+        assert results[1].confusion.deletions == 3
+
+    def test_evaluate_stream(self):
+        ref = evaluator.Outcome(label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a b a d f a b')]),
+            'b': annotations.LabelList(labels=[annotations.Label('x y z')])
+        })
+
+        hyps = [
+            ('b', annotations.LabelList(labels=[annotations.Label('x z')])),
+            ('a', annotations.LabelList(labels=[annotations.Label('a b d f i b')]))
+        ]
+
+        expected = evaluator.ASREvaluator().evaluate(ref, evaluator.Outcome(label_lists=dict(hyps)))
+        result = evaluator.ASREvaluator().evaluate_stream(ref, iter(hyps), batch_size=1)
+
+        assert isinstance(result, evaluator.ASRCountEvaluation)
+        assert result.ref_outcome.num_utterances == 2
+        assert result.confusion.deletions == 2
+        assert result.get_report() == expected.get_report()
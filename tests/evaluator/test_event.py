@@ -1,6 +1,7 @@
 from audiomate import annotations
 
 from evalmate import alignment
+from evalmate import confusion
 from evalmate import evaluator
 
 import pytest
@@ -63,3 +64,21 @@ class TestEventEvaluator:
         assert result.confusion.substitutions == 1
         assert result.confusion.deletions == 3
         assert result.confusion.insertions == 3
+
+    def test_pair_confusion(self, ll_ref, ll_hyp):
+        aligner = alignment.BipartiteMatchingAligner()
+        result = evaluator.EventEvaluator(aligner).evaluate(ll_ref, ll_hyp)
+
+        pair_confusion = result.pair_confusion
+
+        assert isinstance(pair_confusion.instances['up'], confusion.EventConfusion)
+        assert pair_confusion.correct == result.confusion.correct
+        assert pair_confusion.substitutions == result.confusion.substitutions
+        assert pair_confusion.deletions == result.confusion.deletions
+        assert pair_confusion.insertions == result.confusion.insertions
+
+        pair = pair_confusion.instances['down'].substitution_pairs['right'][0]
+        ref_labels = [label for label in ll_ref if label.value == 'down']
+
+        assert any(pair.ref is label for label in ref_labels)
+        assert result.pair_confusion is pair_confusion
@@ -0,0 +1,126 @@
+from audiomate import annotations
+import numpy as np
+
+from evalmate import confusion
+from evalmate import evaluator
+
+import pytest
+
+
+class TestFrameEvaluator:
+
+    def test_evaluate_corpus_with_hyp_labels(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+        result = evaluator.FrameEvaluator().evaluate(ref_corpus, hyps)
+
+        assert isinstance(result, evaluator.FrameEvaluation)
+
+        assert result.confusion.correct == pytest.approx(124.9)
+        assert result.confusion.insertions == pytest.approx(1.7)
+        assert result.confusion.deletions == pytest.approx(8.3)
+        assert result.confusion.substitutions == pytest.approx(36.4)
+        assert result.confusion.substitutions_out == pytest.approx(36.4)
+        assert result.confusion.total == pytest.approx(169.6)
+
+    def test_remove_utterances(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+        frame_evaluator = evaluator.FrameEvaluator()
+        result = frame_evaluator.evaluate(ref_corpus, hyps)
+
+        ref = result.ref_outcome.subset(result.ref_outcome.label_lists.keys())
+        hyp = result.hyp_outcome.subset(result.hyp_outcome.label_lists.keys())
+        utt_ids = sorted(ref.label_lists.keys())
+
+        frame_evaluator.remove_utterances(result, utt_ids[:1])
+        expected = frame_evaluator.evaluate(ref.subset(utt_ids[1:]), hyp.subset(utt_ids[1:]))
+
+        assert result.confusion.correct == pytest.approx(expected.confusion.correct)
+        assert result.get_report() == expected.get_report()
+
+        with pytest.raises(ValueError):
+            frame_evaluator.add_utterances(result, ref.subset(utt_ids[1:2]), hyp.subset(utt_ids[1:2]))
+
+    def test_evaluate_equals_segment_evaluator(self, classification_ref_and_hyp_label_list):
+        ll_ref, ll_hyp = classification_ref_and_hyp_label_list
+
+        expected = evaluator.SegmentEvaluator().evaluate(ll_ref, ll_hyp)
+        result = evaluator.FrameEvaluator(hop=0.5).evaluate(ll_ref, ll_hyp)
+
+        assert sorted(result.confusion.instances.keys()) == sorted(expected.confusion.instances.keys())
+
+        for value, instance in expected.confusion.instances.items():
+            assert isinstance(result.confusion.instances[value], confusion.SegmentDurationConfusion)
+            assert result.confusion.instances[value].correct == pytest.approx(instance.correct)
+            assert result.confusion.instances[value].insertions == pytest.approx(instance.insertions)
+            assert result.confusion.instances[value].deletions == pytest.approx(instance.deletions)
+            assert result.confusion.instances[value].substitutions == pytest.approx(instance.substitutions)
+            assert result.confusion.instances[value].substitutions_out == pytest.approx(instance.substitutions_out)
+
+    def test_evaluate_overlapping_labels(self):
+        ll_ref = annotations.LabelList(labels=[
+            annotations.Label('music', 0, 10),
+            annotations.Label('speech', 2, 6),
+            annotations.Label('noise', 8, 9)
+        ])
+
+        ll_hyp = annotations.LabelList(labels=[
+            annotations.Label('music', 0, 8),
+            annotations.Label('speech', 3, 6),
+            annotations.Label('noise', 2, 3),
+            annotations.Label('speech', 8, 12)
+        ])
+
+        result = evaluator.FrameEvaluator(hop=0.1).evaluate(ll_ref, ll_hyp)
+        instances = result.confusion.instances
+
+        assert instances['music'].correct == pytest.approx(8)
+        assert instances['music'].substitution_durations == {'speech': pytest.approx(2)}
+        assert instances['music'].deletions == pytest.approx(0)
+
+        assert instances['speech'].correct == pytest.approx(3)
+        assert instances['speech'].substitution_durations == {'noise': pytest.approx(1)}
+        assert instances['speech'].substitution_out_durations == {'music': pytest.approx(2)}
+        assert instances['speech'].insertions == pytest.approx(2)
+
+        assert instances['noise'].correct == pytest.approx(0)
+        assert instances['noise'].substitution_out_durations == {'speech': pytest.approx(1)}
+        assert instances['noise'].deletions == pytest.approx(1)
+
+    def test_rasterize(self):
+        ll = annotations.LabelList(labels=[
+            annotations.Label('a', 0.1, 0.3),
+            annotations.Label('b', 0.2, float('inf')),
+            annotations.Label('a', 0.25, 0.4)
+        ])
+
+        frames = evaluator.FrameEvaluator(hop=0.1).rasterize(ll, {'a': 0, 'b': 1, 'c': 2}, 6, open_end=0.5)
+
+        assert np.array_equal(frames, [
+            [False, True, True, True, False, False],
+            [False, False, True, True, True, False],
+            [False, False, False, False, False, False]
+        ])
+
+    def test_count_frames(self):
+        ref = np.array([
+            [True, True, True, False, True],
+            [False, True, False, False, False],
+            [False, False, True, False, True]
+        ])
+
+        hyp = np.array([
+            [True, False, False, False, True],
+            [False, False, True, True, True],
+            [False, True, False, False, True]
+        ])
+
+        correct, insertions, deletions, substitutions = evaluator.FrameEvaluator.count_frames(ref, hyp)
+
+        assert correct.tolist() == [2, 0, 1]
+        assert insertions.tolist() == [0, 2, 0]
+        assert deletions.tolist() == [0, 1, 1]
+        assert substitutions.tolist() == [
+            [0, 1, 1],
+            [0, 0, 0],
+            [0, 0, 0]
+        ]
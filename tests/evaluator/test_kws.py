@@ -43,6 +43,78 @@ class TestKWSEvaluator:
         assert result.confusion.deletions == 3
         assert result.confusion.insertions == 6
 
+    def test_remove_and_replace_utterances(self, kws_ref_corpus_and_hyp_labels):
+        kws_evaluator = evaluator.KWSEvaluator()
+        result = kws_evaluator.evaluate(kws_ref_corpus_and_hyp_labels[0], kws_ref_corpus_and_hyp_labels[1])
+
+        ref = result.ref_outcome.subset(result.ref_outcome.label_lists.keys())
+        hyp = result.hyp_outcome.subset(result.hyp_outcome.label_lists.keys())
+        utt_ids = sorted(ref.label_lists.keys())
+
+        kws_evaluator.remove_utterances(result, utt_ids[:1])
+        expected = kws_evaluator.evaluate(ref.subset(utt_ids[1:]), hyp.subset(utt_ids[1:]))
+
+        assert sorted(result.utt_to_label_pairs.keys()) == utt_ids[1:]
+        assert result.get_report(template='kws_detail') == expected.get_report(template='kws_detail')
+
+        hyp.label_lists[utt_ids[1]] = annotations.LabelList()
+        kws_evaluator.replace_utterances(result, ref.subset(utt_ids[:2]), hyp.subset(utt_ids[:2]))
+        expected = kws_evaluator.evaluate(ref, hyp)
+
+        assert sorted(result.utt_to_label_pairs.keys()) == utt_ids
+        assert result.confusion.total == expected.confusion.total
+        assert result.get_report(template='kws_detail') == expected.get_report(template='kws_detail')
+
+    def test_evaluate_stream(self, kws_ref_corpus_and_hyp_labels):
+        corpus, hyps = kws_ref_corpus_and_hyp_labels
+        expected = evaluator.KWSEvaluator().evaluate(corpus, hyps)
+
+        result = evaluator.KWSEvaluator().evaluate_stream(corpus, iter(hyps.items()), batch_size=2)
+
+        assert isinstance(result, evaluator.KWSEvaluation)
+        assert isinstance(result.ref_outcome, evaluator.SummaryOutcome)
+        assert result.alignment is None
+        assert result.confusion.correct == 17
+        assert result.confusion.insertions == 6
+        assert result.get_report() == expected.get_report()
+
+        with pytest.raises(ValueError):
+            result.failing_utterances
+
+    def test_evaluate_stream_with_missing_or_unknown_utterances_raises_error(self, kws_ref_corpus_and_hyp_labels):
+        corpus, hyps = kws_ref_corpus_and_hyp_labels
+        items = list(hyps.items())
+
+        with pytest.raises(ValueError):
+            evaluator.KWSEvaluator().evaluate_stream(corpus, iter(items[1:]))
+
+        with pytest.raises(ValueError):
+            evaluator.KWSEvaluator().evaluate_stream(corpus, iter(items + [('unknown', items[0][1])]))
+
+        with pytest.raises(ValueError):
+            evaluator.KWSEvaluator().evaluate_stream(corpus, iter(items + items[:1]))
+
+    def test_evaluate_many(self, kws_ref_corpus_and_hyp_labels):
+        corpus, hyps = kws_ref_corpus_and_hyp_labels
+        empty_hyps = {utt_idx: annotations.LabelList() for utt_idx in hyps.keys()}
+
+        kws_evaluator = evaluator.KWSEvaluator()
+        results = kws_evaluator.evaluate_many(corpus, [hyps, empty_hyps, evaluator.Outcome(label_lists=hyps)])
+
+        assert len(results) == 3
+        assert results[0].get_report(template='kws_detail') == \
+            kws_evaluator.evaluate(corpus, hyps).get_report(template='kws_detail')
+        assert results[1].get_report() == kws_evaluator.evaluate(corpus, empty_hyps).get_report()
+        assert results[2].confusion.correct == 17
+        assert results[0].ref_outcome is not results[1].ref_outcome
+
+    def test_evaluate_many_with_missing_hyp_raises_error(self, kws_ref_corpus_and_hyp_labels):
+        corpus, hyps = kws_ref_corpus_and_hyp_labels
+        hyps.pop(sorted(hyps.keys())[0])
+
+        with pytest.raises(ValueError):
+            evaluator.KWSEvaluator().evaluate_many(corpus, [hyps])
+
     def test_evaluate_with_empty_hyp(self):
         ref = evaluator.Outcome(label_lists={
             'a': annotations.LabelList(labels=[
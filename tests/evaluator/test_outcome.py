@@ -1,4 +1,5 @@
 from audiomate import annotations
+import numpy as np
 
 import pytest
 
@@ -81,6 +82,108 @@ class TestOutcome:
     def test_all_values(self, sample_outcome):
         assert sample_outcome.all_values == {'up', 'down', 'left', 'right'}
 
+    def test_index_is_updated_when_label_lists_change(self, sample_outcome):
+        assert sample_outcome.label_set_for_value('left').count == 1
+
+        sample_outcome.label_lists['c'] = annotations.LabelList(labels=[
+            annotations.Label('left', start=1.0, end=2.0),
+            annotations.Label('left', start=3.0, end=5.0),
+            annotations.Label('center', start=5.0, end=6.0)
+        ])
+
+        assert sample_outcome.label_set_for_value('left').count == 2
+        assert sample_outcome.label_set_for_value('left').length_max == pytest.approx(2.0)
+        assert sample_outcome.label_set_for_value('up').count == 5
+        assert sample_outcome.all_values == {'up', 'down', 'left', 'right', 'center'}
+
+        del sample_outcome.label_lists['c']
+        sample_outcome.label_lists.pop('b')
+        sample_outcome.label_lists.update({'d': annotations.LabelList(labels=[annotations.Label('up', 0, 1)])})
+
+        assert sorted(sample_outcome.label_lists.keys()) == ['a', 'd']
+        assert sample_outcome.label_set_for_value('left').count == 0
+        assert sample_outcome.label_set_for_value('up').count == 4
+        assert sample_outcome.all_values == {'up', 'down', 'right'}
+
+    def test_label_lists_are_not_copied(self, sample_outcome):
+        label_lists = {'a': sample_outcome.label_lists['a']}
+        result = outcome.Outcome(label_lists=label_lists)
+
+        result.label_lists['b'] = sample_outcome.label_lists['b']
+
+        assert isinstance(result.label_lists, outcome.IndexedLabelLists)
+        assert sorted(label_lists.keys()) == ['a', 'b']
+        assert result.label_lists == label_lists
+
+
+class TestPreparedOutcome:
+
+    def test_derived_is_created_once(self, sample_outcome):
+        prepared = outcome.PreparedOutcome(label_lists=sample_outcome.label_lists)
+        calls = []
+
+        def create(ll):
+            calls.append(ll)
+            return sorted(ll.labels)
+
+        first = prepared.derived('sorted', 'a', create)
+
+        assert prepared.derived('sorted', 'a', create) is first
+        assert prepared.derived('sorted', 'b', create) == sorted(sample_outcome.label_lists['b'].labels)
+        assert len(calls) == 2
+
+        assert sample_outcome.derived('sorted', 'a', create) is not first
+        assert len(calls) == 3
+
+    def test_all_values(self, sample_outcome):
+        prepared = outcome.PreparedOutcome(label_lists=sample_outcome.label_lists)
+
+        assert prepared.all_values == {'up', 'down', 'left', 'right'}
+
+        prepared.all_values.add('other')
+        assert prepared.all_values == {'up', 'down', 'left', 'right'}
+
+
+class TestSummaryOutcome:
+
+    def test_statistics_equal_outcome(self, sample_outcome):
+        summary = outcome.SummaryOutcome(keep_lengths=True)
+
+        for utt_idx, ll in sample_outcome.label_lists.items():
+            summary.add_label_list(ll, duration=sample_outcome.utterance_durations[utt_idx])
+
+        assert summary.num_utterances == 3
+        assert summary.label_lists == {}
+        assert summary.all_values == sample_outcome.all_values
+        assert summary.total_duration == pytest.approx(sample_outcome.total_duration)
+
+        assert summary.label_set().count == 16
+        assert summary.label_set().length_mean == pytest.approx(sample_outcome.label_set().length_mean)
+        assert summary.label_set_for_value('up').length_median == \
+            pytest.approx(sample_outcome.label_set_for_value('up').length_median)
+        assert summary.label_set_for_value('unknown').count == 0
+
+    def test_total_duration_with_missing_duration_raises_error(self, sample_outcome):
+        summary = outcome.SummaryOutcome()
+        summary.add_label_list(sample_outcome.label_lists['a'])
+
+        with pytest.raises(ValueError):
+            summary.total_duration
+
+    def test_statistics_without_keeping_lengths(self, sample_outcome):
+        summary = outcome.SummaryOutcome(keep_lengths=False)
+
+        for utt_idx, ll in sample_outcome.label_lists.items():
+            summary.add_label_list(ll, duration=sample_outcome.utterance_durations[utt_idx])
+
+        assert isinstance(summary.label_set_for_value('up'), outcome.LengthStatistics)
+        assert summary.label_set().count == 16
+        assert summary.label_set().length_variance == pytest.approx(sample_outcome.label_set().length_variance)
+        assert summary.label_set_for_value('up').length_max == pytest.approx(3.35)
+        assert summary.label_set_for_value('up').length_median == \
+            pytest.approx(sample_outcome.label_set_for_value('up').length_median, rel=0.01)
+        assert summary.label_set_for_value('unknown').count == 0
+
 
 class TestLabelSet:
 
@@ -113,3 +216,91 @@ class TestLabelSet:
         ls = sample_outcome.label_set_for_value('up')
 
         assert ls.length_variance == pytest.approx(1.4920693877551021)
+
+    def test_describe(self, sample_outcome):
+        ls = sample_outcome.label_set_for_value('up')
+        description = ls.describe()
+
+        assert description['count'] == 7
+        assert description['min'] == pytest.approx(0.4)
+        assert description['max'] == pytest.approx(3.35)
+        assert description['mean'] == pytest.approx(ls.length_mean)
+        assert description['median'] == pytest.approx(ls.length_median)
+        assert description['variance'] == pytest.approx(ls.length_variance)
+
+    def test_statistics_are_updated_when_labels_are_added(self, sample_outcome):
+        ls = sample_outcome.label_set_for_value('up')
+
+        assert ls.length_max == pytest.approx(3.35)
+
+        ls.labels.append(annotations.Label('up', start=0, end=10))
+
+        assert ls.count == 8
+        assert ls.length_max == pytest.approx(10)
+        assert isinstance(ls.label_lengths, list)
+        assert len(ls.label_lengths) == 8
+
+    def test_statistics_are_updated_when_labels_are_replaced_or_changed(self):
+        ls = outcome.LabelSet(labels=[annotations.Label('a', 0, 1), annotations.Label('a', 0, 2)])
+
+        assert ls.length_mean == pytest.approx(1.5)
+
+        ls.labels[0] = annotations.Label('a', 0, 5)
+
+        assert ls.length_mean == pytest.approx(3.5)
+
+        ls.labels[1].end = 8
+
+        assert ls.length_mean == pytest.approx(6.5)
+        assert ls.describe()['max'] == pytest.approx(8)
+
+    def test_describe_without_labels(self):
+        description = outcome.LabelSet().describe()
+
+        assert description['count'] == 0
+        assert np.isnan(description['mean'])
+        assert np.isnan(description['median'])
+
+
+class TestLengthStatistics:
+
+    def test_describe_equals_label_set(self):
+        lengths = np.random.RandomState(0).lognormal(size=10000)
+        statistics = outcome.LengthStatistics(relative_accuracy=0.01, buffer_size=1000)
+
+        for length in lengths:
+            statistics.add(length)
+
+        expected = outcome.LabelSet(lengths=lengths).describe()
+        description = statistics.describe()
+
+        assert description['count'] == 10000
+        assert description['min'] == pytest.approx(expected['min'])
+        assert description['max'] == pytest.approx(expected['max'])
+        assert description['mean'] == pytest.approx(expected['mean'])
+        assert description['variance'] == pytest.approx(expected['variance'])
+        assert description['median'] == pytest.approx(expected['median'], rel=0.01)
+
+    def test_merge(self):
+        lengths = [0.5, 2.0, 0.0, 3.5, 1.25, 7.0, 0.75]
+        first = outcome.LengthStatistics()
+        second = outcome.LengthStatistics()
+
+        for length in lengths[:3]:
+            first.add(length)
+
+        for length in lengths[3:]:
+            second.add(length)
+
+        first.merge(second)
+
+        assert first.count == 7
+        assert first.length_min == 0.0
+        assert first.length_max == 7.0
+        assert first.length_mean == pytest.approx(np.mean(lengths))
+        assert first.length_variance == pytest.approx(np.var(lengths))
+        assert first.length_median == pytest.approx(1.25, rel=0.01)
+
+    def test_merge_with_different_accuracy_raises_error(self):
+        with pytest.raises(ValueError):
+            outcome.LengthStatistics(relative_accuracy=0.01).merge(outcome.LengthStatistics(relative_accuracy=0.02))
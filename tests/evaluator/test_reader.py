@@ -0,0 +1,158 @@
+import os
+
+from audiomate import annotations
+from audiomate.formats import audacity
+
+from evalmate import evaluator
+from evalmate.evaluator import reader
+
+import pytest
+
+from tests import resources
+
+
+def label_tuples(ll):
+    return sorted((label.start, label.end, label.value) for label in ll)
+
+
+class TestParseLabels:
+
+    def test_parse_labels(self):
+        keys, values, starts, ends = reader.parse_labels(b'0.5\t1.2\tone\n1.2\t3\ttwo words\n')
+
+        assert keys.tolist() == [0, 1]
+        assert values == ['one', 'two words']
+        assert starts.tolist() == [0.5, 1.2]
+        assert ends.tolist() == [1.2, 3.0]
+
+    def test_parse_labels_with_empty_lines_and_missing_values(self):
+        keys, values, starts, ends = reader.parse_labels(b'\n0\t1\ta\tb\r\n\r\n2\t-1\n3\t4\tc')
+
+        assert keys.tolist() == [0, 1, 2]
+        assert values == ['a\tb', '', 'c']
+        assert starts.tolist() == [0, 2, 3]
+        assert ends.tolist() == [1, -1, 4]
+
+    def test_parse_labels_strips_whitespace(self):
+        keys, values, starts, ends = reader.parse_labels(b'0\t1\ta \n \t \n1\t2\t b\t c \n  2\t3\n\t3\t4\tx\r\n')
+
+        assert keys.tolist() == [0, 1, 2, 3]
+        assert values == ['a', 'b\t c', '', 'x']
+        assert starts.tolist() == [0, 1, 2, 3]
+        assert ends.tolist() == [1, 2, 3, 4]
+
+    @pytest.mark.parametrize('content', [
+        '0\t1\ta \n1\t2\t b\n',
+        '0\t1\ta\n   \n\t\n1\t2\tb\n',
+        ' 0\t1\ta\t \n1\t2\n',
+        '0.5 \t 1.5\t x y \r\n\r\n2,5\t3s\tz\n',
+        '0\t1\ta\u00a0\n\u00a0\n\u00a01\t2\tb'
+    ])
+    def test_parse_labels_equals_audacity_reader(self, content, tmpdir):
+        path = os.path.join(tmpdir.strpath, 'labels.txt')
+
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+
+        _, values, starts, ends = reader.parse_labels(content.encode('utf-8'))
+        expected = audacity.read_label_list(path)
+
+        assert label_tuples(expected) == sorted(zip(starts.tolist(), ends.tolist(), values))
+
+        hyp = evaluator.Outcome.from_label_files(tmpdir.strpath)
+
+        assert label_tuples(hyp.label_lists['labels']) == label_tuples(expected)
+
+    def test_parse_labels_with_invalid_characters_in_times(self):
+        keys, values, starts, ends = reader.parse_labels(b'0,5\t1.2s\tone\n1.2\t3\ttwo\n')
+
+        assert values == ['one', 'two']
+        assert starts.tolist() == [0.5, 1.2]
+        assert ends.tolist() == [1.2, 3.0]
+
+    def test_parse_labels_without_end_raises_error(self):
+        with pytest.raises(ValueError):
+            reader.parse_labels(b'0.5\t1.2\tone\n1.2\n')
+
+    def test_parse_labels_with_key_column(self):
+        keys, values, starts, ends = reader.parse_labels(b'utt-1\t0\t1\tone\nutt-2\t1\t2\n', num_key_columns=1)
+
+        assert keys == ['utt-1', 'utt-2']
+        assert values == ['one', '']
+        assert starts.tolist() == [0, 1]
+
+    def test_parse_labels_with_line_offsets(self):
+        data = b'0\t1\ta\n1\t2\tb\n2\t3\tc\n'
+        keys, values, _, _ = reader.parse_labels(data, line_offsets=[0, 6, 6])
+
+        assert keys.tolist() == [0, 2, 2]
+        assert values == ['a', 'b', 'c']
+
+
+class TestReadLabelFiles:
+
+    def test_from_label_files_with_directory(self, kws_ref_corpus_and_hyp_labels):
+        corpus, hyps = kws_ref_corpus_and_hyp_labels
+        hyp_path = os.path.join(os.path.dirname(resources.__file__), 'kws', 'hyp')
+
+        for workers in [None, 2]:
+            hyp = evaluator.Outcome.from_label_files(hyp_path, workers=workers)
+
+            assert sorted(hyp.label_lists.keys()) == sorted(hyps.keys())
+
+            for utt_idx, ll in hyps.items():
+                assert label_tuples(hyp.label_lists[utt_idx]) == label_tuples(ll)
+                assert hyp.label_lists[utt_idx].idx == 'default'
+
+        expected = evaluator.KWSEvaluator().evaluate(corpus, hyps)
+        result = evaluator.KWSEvaluator().evaluate(corpus, hyp)
+
+        assert result.get_report(template='kws_detail') == expected.get_report(template='kws_detail')
+
+    def test_from_label_files_with_single_file(self, tmpdir):
+        path = os.path.join(tmpdir.strpath, 'hyp.txt')
+
+        with open(path, 'w') as f:
+            f.write('b\t0.0\t1.5\tone\n')
+            f.write('a\t0.5\t1.0\ttwo\n')
+            f.write('b\t2.0\t3.0\tthree\n')
+            f.write('c\t0.0\t3.0\tone\n')
+
+        hyp = evaluator.Outcome.from_label_files(path, label_list_idx='hyp', utterance_durations={'a': 4.0})
+
+        assert list(hyp.label_lists.keys()) == ['b', 'a', 'c']
+        assert label_tuples(hyp.label_lists['b']) == [(0.0, 1.5, 'one'), (2.0, 3.0, 'three')]
+        assert label_tuples(hyp.label_lists['a']) == [(0.5, 1.0, 'two')]
+        assert label_tuples(hyp.label_lists['c']) == [(0.0, 3.0, 'one')]
+        assert hyp.label_lists['a'].idx == 'hyp'
+        assert hyp.utterance_durations == {'a': 4.0}
+
+    def test_from_label_files_with_empty_file(self, tmpdir):
+        os.makedirs(os.path.join(tmpdir.strpath, 'hyp'))
+        open(os.path.join(tmpdir.strpath, 'hyp', 'a.txt'), 'w').close()
+
+        with open(os.path.join(tmpdir.strpath, 'hyp', 'b.txt'), 'w') as f:
+            f.write('0\t1\tx')
+
+        hyp = evaluator.Outcome.from_label_files(os.path.join(tmpdir.strpath, 'hyp'))
+
+        assert len(hyp.label_lists['a']) == 0
+        assert label_tuples(hyp.label_lists['b']) == [(0, 1, 'x')]
+
+
+class TestLazyLabelLists:
+
+    def test_set_and_delete(self):
+        label_lists = reader.LazyLabelLists(['a', 'b'], ['default', 'default'], [0, 1, 3],
+                                            ['x', 'y'], [0, 1, 0], [0, 0, 1], [1, 1, 2])
+
+        assert label_tuples(label_lists['b']) == [(0, 1, 'y'), (1, 2, 'x')]
+
+        label_lists['c'] = annotations.LabelList(labels=[annotations.Label('z', 0, 1)])
+        del label_lists['a']
+
+        assert list(label_lists.keys()) == ['b', 'c']
+        assert label_tuples(label_lists['c']) == [(0, 1, 'z')]
+
+        with pytest.raises(KeyError):
+            label_lists['a']
@@ -1,6 +1,7 @@
 from audiomate import annotations
 
 from evalmate import alignment
+from evalmate import confusion
 from evalmate import evaluator
 
 import pytest
@@ -47,3 +48,156 @@ class TestSegmentEvaluator:
         assert result.confusion.substitutions == pytest.approx(36.4)
         assert result.confusion.substitutions_out == pytest.approx(36.4)
         assert result.confusion.total == pytest.approx(169.6)
+
+    def test_evaluate_without_keeping_segments(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+        result = evaluator.SegmentEvaluator(keep_segments=False).evaluate(ref_corpus, hyps)
+
+        assert isinstance(result, evaluator.SegmentEvaluation)
+        assert result.utt_to_segments is None
+
+        for instance in result.confusion.instances.values():
+            assert isinstance(instance, confusion.SegmentDurationConfusion)
+
+        assert result.confusion.correct == pytest.approx(124.9)
+        assert result.confusion.insertions == pytest.approx(1.7)
+        assert result.confusion.deletions == pytest.approx(8.3)
+        assert result.confusion.substitutions == pytest.approx(36.4)
+        assert result.confusion.substitutions_out == pytest.approx(36.4)
+        assert result.confusion.total == pytest.approx(169.6)
+
+        with pytest.raises(ValueError):
+            result.segments
+
+    def test_evaluate_without_keeping_segments_report_equals(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+
+        expected = evaluator.SegmentEvaluator().evaluate(ref_corpus, hyps)
+        result = evaluator.SegmentEvaluator(keep_segments=False).evaluate(ref_corpus, hyps)
+
+        assert result.get_report() == expected.get_report()
+
+    def test_detail_report_without_keeping_segments_raises_error(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+        result = evaluator.SegmentEvaluator(keep_segments=False).evaluate(ref_corpus, hyps)
+
+        with pytest.raises(ValueError):
+            result.get_report(template='segment_detail')
+
+        expected = evaluator.SegmentEvaluator().evaluate(ref_corpus, hyps)
+        assert 'Segments' in expected.get_report(template='segment_detail')
+
+    def test_remove_and_replace_utterances(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+
+        for segment_evaluator in [evaluator.SegmentEvaluator(),
+                                  evaluator.SegmentEvaluator(keep_segments=False),
+                                  evaluator.SegmentEvaluator(multi_label=True)]:
+            result = segment_evaluator.evaluate(ref_corpus, hyps)
+
+            ref = result.ref_outcome.subset(result.ref_outcome.label_lists.keys())
+            hyp = result.hyp_outcome.subset(result.hyp_outcome.label_lists.keys())
+            utt_ids = sorted(ref.label_lists.keys())
+
+            segment_evaluator.remove_utterances(result, utt_ids[:2])
+            expected = segment_evaluator.evaluate(ref.subset(utt_ids[2:]), hyp.subset(utt_ids[2:]))
+
+            assert result.get_report() == expected.get_report()
+
+            hyp.label_lists[utt_ids[0]] = annotations.LabelList(labels=[annotations.Label('music', 0, 3)])
+            segment_evaluator.replace_utterances(result, ref.subset(utt_ids[:3]), hyp.subset(utt_ids[:3]))
+            expected = segment_evaluator.evaluate(ref, hyp)
+
+            assert result.confusion.correct == pytest.approx(expected.confusion.correct)
+            assert result.get_report() == expected.get_report()
+
+    def test_evaluate_stream(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+
+        for segment_evaluator in [evaluator.SegmentEvaluator(), evaluator.SegmentEvaluator(multi_label=True)]:
+            expected = segment_evaluator.evaluate(ref_corpus, hyps)
+            result = segment_evaluator.evaluate_stream(ref_corpus, iter(hyps.items()), batch_size=3, keep_lengths=True)
+
+            assert result.utt_to_segments is None
+            assert result.confusion.correct == pytest.approx(expected.confusion.correct)
+            assert result.get_report() == expected.get_report()
+
+            result = segment_evaluator.evaluate_stream(ref_corpus, iter(hyps.items()))
+
+            assert isinstance(result.ref_outcome.label_set(), evaluator.LengthStatistics)
+            assert result.ref_outcome.label_set().length_mean == \
+                pytest.approx(expected.ref_outcome.label_set().length_mean)
+            assert 'Length - Median' in result.get_report()
+
+    def test_evaluate_many(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+        other_hyps = {utt.idx: utt.label_lists[evaluator.SegmentEvaluator.default_label_list_idx()]
+                      for utt in ref_corpus.utterances.values()}
+
+        for segment_evaluator in [evaluator.SegmentEvaluator(), evaluator.SegmentEvaluator(multi_label=True),
+                                  evaluator.SegmentEvaluator(workers=2)]:
+            results = segment_evaluator.evaluate_many(ref_corpus, [hyps, other_hyps])
+
+            assert results[0].get_report() == segment_evaluator.evaluate(ref_corpus, hyps).get_report()
+            assert results[1].get_report() == segment_evaluator.evaluate(ref_corpus, other_hyps).get_report()
+
+    def test_evaluate_multi_label_with_overlapping_labels(self):
+        ll_ref = annotations.LabelList(labels=[
+            annotations.Label('music', 0, 10),
+            annotations.Label('speech', 2, 6),
+            annotations.Label('noise', 8, 9)
+        ])
+
+        ll_hyp = annotations.LabelList(labels=[
+            annotations.Label('music', 0, 8),
+            annotations.Label('speech', 3, 6),
+            annotations.Label('noise', 2, 3),
+            annotations.Label('speech', 8, 12)
+        ])
+
+        result = evaluator.SegmentEvaluator(multi_label=True).evaluate(ll_ref, ll_hyp)
+        instances = result.confusion.instances
+
+        assert len(result.segments) == 7
+        assert result.segments[1].ref == [annotations.Label('music', 0, 10), annotations.Label('speech', 2, 6)]
+
+        assert instances['music'].correct == pytest.approx(8)
+        assert instances['music'].insertions == pytest.approx(0)
+        assert instances['music'].deletions == pytest.approx(2)
+
+        assert instances['speech'].correct == pytest.approx(3)
+        assert instances['speech'].insertions == pytest.approx(4)
+        assert instances['speech'].deletions == pytest.approx(1)
+
+        assert instances['noise'].correct == pytest.approx(0)
+        assert instances['noise'].insertions == pytest.approx(1)
+        assert instances['noise'].deletions == pytest.approx(1)
+
+        assert result.confusion.substitutions == 0
+
+    def test_evaluate_multi_label_corpus(self, classification_ref_corpus_and_hyp_labels):
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+        result = evaluator.SegmentEvaluator(multi_label=True, keep_segments=False).evaluate(ref_corpus, hyps)
+
+        assert result.utt_to_segments is None
+
+        # Without overlapping labels, every substitution is an insertion and a deletion
+        assert result.confusion.correct == pytest.approx(124.9)
+        assert result.confusion.insertions == pytest.approx(1.7 + 36.4)
+        assert result.confusion.deletions == pytest.approx(8.3 + 36.4)
+        assert result.confusion.substitutions == 0
+
+    def test_multi_label_detail_report(self, classification_ref_corpus_and_hyp_labels):
+        ll_ref = annotations.LabelList(labels=[annotations.Label('music', 0, 10), annotations.Label('speech', 2, 6)])
+        ll_hyp = annotations.LabelList(labels=[annotations.Label('music', 0, 8)])
+
+        result = evaluator.SegmentEvaluator(multi_label=True).evaluate(ll_ref, ll_hyp)
+        report = result.get_report(template='segment_detail')
+
+        assert 'music, speech   music' in report
+
+        ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+        result = evaluator.SegmentEvaluator(multi_label=True, keep_segments=False).evaluate(ref_corpus, hyps)
+
+        with pytest.raises(ValueError):
+            result.get_report(template='segment_detail')
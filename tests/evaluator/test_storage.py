@@ -0,0 +1,133 @@
+import os
+
+from audiomate import annotations
+
+from evalmate import confusion
+from evalmate import evaluator
+
+import pytest
+
+
+def save_and_load(evaluation, tmpdir):
+    path = os.path.join(tmpdir.strpath, 'evaluation.npz')
+    evaluator.save_evaluation(evaluation, path)
+
+    return evaluator.load_evaluation(path)
+
+
+def test_save_and_load_asr_evaluation(tmpdir):
+    ref = evaluator.Outcome(
+        label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a b a d f a b')]),
+            'b': annotations.LabelList(labels=[annotations.Label('x y')])
+        },
+        utterance_durations={'a': 4.5, 'b': 1.0}
+    )
+
+    hyp = evaluator.Outcome(
+        label_lists={
+            'a': annotations.LabelList(labels=[annotations.Label('a b d f i b')]),
+            'b': annotations.LabelList(labels=[annotations.Label('x y')])
+        }
+    )
+
+    result = evaluator.ASREvaluator().evaluate(ref, hyp)
+    loaded = save_and_load(result, tmpdir)
+
+    assert isinstance(loaded, evaluator.ASREvaluation)
+    assert dict(loaded.utt_to_label_pairs) == dict(result.utt_to_label_pairs)
+    assert loaded.failing_utterances == ['a']
+    assert loaded.confusion.error_rate == pytest.approx(result.confusion.error_rate)
+
+    assert loaded.ref_outcome.utterance_durations == {'a': 4.5, 'b': 1.0}
+    assert loaded.ref_outcome.label_lists['a'].labels == [annotations.Label('a b a d f a b')]
+    assert loaded.hyp_outcome.utterance_durations == {}
+
+    assert loaded.get_report() == result.get_report()
+    assert loaded.get_report(template='asr_detail') == result.get_report(template='asr_detail')
+
+
+def test_save_and_load_kws_evaluation(kws_ref_corpus_and_hyp_labels, tmpdir):
+    ref_corpus, hyps = kws_ref_corpus_and_hyp_labels
+
+    result = evaluator.KWSEvaluator().evaluate(ref_corpus, hyps)
+    loaded = save_and_load(result, tmpdir)
+
+    assert isinstance(loaded, evaluator.KWSEvaluation)
+    assert sorted(loaded.label_pairs) == sorted(result.label_pairs)
+    assert loaded.term_weighted_value() == pytest.approx(result.term_weighted_value())
+    assert loaded.get_report(template='kws_detail') == result.get_report(template='kws_detail')
+
+
+def test_save_and_load_segment_evaluation(classification_ref_corpus_and_hyp_labels, tmpdir):
+    ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+
+    result = evaluator.SegmentEvaluator().evaluate(ref_corpus, hyps)
+    loaded = save_and_load(result, tmpdir)
+
+    assert isinstance(loaded, evaluator.SegmentEvaluation)
+    assert sorted(loaded.utt_to_segments.keys()) == sorted(result.utt_to_segments.keys())
+
+    for utt_idx, segments in result.utt_to_segments.items():
+        assert loaded.utt_to_segments[utt_idx] == segments
+
+    for instance in loaded.confusion.instances.values():
+        assert isinstance(instance, confusion.SegmentConfusion)
+
+    assert loaded.get_report(template='segment_detail') == result.get_report(template='segment_detail')
+
+
+def test_save_and_load_segment_evaluation_without_segments(classification_ref_corpus_and_hyp_labels, tmpdir):
+    ref_corpus, hyps = classification_ref_corpus_and_hyp_labels
+
+    result = evaluator.SegmentEvaluator(keep_segments=False).evaluate(ref_corpus, hyps)
+    loaded = save_and_load(result, tmpdir)
+
+    assert loaded.utt_to_segments is None
+
+    for value, instance in result.confusion.instances.items():
+        assert isinstance(loaded.confusion.instances[value], confusion.SegmentDurationConfusion)
+        assert loaded.confusion.instances[value].correct == pytest.approx(instance.correct)
+        assert loaded.confusion.instances[value].insertions == pytest.approx(instance.insertions)
+        assert loaded.confusion.instances[value].deletions == pytest.approx(instance.deletions)
+        assert dict(loaded.confusion.instances[value].substitution_durations) == dict(instance.substitution_durations)
+        assert dict(loaded.confusion.instances[value].substitution_out_durations) == \
+            dict(instance.substitution_out_durations)
+
+    assert loaded.get_report() == result.get_report()
+
+
+def test_save_and_load_multi_label_segment_evaluation(tmpdir):
+    # More than 64 values, so the masks need multiple words
+    ll_ref = annotations.LabelList(labels=[annotations.Label('v{}'.format(x), x, x + 5) for x in range(80)])
+    ll_hyp = annotations.LabelList(labels=[annotations.Label('v{}'.format(x), x + 1, x + 4) for x in range(80)])
+
+    result = evaluator.SegmentEvaluator(multi_label=True).evaluate(ll_ref, ll_hyp)
+    loaded = save_and_load(result, tmpdir)
+
+    segments = result.segments
+    loaded_segments = loaded.segments
+
+    assert len(loaded_segments) == len(segments)
+    assert [x.ref_mask for x in loaded_segments] == [x.ref_mask for x in segments]
+    assert [x.hyp_mask for x in loaded_segments] == [x.hyp_mask for x in segments]
+    assert [x.ref for x in loaded_segments] == [x.ref for x in segments]
+
+    assert loaded.confusion.correct == pytest.approx(result.confusion.correct)
+    assert loaded.confusion.deletions == pytest.approx(result.confusion.deletions)
+
+
+def test_save_unsupported_evaluation_raises_error(classification_ref_and_hyp_label_list, tmpdir):
+    ll_ref, ll_hyp = classification_ref_and_hyp_label_list
+    result = evaluator.FrameEvaluator().evaluate(ll_ref, ll_hyp)
+
+    with pytest.raises(ValueError):
+        evaluator.save_evaluation(result, os.path.join(tmpdir.strpath, 'evaluation.npz'))
+
+
+def test_save_stream_evaluation_raises_error(kws_ref_corpus_and_hyp_labels, tmpdir):
+    corpus, hyps = kws_ref_corpus_and_hyp_labels
+    result = evaluator.KWSEvaluator().evaluate_stream(corpus, iter(hyps.items()))
+
+    with pytest.raises(ValueError):
+        evaluator.save_evaluation(result, os.path.join(tmpdir.strpath, 'evaluation.npz'))